@@ -38,6 +38,8 @@ def create_app(test_config=None):
 
     * TABLE_NAME The name of an existing DynamoDB table that stores work items.
     * SENDER_EMAIL The email address from which report emails are sent.
+    * SCAN_SEGMENTS (optional) The number of segments that are scanned in parallel
+      when work items are listed. Defaults to 4.
     * SECRET_KEY The secret key Flask uses for sessions. Change this temporary value
       to a secret value for production.
 
@@ -66,7 +68,8 @@ def create_app(test_config=None):
         dynamodb_resource = boto3.resource("dynamodb")
         ses_client = boto3.client("ses")
     table = dynamodb_resource.Table(app.config["TABLE_NAME"])
-    storage = Storage(table)  # pylint: disable=E1120
+    scan_segments = app.config.get("SCAN_SEGMENTS", 4)
+    storage = Storage(table, scan_segments)  # pylint: disable=E1120
 
     item_list_view = ItemList.as_view("item_list_api", storage)
     report_view = Report.as_view("report_api", storage, sender_email, ses_client)
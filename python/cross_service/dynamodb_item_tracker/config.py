@@ -3,3 +3,4 @@
 TABLE_NAME = "NEED-TABLE-NAME"
 SENDER_EMAIL = "NEED-SENDER-EMAIL"
 SECRET_KEY = "change-for-production!"
+SCAN_SEGMENTS = 4
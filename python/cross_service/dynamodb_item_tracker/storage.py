@@ -9,11 +9,16 @@ in a table.
 """
 
 import logging
+import sys
 from uuid import uuid4
 
 from boto3.dynamodb.conditions import Attr
 from botocore.exceptions import ClientError
 
+# Add relative path to include demo_tools in this code example without need for setup.
+sys.path.append("../..")
+from demo_tools.dynamodb_parallel_scan import parallel_scan  # noqa
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,13 +31,16 @@ class Storage:
     Encapsulates work item data in a DynamoDB table.
     """
 
-    def __init__(self, table):
+    def __init__(self, table, total_segments=4):
         """
         :param table: A Boto3 DynamoDB Table object that represents an existing DynamoDB
                       table. This object is a high-level object that wraps low-level
                       DynamoDB service actions.
+        :param total_segments: The number of segments that are scanned in parallel
+                               when work items are listed.
         """
         self.table = table
+        self.total_segments = total_segments
 
     def get_work_items(self, archived=None):
         """
@@ -42,13 +50,13 @@ class Storage:
                          returned. Otherwise, all work items are returned.
         :return: A list of work items currently stored in the table.
         """
+        scan_kwargs = {}
+        if archived is not None:
+            scan_kwargs["FilterExpression"] = Attr("archived").eq(archived)
         try:
-            if archived is None:
-                work_items = self.table.scan().get("Items", [])
-            else:
-                work_items = self.table.scan(
-                    FilterExpression=Attr("archived").eq(archived)
-                ).get("Items", [])
+            work_items = list(
+                parallel_scan(self.table, self.total_segments, **scan_kwargs)
+            )
         except ClientError as err:
             logger.exception(
                 "Couldn't get items from table %s with archived %s.",
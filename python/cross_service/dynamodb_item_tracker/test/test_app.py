@@ -52,6 +52,7 @@ class MockManager:
                 "SENDER_EMAIL": self.sender,
                 "DYNAMODB_RESOURCE": resource,
                 "SES_CLIENT": ses_client,
+                "SCAN_SEGMENTS": 1,
             }
         )
 
@@ -80,6 +81,8 @@ def test_get_items(mock_mgr, archived, filter_ex):
             mock_mgr.table.name,
             mock_mgr.data_items,
             filter_expression=filter_ex,
+            expression_attrs=filter_ex,
+            expression_attr_vals=filter_ex,
         )
 
     with mock_mgr.app.test_client() as client:
@@ -99,6 +102,26 @@ def test_get_items_error(mock_mgr):
         assert "A storage error occurred" in rv.json
 
 
+def test_get_work_items_all_pages(mock_mgr):
+    last_key = {"iditem": {"S": mock_mgr.data_items[1]["iditem"]}}
+    with mock_mgr.stub_runner(None, None) as runner:
+        runner.add(
+            mock_mgr.stubber.stub_scan,
+            mock_mgr.table.name,
+            mock_mgr.data_items[:2],
+            last_key=last_key,
+        )
+        runner.add(
+            mock_mgr.stubber.stub_scan,
+            mock_mgr.table.name,
+            mock_mgr.data_items[2:],
+            start_key={"iditem": mock_mgr.data_items[1]["iditem"]},
+        )
+
+    storage = Storage(mock_mgr.table, total_segments=1)
+    assert storage.get_work_items() == mock_mgr.data_items
+
+
 def test_get_item(mock_mgr):
     with mock_mgr.stub_runner(None, None) as runner:
         runner.add(
@@ -249,6 +272,8 @@ def test_report_small(mock_mgr, monkeypatch):
             mock_mgr.table.name,
             mock_mgr.data_items,
             filter_expression=ANY,
+            expression_attrs=ANY,
+            expression_attr_vals=ANY,
         )
         runner.add(
             mock_mgr.ses_stubber.stub_send_email,
@@ -274,6 +299,8 @@ def test_report_large(mock_mgr, monkeypatch):
             mock_mgr.table.name,
             work_items,
             filter_expression=ANY,
+            expression_attrs=ANY,
+            expression_attr_vals=ANY,
         )
         runner.add(
             mock_mgr.ses_stubber.stub_send_raw_email,
@@ -298,6 +325,8 @@ def test_report_error(mock_mgr, monkeypatch, err, stop_on):
             mock_mgr.table.name,
             mock_mgr.data_items,
             filter_expression=ANY,
+            expression_attrs=ANY,
+            expression_attr_vals=ANY,
         )
         runner.add(
             mock_mgr.ses_stubber.stub_send_email,
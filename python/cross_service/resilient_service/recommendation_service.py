@@ -3,11 +3,18 @@
 
 import json
 import logging
+import sys
 from typing import Any, Dict
 
 import boto3
 from botocore.exceptions import ClientError
 
+sys.path.append("../..")
+from demo_tools.dynamodb_batch_writer import (  # noqa
+    BatchWriteError,
+    ParallelBatchWriter,
+)
+
 log = logging.getLogger(__name__)
 
 
@@ -82,22 +89,32 @@ class RecommendationService:
         else:
             return response
 
-    def populate(self, data_file: str) -> None:
+    def populate(self, data_file: str, writer_count: int = 4) -> None:
         """
-        Populates the recommendations table from a JSON file.
+        Populates the recommendations table from a JSON file. Items are written in
+        batches of up to 25 by several threads, and unprocessed items are retried.
 
         :param data_file: The path to the data file.
+        :param writer_count: The number of threads that write to the table.
         :raises RecommendationServiceError: If the table population fails.
         """
         try:
             with open(data_file) as data:
                 items = json.load(data)
-            batch = [{"PutRequest": {"Item": item}} for item in items]
-            self.dynamodb_client.batch_write_item(RequestItems={self.table_name: batch})
+            writer = ParallelBatchWriter(
+                self.dynamodb_client,
+                self.table_name,
+                writer_count=writer_count,
+                key_names=["MediaType", "ItemId"],
+            )
+            stats = writer.put_items(items)
             log.info(
-                "Populated table %s with items from %s.", self.table_name, data_file
+                "Populated table %s with items from %s. %s",
+                self.table_name,
+                data_file,
+                stats,
             )
-        except ClientError as err:
+        except (ClientError, BatchWriteError) as err:
             raise RecommendationServiceError(
                 self.table_name, f"Couldn't populate table from {data_file}: {err}"
             )
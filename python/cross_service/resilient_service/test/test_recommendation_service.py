@@ -0,0 +1,61 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for recommendation_service.py.
+"""
+
+import json
+
+import boto3
+import pytest
+
+from recommendation_service import RecommendationService, RecommendationServiceError
+
+TABLE_NAME = "test-table"
+
+
+def make_items(count):
+    return [
+        {
+            "MediaType": {"S": "Book"},
+            "ItemId": {"N": str(index)},
+            "Title": {"S": f"test-title-{index}"},
+        }
+        for index in range(count)
+    ]
+
+
+# Items are sharded across writers by key, so with more than one writer a single
+# item keeps the order of the stubbed requests fixed.
+@pytest.mark.parametrize("writer_count, item_count", [(1, 3), (4, 1)])
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_populate(make_stubber, tmp_path, writer_count, item_count, error_code):
+    dynamodb_client = boto3.client("dynamodb")
+    dynamodb_stubber = make_stubber(dynamodb_client)
+    service = RecommendationService(TABLE_NAME, dynamodb_client)
+    items = make_items(item_count)
+    data_file = tmp_path / "items.json"
+    data_file.write_text(json.dumps(items))
+    requests = [{"PutRequest": {"Item": item}} for item in items]
+
+    if error_code is None and item_count > 1:
+        # The first request leaves one item unprocessed, and only it is resent.
+        dynamodb_stubber.stub_batch_write_item(
+            {TABLE_NAME: requests},
+            unprocessed_items={TABLE_NAME: requests[-1:]},
+            consumed_capacity=[],
+        )
+        dynamodb_stubber.stub_batch_write_item(
+            {TABLE_NAME: requests[-1:]}, consumed_capacity=[]
+        )
+    else:
+        dynamodb_stubber.stub_batch_write_item(
+            {TABLE_NAME: requests}, consumed_capacity=[], error_code=error_code
+        )
+
+    if error_code is None:
+        service.populate(str(data_file), writer_count=writer_count)
+    else:
+        with pytest.raises(RecommendationServiceError):
+            service.populate(str(data_file), writer_count=writer_count)
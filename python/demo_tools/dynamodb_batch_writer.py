@@ -0,0 +1,270 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A parallel bulk writer for Amazon DynamoDB that can be shared by code examples.
+
+Boto3's Table.batch_writer sends one BatchWriteItem request at a time. This writer
+shards write requests across several threads that each send their own requests,
+so large tables load in a fraction of the time.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from itertools import cycle
+
+from boto3.dynamodb.types import TypeSerializer
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = 25  # Amazon DynamoDB rejects a write batch larger than 25 items.
+MAX_BATCH_BYTES = 16 * 1024 * 1024  # Amazon DynamoDB rejects a write batch over 16 MB.
+
+
+class BatchWriteError(Exception):
+    pass
+
+
+def estimate_size(value):
+    """
+    Estimates the number of bytes that a request or attribute value adds to a
+    BatchWriteItem request.
+
+    :param value: A write request, or any part of one.
+    :return: The estimated size in bytes.
+    """
+    if isinstance(value, dict):
+        return sum(len(name.encode()) + estimate_size(v) for name, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, "value"):  # boto3.dynamodb.types.Binary
+        return len(value.value)
+    return len(str(value))
+
+
+class BatchWriteStats:
+    """Counters that describe a bulk load."""
+
+    def __init__(self):
+        self.items = 0
+        self.requests = 0
+        self.retries = 0
+        self.consumed_wcu = 0.0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items, consumed_capacity, retried):
+        with self._lock:
+            self.items += items
+            self.requests += 1
+            self.retries += int(retried)
+            self.consumed_wcu += sum(
+                capacity.get("CapacityUnits", 0) for capacity in consumed_capacity
+            )
+
+    @property
+    def items_per_second(self):
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Wrote {self.items} items in {self.seconds:.2f} seconds "
+            f"({self.items_per_second:.1f} items/s) with {self.requests} requests "
+            f"({self.retries} retries), consuming {self.consumed_wcu:.1f} WCU."
+        )
+
+
+class ParallelBatchWriter:
+    """
+    Writes items to an Amazon DynamoDB table by using several threads that each send
+    BatchWriteItem requests of up to 25 items and 16 MB. Unprocessed items are retried
+    with jittered exponential backoff.
+
+    Requests are sharded across threads. When key attribute names are given, every
+    request for the same key goes to the same thread, so requests for a key are sent
+    in order and a later request replaces an earlier one in the same batch.
+    """
+
+    def __init__(
+        self,
+        dynamodb_client,
+        table_name,
+        writer_count=4,
+        key_names=None,
+        serialize=False,
+        max_tries=8,
+    ):
+        """
+        :param dynamodb_client: A Boto3 DynamoDB client. Clients can be shared
+                                between threads.
+        :param table_name: The name of the table to write to.
+        :param writer_count: The number of threads that send requests.
+        :param key_names: The names of the key attributes of the table. When
+                          specified, requests with duplicate keys are deduplicated
+                          within a batch.
+        :param serialize: When True, items and keys are Python values, such as those
+                          used by a Boto3 Table resource, and are serialized to the
+                          DynamoDB attribute value format before they are sent.
+        :param max_tries: The maximum number of requests made for each batch.
+        """
+        self.dynamodb_client = dynamodb_client
+        self.table_name = table_name
+        self.writer_count = writer_count
+        self.key_names = key_names
+        self.serializer = TypeSerializer() if serialize else None
+        self.max_tries = max_tries
+        self.stats = BatchWriteStats()
+
+    def put_items(self, items):
+        """
+        Puts items into the table.
+
+        :param items: An iterable of items to put.
+        :return: The stats for the load.
+        """
+        return self.write({"PutRequest": {"Item": item}} for item in items)
+
+    def delete_items(self, keys):
+        """
+        Deletes items from the table.
+
+        :param keys: An iterable of the keys of the items to delete.
+        :return: The stats for the load.
+        """
+        return self.write({"DeleteRequest": {"Key": key}} for key in keys)
+
+    def write(self, write_requests):
+        """
+        Sends write requests to the table from several threads.
+
+        :param write_requests: An iterable of PutRequest or DeleteRequest dicts,
+                               in the format used by BatchWriteItem.
+        :return: The stats for the load.
+        """
+        self.stats = BatchWriteStats()
+        shards = [
+            queue.Queue(maxsize=MAX_BATCH_ITEMS * 4) for _ in range(self.writer_count)
+        ]
+        errors = []
+        writers = [
+            threading.Thread(target=self._run_writer, args=(shard, errors), daemon=True)
+            for shard in shards
+        ]
+        start = time.perf_counter()
+        for writer in writers:
+            writer.start()
+        try:
+            round_robin = cycle(shards)
+            for write_request in write_requests:
+                if errors:
+                    break
+                write_request = self._serialize_request(write_request)
+                key = self._request_key(write_request)
+                if key is None:
+                    shard = next(round_robin)
+                else:
+                    shard = shards[hash(key) % self.writer_count]
+                shard.put((write_request, key))
+        finally:
+            for shard in shards:
+                shard.put(None)
+            for writer in writers:
+                writer.join()
+            self.stats.seconds = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        logger.info("%s", self.stats)
+        return self.stats
+
+    def _serialize_request(self, write_request):
+        if self.serializer is None:
+            return write_request
+        if "PutRequest" in write_request:
+            item = write_request["PutRequest"]["Item"]
+            return {"PutRequest": {"Item": self._serialize(item)}}
+        key = write_request["DeleteRequest"]["Key"]
+        return {"DeleteRequest": {"Key": self._serialize(key)}}
+
+    def _serialize(self, attributes):
+        return {
+            name: self.serializer.serialize(value) for name, value in attributes.items()
+        }
+
+    def _request_key(self, write_request):
+        if self.key_names is None:
+            return None
+        if "PutRequest" in write_request:
+            attributes = write_request["PutRequest"]["Item"]
+        else:
+            attributes = write_request["DeleteRequest"]["Key"]
+        return tuple(repr(attributes[name]) for name in self.key_names)
+
+    def _run_writer(self, shard, errors):
+        """
+        Collects requests from a shard into batches and sends them until the shard
+        is closed or another writer fails.
+        """
+        batch = {}
+        batch_bytes = 0
+        anonymous_count = 0
+        closed = False
+        try:
+            while not errors:
+                entry = shard.get()
+                if entry is None:
+                    closed = True
+                    break
+                write_request, key = entry
+                request_bytes = estimate_size(write_request)
+                if (key not in batch and len(batch) == MAX_BATCH_ITEMS) or (
+                    batch_bytes + request_bytes > MAX_BATCH_BYTES
+                ):
+                    self._send_batch(list(batch.values()))
+                    batch = {}
+                    batch_bytes = 0
+                if key is None:
+                    key = anonymous_count
+                    anonymous_count += 1
+                batch[key] = write_request
+                batch_bytes += request_bytes
+            if batch and not errors:
+                self._send_batch(list(batch.values()))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            # Drain the shard so that the producer is never blocked on a full queue.
+            while not closed:
+                closed = shard.get() is None
+
+    def _send_batch(self, write_requests):
+        """
+        Sends one batch, retrying only the unprocessed items.
+        """
+        request_items = {self.table_name: write_requests}
+        for tries in range(self.max_tries):
+            response = self.dynamodb_client.batch_write_item(
+                RequestItems=request_items, ReturnConsumedCapacity="TOTAL"
+            )
+            unprocessed = response.get("UnprocessedItems", {})
+            unprocessed_count = sum(len(requests) for requests in unprocessed.values())
+            self.stats.record(
+                len(write_requests) - unprocessed_count,
+                response.get("ConsumedCapacity", []),
+                tries > 0,
+            )
+            if not unprocessed:
+                return
+            write_requests = unprocessed[self.table_name]
+            request_items = unprocessed
+            time.sleep(random.uniform(0, min(2**tries * 0.05, 5)))
+        raise BatchWriteError(
+            f"{unprocessed_count} items were still unprocessed after "
+            f"{self.max_tries} tries."
+        )
@@ -0,0 +1,157 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A parallel scanner for Amazon DynamoDB that can be shared by code examples.
+
+A single Scan reads one partition at a time, so scanning a large table with one
+caller is limited by the throughput of a single request stream. This scanner splits
+the table into segments with Segment and TotalSegments, scans each segment on its
+own thread, and streams items to the caller as pages arrive.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_DONE = object()
+
+
+def build_projection(attributes, attribute_names=None):
+    """
+    Builds a projection expression that reads only the specified attributes.
+    Every name is replaced by a placeholder, so reserved words such as 'year' and
+    names that contain special characters can be projected.
+
+    :param attributes: The attributes to read. Nested attributes are written as
+                       dotted paths, such as 'info.rating'.
+    :param attribute_names: Existing expression attribute names to add to.
+    :return: The ProjectionExpression and ExpressionAttributeNames parameters.
+    """
+    attribute_names = dict(attribute_names or {})
+    placeholders = {name: placeholder for placeholder, name in attribute_names.items()}
+    added = 0
+    paths = []
+    for attribute in attributes:
+        parts = []
+        for name in attribute.split("."):
+            if name not in placeholders:
+                placeholder = f"#p{added}"
+                added += 1
+                placeholders[name] = placeholder
+                attribute_names[placeholder] = name
+            parts.append(placeholders[name])
+        paths.append(".".join(parts))
+    return {
+        "ProjectionExpression": ", ".join(paths),
+        "ExpressionAttributeNames": attribute_names,
+    }
+
+
+def _build_filter(scan_kwargs):
+    """
+    Converts a FilterExpression condition object to an expression string.
+
+    Boto3 converts condition objects on each request by using an expression builder
+    that is shared by every request made with the same client, so it is not safe to
+    send them from several threads at once. Building the expression once up front
+    avoids this and lets every segment reuse it.
+    """
+    condition = scan_kwargs.get("FilterExpression")
+    if not isinstance(condition, ConditionBase):
+        return scan_kwargs
+    built = ConditionExpressionBuilder().build_expression(condition)
+    scan_kwargs = dict(scan_kwargs)
+    scan_kwargs["FilterExpression"] = built.condition_expression
+    scan_kwargs["ExpressionAttributeNames"] = {
+        **scan_kwargs.get("ExpressionAttributeNames", {}),
+        **built.attribute_name_placeholders,
+    }
+    if built.attribute_value_placeholders:
+        scan_kwargs["ExpressionAttributeValues"] = {
+            **scan_kwargs.get("ExpressionAttributeValues", {}),
+            **built.attribute_value_placeholders,
+        }
+    return scan_kwargs
+
+
+def parallel_scan(
+    table,
+    total_segments=4,
+    max_workers=None,
+    attributes=None,
+    max_pages_in_flight=None,
+    **scan_kwargs,
+):
+    """
+    Scans a table by using several threads that each read a segment of the table,
+    following LastEvaluatedKey until every page of the segment is read.
+
+    Items are yielded as soon as their page is received, so the whole table is never
+    held in memory. Items from different segments are interleaved and are not in any
+    particular order. When the caller stops iterating, segments that are still being
+    scanned stop after their current page.
+
+    :param table: A Boto3 DynamoDB Table object.
+    :param total_segments: The number of segments to split the table into. When this
+                           is 1, the table is scanned with an ordinary Scan.
+    :param max_workers: The number of threads that send Scan requests. Defaults to
+                        one thread for each segment.
+    :param attributes: The attributes to read from each item. When specified, only
+                       these attributes are returned by DynamoDB.
+    :param max_pages_in_flight: The maximum number of pages that are received but not
+                                yet yielded. When the caller falls behind, scanning
+                                threads wait instead of buffering more pages.
+    :param scan_kwargs: Other parameters to pass to each Scan request, such as
+                        FilterExpression.
+    :return: A generator of the items in the table.
+    """
+    scan_kwargs = _build_filter(scan_kwargs)
+    if attributes:
+        scan_kwargs.update(
+            build_projection(attributes, scan_kwargs.get("ExpressionAttributeNames"))
+        )
+    pages = queue.Queue(maxsize=max_pages_in_flight or total_segments * 2)
+    stop = threading.Event()
+
+    def scan_segment(segment):
+        segment_kwargs = dict(scan_kwargs)
+        if total_segments > 1:
+            segment_kwargs.update(Segment=segment, TotalSegments=total_segments)
+        try:
+            while not stop.is_set():
+                response = table.scan(**segment_kwargs)
+                pages.put(response.get("Items", []))
+                start_key = response.get("LastEvaluatedKey")
+                if start_key is None:
+                    break
+                segment_kwargs["ExclusiveStartKey"] = start_key
+        except Exception as error:
+            pages.put(error)
+        finally:
+            pages.put(_SEGMENT_DONE)
+
+    with ThreadPoolExecutor(max_workers=max_workers or total_segments) as executor:
+        for segment in range(total_segments):
+            executor.submit(scan_segment, segment)
+        remaining = total_segments
+        try:
+            while remaining:
+                page = pages.get()
+                if page is _SEGMENT_DONE:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            # Drain pages so that no scanning thread is blocked on a full queue.
+            stop.set()
+            while remaining:
+                if pages.get() is _SEGMENT_DONE:
+                    remaining -= 1
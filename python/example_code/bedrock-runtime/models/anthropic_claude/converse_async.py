@@ -3,16 +3,24 @@
 
 # snippet-start:[python.example_code.bedrock-runtime.async.Converse_AnthropicClaude]
 """
-Use the Conversation API to send a text message to Anthropic Claude. Streaming the
-responses allows running the requests in parallel, speeding overall throughput for
-several requests.
+Use the Conversation API to send text messages to Anthropic Claude concurrently
+from asyncio.
+
+Boto3 clients are blocking, so each request, including the iteration of its
+response stream, runs on a thread from a bounded executor. The event loop only
+receives the streamed text, which lets many requests stream at the same time.
+A semaphore limits how many requests are in flight, which keeps the number of
+threads and the request rate under control.
 """
 
 import asyncio
 import logging
 import time
 from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from os import environ
+from typing import Optional
 
 import boto3
 from botocore.exceptions import ClientError
@@ -25,73 +33,153 @@ client = boto3.client("bedrock-runtime", region_name="us-east-1")
 # Set the model ID, e.g., Claude 3 Haiku.
 model_id = "anthropic.claude-3-haiku-20240307-v1:0"
 
+# The maximum number of requests in flight at the same time.
+MAX_CONCURRENCY = 8
 
-async def converse_stream(user_message: str) -> AsyncIterator[str]:
-    """Call Bedrock Runtime streaming. Yield each text item in the stream. Add a sleep(0) to unblock the asyncio loop."""
-    conversation = [
-        {
-            "role": "user",
-            "content": [{"text": user_message}],
-        }
-    ]
+_END = object()
 
-    try:
-        yield f""""{user_message}":\n"""
 
+@dataclass
+class StreamMetrics:
+    """Timings of a single streamed response."""
+
+    prompt: str
+    time_to_first_token: Optional[float] = None
+    seconds: float = 0.0
+    output_tokens: int = 0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Output tokens per second after the first token arrived."""
+        if self.time_to_first_token is None:
+            return 0.0
+        generation_seconds = self.seconds - self.time_to_first_token
+        return self.output_tokens / generation_seconds if generation_seconds else 0.0
+
+
+def _stream_to_queue(user_message: str, queue: asyncio.Queue, loop) -> None:
+    """
+    Runs on an executor thread. Sends the request, iterates the blocking response
+    stream, and hands each event to the event loop.
+    """
+    try:
         # Send the message to the model, using a basic inference configuration.
         response = client.converse_stream(
             modelId=model_id,
-            messages=conversation,
+            messages=[{"role": "user", "content": [{"text": user_message}]}],
             inferenceConfig={"maxTokens": 512, "temperature": 0.5, "topP": 0.9},
         )
-
         for chunk in response["stream"]:
+            loop.call_soon_threadsafe(queue.put_nowait, chunk)
+    except Exception as e:
+        loop.call_soon_threadsafe(queue.put_nowait, e)
+    finally:
+        loop.call_soon_threadsafe(queue.put_nowait, _END)
+
+
+async def converse_stream(
+    user_message: str,
+    limiter: asyncio.Semaphore,
+    executor: ThreadPoolExecutor,
+    metrics: Optional[StreamMetrics] = None,
+) -> AsyncIterator[str]:
+    """
+    Call Bedrock Runtime streaming without blocking the event loop. Yield each text
+    item in the stream as it arrives.
+
+    :param user_message: The prompt to send.
+    :param limiter: A semaphore that limits the number of requests in flight.
+    :param executor: The executor that runs the blocking calls. It needs at least as
+                     many threads as the limiter allows requests.
+    :param metrics: Optional StreamMetrics that are filled in for this request.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    async with limiter:
+        start = time.perf_counter()
+        loop.run_in_executor(executor, _stream_to_queue, user_message, queue, loop)
+        while True:
+            chunk = await queue.get()
+            if chunk is _END:
+                break
+            if isinstance(chunk, Exception):
+                if isinstance(chunk, ClientError):
+                    print(f"ERROR: Can't invoke '{model_id}'. Reason: {chunk}")
+                raise chunk
             if "contentBlockDelta" in chunk:
                 text = chunk["contentBlockDelta"]["delta"]["text"]
-                print(f"In converse_stream {user_message} {text}")
+                if metrics is not None and metrics.time_to_first_token is None:
+                    metrics.time_to_first_token = time.perf_counter() - start
+                logging.debug("In converse_stream %s %s", user_message, text)
                 yield text
-            # This await sleep(0) is necessary to allow the asyncio runtime an
-            # opportunity to jump to other tasks in the block.
-            await asyncio.sleep(0)
-
-    except (ClientError, Exception) as e:
-        print(f"ERROR: Can't invoke '{model_id}'. Reason: {e}")
-        raise e
+            elif "metadata" in chunk and metrics is not None:
+                metrics.output_tokens = chunk["metadata"]["usage"]["outputTokens"]
+        if metrics is not None:
+            metrics.seconds = time.perf_counter() - start
 
 
 async def gather_stream(iterator: AsyncIterator[str]) -> str:
     return "".join([item async for item in iterator])
 
 
-def make_tasks():
-    prompts = [f"Count to {i * 10} in prime numbers" for i in range(2, 10)]
-    return [converse_stream(prompt) for prompt in prompts]
+async def run_prompts(prompts: list, max_concurrency: int = MAX_CONCURRENCY):
+    """
+    Stream responses to several prompts with up to max_concurrency requests in
+    flight.
+
+    :return: The response texts and a StreamMetrics for each prompt, in the order of
+             the prompts.
+    """
+    limiter = asyncio.Semaphore(max_concurrency)
+    metrics = [StreamMetrics(prompt) for prompt in prompts]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = await asyncio.gather(
+            *[
+                gather_stream(converse_stream(prompt, limiter, executor, stats))
+                for prompt, stats in zip(prompts, metrics)
+            ]
+        )
+    return results, metrics
 
 
-async def main():
-    start_parallel = time.time()
-    parallel_results = await asyncio.gather(
-        *[gather_stream(task) for task in make_tasks()]
+def print_report(label: str, seconds: float, metrics: list) -> None:
+    tokens = sum(stats.output_tokens for stats in metrics)
+    print(
+        f"{label}: {len(metrics)} requests in {seconds:.2f}s, "
+        f"{tokens / seconds:.1f} output tokens/s overall."
     )
-    end_parallel = time.time()
+    for stats in metrics:
+        print(
+            f"  {stats.prompt!r}: first token after {stats.time_to_first_token or 0:.2f}s, "
+            f"{stats.tokens_per_second:.1f} tokens/s, {stats.seconds:.2f}s total."
+        )
 
-    start_sequential = time.time()
-    sequential_results = [await gather_stream(task) for task in make_tasks()]
-    end_sequential = time.time()
 
-    logging.info("Parallel results: \n%s", parallel_results)
-    logging.info("Sequential results:\n%s", sequential_results)
+async def main():
+    prompts = [f"Count to {i * 10} in prime numbers" for i in range(2, 10)]
 
-    print(f"Parallel took {end_parallel - start_parallel}s")  # EG 2.7 seconds
-    print(f"Sequential took {end_sequential - start_sequential}s")  # EG 5.6 seconds
+    start_sequential = time.perf_counter()
+    sequential_results, sequential_metrics = await run_prompts(prompts, 1)
+    end_sequential = time.perf_counter()
 
+    start_concurrent = time.perf_counter()
+    concurrent_results, concurrent_metrics = await run_prompts(prompts)
+    end_concurrent = time.perf_counter()
+
+    logging.info("Sequential results:\n%s", sequential_results)
+    logging.info("Concurrent results: \n%s", concurrent_results)
+
+    print_report("Sequential", end_sequential - start_sequential, sequential_metrics)
+    print_report(
+        f"Concurrent (up to {MAX_CONCURRENCY} in flight)",
+        end_concurrent - start_concurrent,
+        concurrent_metrics,
+    )
     print(
         "\n"
-        "If you review the output of this program, you should see two sets of streaming log statements.\n"
-        'The first should intermix "Count to 20", "Count to 30", etc. The second set should not mix,\n'
-        'and be "Count to 20", "Count to 20", ... "Count to 90", " Count to 90".\n'
-        "\n"
-        "This shows the parallel nature of the first set of requests, and the sequential nature of the second set."
+        "The concurrent run should take about as long as its slowest request, while\n"
+        "the sequential run takes about as long as all requests added together.\n"
+        "Set LOG_LEVEL=DEBUG to see the streamed text of concurrent requests interleave."
     )
 
 
@@ -0,0 +1,73 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for models/anthropic_claude/converse_async.py.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+# This is needed so Python can find the example on the path.
+sys.path.append("models/anthropic_claude")
+import converse_async
+
+REQUEST_SECONDS = 0.2
+
+
+class FakeBedrockClient:
+    """Blocks like a real client and records how many requests overlap."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def converse_stream(self, modelId, messages, inferenceConfig):
+        if self.error is not None:
+            raise self.error
+        text = messages[0]["content"][0]["text"]
+        return {"stream": self._events(text)}
+
+    def _events(self, text):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            for word in text.split():
+                time.sleep(REQUEST_SECONDS / 2)
+                yield {"contentBlockDelta": {"delta": {"text": word}}}
+            yield {"metadata": {"usage": {"outputTokens": len(text.split())}}}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 2, 4])
+def test_run_prompts_overlaps_requests(monkeypatch, max_concurrency):
+    client = FakeBedrockClient()
+    monkeypatch.setattr(converse_async, "client", client)
+    prompts = [f"prompt {index}" for index in range(4)]
+
+    results, metrics = asyncio.run(converse_async.run_prompts(prompts, max_concurrency))
+
+    assert results == [prompt.replace(" ", "") for prompt in prompts]
+    assert client.max_in_flight == max_concurrency
+    for stats in metrics:
+        assert stats.output_tokens == 2
+        assert 0 < stats.time_to_first_token < stats.seconds
+        assert stats.tokens_per_second > 0
+
+
+def test_run_prompts_raises_error(monkeypatch):
+    monkeypatch.setattr(
+        converse_async, "client", FakeBedrockClient(error=RuntimeError("test error"))
+    )
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(converse_async.run_prompts(["prompt"]))
@@ -1,15 +1,28 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 import logging
+import re
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 import threading
 import boto3
+from botocore.config import Config
 
 from date_utilities import DateUtilities
+from result_sinks import ListSink, QueueSink, ResultBatch
 
 DEFAULT_QUERY = "fields @timestamp, @message | sort @timestamp asc"
 DEFAULT_LOG_GROUP = "/workflows/cloudwatch-logs/large-query"
+# CloudWatch Logs Insights allows 30 concurrent queries per account by default,
+# shared with dashboards and other users. Stay well under that by default.
+DEFAULT_MAX_CONCURRENT_QUERIES = 10
+# Adaptive polling starts fast for short queries and backs off for long ones.
+INITIAL_POLL_INTERVAL = 0.25
+MAX_POLL_INTERVAL = 5.0
+POLL_BACKOFF_FACTOR = 1.5
+QUERY_COMPLETE_STATUSES = ["Complete", "Failed", "Cancelled", "Timeout", "Unknown"]
+
 
 class DateOutOfBoundsError(Exception):
     """Exception raised when the date range for a query is out of bounds."""
@@ -26,14 +39,33 @@ class CloudWatchQuery:
     :vartype limit: int
     :log_group str: Name of the log group to query
     :query_string str: query
+    :client boto3.client: CloudWatch Logs client shared by all sub-queries
+    :max_concurrent_queries int: Maximum number of sub-queries that run at one time
+    :sink ListSink: Receives each batch of results as soon as its sub-query completes
     """
 
-    def __init__(self, log_group: str = DEFAULT_LOG_GROUP, query_string: str=DEFAULT_QUERY) -> None:
+    def __init__(
+        self,
+        log_group: str = DEFAULT_LOG_GROUP,
+        query_string: str = DEFAULT_QUERY,
+        client=None,
+        max_concurrent_queries: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+        sink=None,
+    ) -> None:
         self.lock = threading.Lock()
         self.log_group = log_group
         self.query_string = query_string
-        self.query_results = []
+        self.client = client or boto3.client(
+            "logs", config=Config(retries={"max_attempts": 10})
+        )
+        self.max_concurrent_queries = max_concurrent_queries
+        self.sink = sink if sink is not None else ListSink()
+        # With the default sink, query_results can be used like a list of rows.
+        self.query_results = self.sink
+        self.sort_order = self.find_timestamp_sort_order(query_string)
         self.query_duration = None
+        self.queries_run = 0
+        self.rows_returned = 0
         self.datetime_format = "%Y-%m-%d %H:%M:%S.%f"
         self.date_utilities = DateUtilities()
         self.limit = 10000
@@ -61,71 +93,118 @@ class CloudWatchQuery:
         end_time = datetime.now()
         self.query_duration = (end_time - start_time).total_seconds()
 
+    def iter_query_logs(self, date_range):
+        """
+        Executes a CloudWatch logs query in the background and yields batches of results
+        as each sub-query completes. This replaces the configured sink for the duration
+        of the query. The generator must be consumed to the end, because query workers
+        wait when batches are not being read.
+
+        :param date_range: The date range to fetch logs for, specified as a tuple (start_timestamp, end_timestamp).
+        :type date_range: tuple
+        :return: A generator of ResultBatch objects.
+        :rtype: generator
+        """
+        queue_sink = QueueSink()
+        configured_sink, self.sink = self.sink, queue_sink
+        error = []
+
+        def run_query():
+            try:
+                self.query_logs(date_range)
+            except Exception as e:
+                error.append(e)
+            finally:
+                queue_sink.close()
+
+        query_thread = threading.Thread(target=run_query, daemon=True)
+        query_thread.start()
+        yield from queue_sink
+        query_thread.join()
+        self.sink = configured_sink
+        if error:
+            raise error[0]
+
     def recursive_query(self, date_range):
         """
-        Processes logs within a given date range, fetching batches of logs recursively if necessary.
+        Processes logs within a given date range on a bounded pool of workers.
+
+        The date range is first split into one partition per worker. Each partition
+        is queried, and when a query returns the maximum number of logs, the rest of
+        its range is split in two and both halves are scheduled on the same pool.
+        Only `max_concurrent_queries` queries are ever in flight at one time.
 
         :param date_range: The date range to fetch logs for, specified as a tuple (start_timestamp, end_timestamp).
         :type date_range: tuple
-        :return: None if the recursive fetching is continued or stops when the final batch of logs is processed.
-                 Although it doesn't explicitly return the query results, this method accumulates all fetched logs
-                 in the `self.query_results` attribute.
+        :return: None. Although it doesn't explicitly return the query results, this method passes each
+                 batch of fetched logs to `self.sink` as soon as it completes.
         :rtype: None
         """
-        batch_of_logs = self.perform_query(date_range)
-        # Add the batch to the accumulated logs
-        with self.lock:
-            self.query_results.extend(batch_of_logs)
-        if len(batch_of_logs) == self.limit:
-            logging.info(f"Fetched {self.limit}, checking for more...")
-            most_recent_log = self.find_most_recent_log(batch_of_logs)
-            most_recent_log_timestamp = next(
-                item["value"]
-                for item in most_recent_log
-                if item["field"] == "@timestamp"
-            )
-            new_range = (most_recent_log_timestamp, date_range[1])
-            midpoint = self.date_utilities.find_middle_time(new_range)
-
-            first_half_thread = threading.Thread(
-                target=self.recursive_query,
-                args=((most_recent_log_timestamp, midpoint),),
-            )
-            second_half_thread = threading.Thread(
-                target=self.recursive_query, args=((midpoint, date_range[1]),)
-            )
-
-            first_half_thread.start()
-            second_half_thread.start()
-
-            first_half_thread.join()
-            second_half_thread.join()
-
-    def find_most_recent_log(self, logs):
-        """
-        Search a list of log items and return most recent log entry.
-        :param logs: A list of logs to analyze.
-        :return: log
-        :type :return List containing log item details
-        """
-        most_recent_log = None
-        most_recent_date = "1970-01-01 00:00:00.000"
-
-        for log in logs:
-            for item in log:
-                if item["field"] == "@timestamp":
-                    logging.debug(f"Compared: {item['value']} to {most_recent_date}")
-                    if (
-                        self.date_utilities.compare_dates(
-                            item["value"], most_recent_date
+        partitions = self.date_utilities.partition_date_range(
+            date_range, self.max_concurrent_queries
+        )
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_queries) as executor:
+            pending = {
+                executor.submit(self.query_date_range, partition)
+                for partition in partitions
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for remaining_range in future.result():
+                        pending.add(
+                            executor.submit(self.query_date_range, remaining_range)
                         )
-                        == item["value"]
-                    ):
-                        logging.debug(f"New most recent: {item['value']}")
-                        most_recent_date = item["value"]
-                        most_recent_log = log
-        logging.info(f"Most recent log date of batch: {most_recent_date}")
-        return most_recent_log
+
+    def query_date_range(self, date_range):
+        """
+        Queries a single date range and works out which ranges still need to be queried.
+
+        :param date_range: The date range to fetch logs for, specified as a tuple (start_timestamp, end_timestamp).
+        :type date_range: tuple
+        :return: The ranges that remain to be queried, which is empty when the query returned
+                 fewer than the maximum number of logs.
+        :rtype: list of tuples
+        """
+        batch_of_logs = ResultBatch.from_query_results(
+            self.perform_query(date_range), sort_order=self.sort_order
+        )
+        # Hand the batch to the sink as soon as it completes
+        with self.lock:
+            self.sink.write(batch_of_logs)
+            self.queries_run += 1
+            self.rows_returned += len(batch_of_logs)
+        if len(batch_of_logs) < self.limit:
+            return []
+
+        logging.info(f"Fetched {self.limit}, checking for more...")
+        most_recent_log_timestamp = batch_of_logs.max_timestamp
+        logging.info(f"Most recent log date of batch: {most_recent_log_timestamp}")
+        new_range = (most_recent_log_timestamp, date_range[1])
+        midpoint = self.date_utilities.find_middle_time(new_range)
+        return [(most_recent_log_timestamp, midpoint), (midpoint, date_range[1])]
+
+    @staticmethod
+    def find_timestamp_sort_order(query_string):
+        """
+        Finds whether a query sorts its results by @timestamp. When it does, the most
+        recent log of each batch can be read from one end of the batch instead of
+        being found by scanning every row.
+
+        :param query_string: The CloudWatch Logs Insights query.
+        :type query_string: str
+        :return: "asc" or "desc" when the last sort command of the query explicitly
+                 sorts by @timestamp; otherwise, None.
+        :rtype: str
+        """
+        sort_commands = re.findall(
+            r"\|\s*sort\s+(\S+)(?:\s+(asc|desc))?", query_string, re.IGNORECASE
+        )
+        if sort_commands:
+            field, order = sort_commands[-1]
+            if field == "@timestamp" and order:
+                return order.lower()
+        return None
 
     # snippet-start:[python.example_code.cloudwatch_logs.start_query]
     def perform_query(self, date_range):
@@ -137,42 +216,16 @@ class CloudWatchQuery:
         :return: A list containing the query results.
         :rtype: list
         """
-        client = boto3.client("logs")
         try:
-            try:
-                start_time = round(
-                    self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[0])
-                )
-                end_time = round(
-                    self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[1])
-                )
-                response = client.start_query(
-                    logGroupName=self.log_group,
-                    startTime=start_time,
-                    endTime=end_time,
-                    queryString=self.query_string,
-                    limit=self.limit,
-                )
-                query_id = response["queryId"]
-            except client.exceptions.ResourceNotFoundException as e:
-                raise DateOutOfBoundsError(f"Resource not found: {e}")
-            while True:
-                time.sleep(1)
-                results = client.get_query_results(queryId=query_id)
-                if results["status"] in [
-                    "Complete",
-                    "Failed",
-                    "Cancelled",
-                    "Timeout",
-                    "Unknown",
-                ]:
-                    return results.get("results", [])
+            query_id = self._initiate_query(self.client, date_range, self.limit)
         except DateOutOfBoundsError:
             return []
+        return self._wait_for_query_results(self.client, query_id)
 
     def _initiate_query(self, client, date_range, max_logs):
         """
-        Initiates the CloudWatch logs query.
+        Initiates the CloudWatch logs query. When the account's limit of concurrent
+        queries is reached, the query is retried with exponential backoff.
 
         :param date_range: A tuple representing the start and end datetime for the query.
         :type date_range: tuple
@@ -181,46 +234,50 @@ class CloudWatchQuery:
         :return: The query ID as a string.
         :rtype: str
         """
-        try:
-            start_time = round(
-                self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[0])
-            )
-            end_time = round(
-                self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[1])
-            )
-            response = client.start_query(
-                logGroupName=self.log_group,
-                startTime=start_time,
-                endTime=end_time,
-                queryString=self.query_string,
-                limit=max_logs,
-            )
-            return response["queryId"]
-        except client.exceptions.ResourceNotFoundException as e:
-            raise DateOutOfBoundsError(f"Resource not found: {e}")
+        start_time = round(
+            self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[0])
+        )
+        end_time = round(
+            self.date_utilities.convert_iso8601_to_unix_timestamp(date_range[1])
+        )
+        delay = 1
+        while True:
+            try:
+                response = client.start_query(
+                    logGroupName=self.log_group,
+                    startTime=start_time,
+                    endTime=end_time,
+                    queryString=self.query_string,
+                    limit=max_logs,
+                )
+                return response["queryId"]
+            except client.exceptions.ResourceNotFoundException as e:
+                raise DateOutOfBoundsError(f"Resource not found: {e}")
+            except client.exceptions.LimitExceededException:
+                logging.info(f"Too many concurrent queries, retrying in {delay}s...")
+                time.sleep(delay)
+                delay = min(delay * 2, 32)
 
     # snippet-end:[python.example_code.cloudwatch_logs.start_query]
 
     # snippet-start:[python.example_code.cloudwatch_logs.get_query_results]
     def _wait_for_query_results(self, client, query_id):
         """
-        Waits for the query to complete and retrieves the results.
+        Waits for the query to complete and retrieves the results. The polling
+        interval starts short and grows with each poll, so quick queries return
+        promptly and long queries don't waste calls.
 
         :param query_id: The ID of the initiated query.
         :type query_id: str
         :return: A list containing the results of the query.
         :rtype: list
         """
+        poll_interval = INITIAL_POLL_INTERVAL
         while True:
-            time.sleep(1)
+            time.sleep(poll_interval)
             results = client.get_query_results(queryId=query_id)
-            if results["status"] in [
-                "Complete",
-                "Failed",
-                "Cancelled",
-                "Timeout",
-                "Unknown",
-            ]:
+            if results["status"] in QUERY_COMPLETE_STATUSES:
                 return results.get("results", [])
+            poll_interval = min(poll_interval * POLL_BACKOFF_FACTOR, MAX_POLL_INTERVAL)
 
     # snippet-end:[python.example_code.cloudwatch_logs.get_query_results]
@@ -1,6 +1,55 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
+import warnings
 from datetime import datetime, timezone
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The same range boundaries and log timestamps are parsed many times while a
+# query is split, so parsed values are cached.
+PARSE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_iso8601(date_string):
+    """
+    Parses an ISO8601 date string into a datetime object. Results are cached, which is
+    safe because datetime objects are immutable.
+
+    :param date_string: The ISO8601 formatted date string.
+    :type date_string: str
+    :return: The corresponding Python datetime object.
+    :rtype: datetime
+    """
+    return datetime.fromisoformat(date_string)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def iso8601_to_unix_timestamp(date_string):
+    """
+    Converts an ISO8601 date string to a UNIX timestamp in milliseconds. Naive dates
+    and dates with a time zone are both treated as UTC wall-clock time. Results are cached.
+
+    :param date_string: The ISO8601 formatted date string.
+    :type date_string: str
+    :return: UNIX timestamp in milliseconds.
+    :rtype: float
+    """
+    dt = parse_iso8601(date_string)
+    return dt.replace(tzinfo=timezone.utc).timestamp() * 1000
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _matches_format(date_string, format_string):
+    try:
+        datetime.strptime(date_string, format_string)
+        return True
+    except ValueError:
+        return False
 
 
 class DateUtilities:
@@ -22,11 +71,7 @@ class DateUtilities:
         :return: True if the date_string matches the format_string, False otherwise.
         :rtype: bool
         """
-        try:
-            datetime.strptime(date_string, format_string)
-            return True
-        except ValueError:
-            return False
+        return _matches_format(date_string, format_string)
 
     def find_middle_time(self, date_range) -> tuple:
         """
@@ -35,8 +80,8 @@ class DateUtilities:
         - str: The middle time in ISO8601 format.
         """
         # Parse the ISO8601 formatted strings into datetime objects
-        dt1 = datetime.fromisoformat(date_range[0])
-        dt2 = datetime.fromisoformat(date_range[1])
+        dt1 = parse_iso8601(date_range[0])
+        dt2 = parse_iso8601(date_range[1])
 
         # Ensure dt1 is the earlier datetime
         if dt1 > dt2:
@@ -53,10 +98,33 @@ class DateUtilities:
 
         return middle_time.isoformat()
 
+    @staticmethod
+    def partition_date_range(date_range, partitions):
+        """
+        Splits a date range in ISO8601 format into equal, contiguous partitions.
+
+        :param date_range: Start and end date strings in ISO8601 format.
+        :type date_range: tuple
+        :param partitions: The number of partitions to create.
+        :type partitions: int
+        :return: List of tuples with the partitioned date ranges in ISO8601 format.
+        :rtype: list of tuples
+        """
+        start = parse_iso8601(date_range[0])
+        end = parse_iso8601(date_range[1])
+        partitions = max(1, partitions)
+        step = (end - start) / partitions
+        boundaries = (
+            [date_range[0]]
+            + [(start + step * index).isoformat() for index in range(1, partitions)]
+            + [date_range[1]]
+        )
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
     @staticmethod
     def format_iso8601(date_str):
         # Parse the ISO8601 date string
-        dt = datetime.fromisoformat(date_str)
+        dt = parse_iso8601(date_str)
 
         # Format date without microseconds
         date_without_microseconds = dt.strftime("%Y-%m-%dT%H:%M:%S")
@@ -115,7 +183,7 @@ class DateUtilities:
         :rtype: datetime
         """
         # date = datetime.strptime(iso8601, iso8601_format)
-        date = datetime.fromisoformat(iso8601)
+        date = parse_iso8601(iso8601)
         return date
 
     @staticmethod
@@ -153,9 +221,39 @@ class DateUtilities:
         :return: UNIX timestamp in milliseconds.
         :rtype: int
         """
-        dt = self.convert_iso8601_to_datetime(iso8601)
-        unix_timestamp = dt.replace(tzinfo=timezone.utc).timestamp()
-        return unix_timestamp * 1000
+        return iso8601_to_unix_timestamp(iso8601)
+
+    @staticmethod
+    def convert_iso8601_column_to_unix_timestamps(iso8601_values):
+        """
+        Converts a whole column of ISO 8601 date strings to UNIX timestamps in milliseconds
+        at once. When NumPy is installed and every value is a naive date, the column is
+        parsed in a single vectorized call; otherwise, each value is converted through the
+        cached scalar path.
+
+        :param iso8601_values: The ISO 8601 formatted date strings.
+        :type iso8601_values: list of str
+        :return: UNIX timestamps in milliseconds, as an int64 NumPy array when NumPy is
+                 installed; otherwise, as a list of ints.
+        :rtype: numpy.ndarray or list
+        """
+        if numpy is not None:
+            try:
+                with warnings.catch_warnings():
+                    # NumPy converts dates that have a time zone offset to UTC and warns
+                    # about it. The scalar path ignores the offset, so use it for those
+                    # values to get consistent results.
+                    warnings.simplefilter("error")
+                    return numpy.array(iso8601_values, dtype="datetime64[ms]").astype(
+                        numpy.int64
+                    )
+            except (ValueError, Warning):
+                pass
+            return numpy.array(
+                [round(iso8601_to_unix_timestamp(value)) for value in iso8601_values],
+                dtype=numpy.int64,
+            )
+        return [round(iso8601_to_unix_timestamp(value)) for value in iso8601_values]
 
     def convert_datetime_to_iso8601(self, datetime_obj):
         """
@@ -181,8 +279,8 @@ class DateUtilities:
         :return: The later of the two dates.
         :rtype: str
         """
-        date1 = datetime.fromisoformat(date_str1)
-        date2 = datetime.fromisoformat(date_str2)
+        date1 = parse_iso8601(date_str1)
+        date2 = parse_iso8601(date_str2)
 
         if date1 > date2:
             return date_str1
@@ -62,11 +62,13 @@ class CloudWatchLogsQueryRunner:
         except ValueError as e:
             logging.error(f"Error parsing date environment variables: {e}")
             sys.exit(1)
-        
+
         try:
             log_group = os.environ["QUERY_LOG_GROUP"]
         except KeyError:
-            logging.warning("No QUERY_LOG_GROUP environment variable, using default value")
+            logging.warning(
+                "No QUERY_LOG_GROUP environment variable, using default value"
+            )
             log_group = DEFAULT_QUERY_LOG_GROUP
 
         return query_start_date, query_end_date, log_group
@@ -95,7 +97,7 @@ class CloudWatchLogsQueryRunner:
         start_date_iso8601,
         end_date_iso8601,
         log_group="/workflows/cloudwatch-logs/large-query",
-        query="fields @timestamp, @message | sort @timestamp asc"
+        query="fields @timestamp, @message | sort @timestamp asc",
     ):
         """
         Creates a CloudWatchQuery instance and executes the query with provided date range.
@@ -111,12 +113,16 @@ class CloudWatchLogsQueryRunner:
         """
         cloudwatch_query = CloudWatchQuery(
             log_group=log_group,
-            query_string=query
+            query_string=query,
+            client=self.cloudwatch_logs_client,
         )
         cloudwatch_query.query_logs((start_date_iso8601, end_date_iso8601))
         logging.info("Query executed successfully.")
         logging.info(
-            f"Queries completed in {cloudwatch_query.query_duration} seconds. Total logs found: {len(cloudwatch_query.query_results)}"
+            f"Queries completed in {cloudwatch_query.query_duration} seconds. Total logs found: {cloudwatch_query.rows_returned}"
+        )
+        logging.info(
+            f"Ran {cloudwatch_query.queries_run} sub-queries with up to {cloudwatch_query.max_concurrent_queries} in flight."
         )
 
 
@@ -0,0 +1,206 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+import json
+import queue
+
+from date_utilities import DateUtilities
+
+TIMESTAMP_FIELD = "@timestamp"
+
+
+class ResultBatch:
+    """
+    A compact representation of the results of a single CloudWatch Logs query.
+
+    Instead of a list of `{"field": ..., "value": ...}` dicts for every row, the
+    field names are stored once per batch and each row is a tuple of values.
+
+    :ivar fields: The field names, in the order their values appear in each row.
+    :vartype fields: tuple
+    :ivar rows: The rows of the batch as tuples of values. A field that is missing
+                from a row has the value None.
+    :vartype rows: list of tuples
+    :ivar max_timestamp: The most recent @timestamp value in the batch.
+    :vartype max_timestamp: str
+    """
+
+    def __init__(self, fields, rows, max_timestamp=None):
+        self.fields = fields
+        self.rows = rows
+        self.max_timestamp = max_timestamp
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def from_query_results(cls, results, sort_order=None):
+        """
+        Converts the results returned by GetQueryResults to a compact batch.
+
+        :param results: The `results` list returned by GetQueryResults.
+        :type results: list
+        :param sort_order: "asc" or "desc" when the query sorts by @timestamp. The most
+                           recent timestamp is then read from the last or first row instead
+                           of scanning the whole batch.
+        :type sort_order: str, optional
+        :return: The compact batch.
+        :rtype: ResultBatch
+        """
+        field_index = {}
+        for row in results:
+            for item in row:
+                field_index.setdefault(item["field"], len(field_index))
+        fields = tuple(field_index)
+        rows = []
+        for row in results:
+            values = [None] * len(fields)
+            for item in row:
+                values[field_index[item["field"]]] = item["value"]
+            rows.append(tuple(values))
+
+        max_timestamp = None
+        timestamp_index = field_index.get(TIMESTAMP_FIELD)
+        if rows and timestamp_index is not None:
+            if sort_order == "asc":
+                max_timestamp = rows[-1][timestamp_index]
+            elif sort_order == "desc":
+                max_timestamp = rows[0][timestamp_index]
+            else:
+                # CloudWatch Logs timestamps have a fixed width, so they sort as strings.
+                max_timestamp = max(
+                    row[timestamp_index]
+                    for row in rows
+                    if row[timestamp_index] is not None
+                )
+        return cls(fields, rows, max_timestamp)
+
+    def unix_timestamps(self):
+        """
+        Converts the @timestamp column of the batch to UNIX timestamps in milliseconds
+        in a single batch call, which is much faster than parsing each row separately
+        when sorting or bucketing large batches.
+
+        :return: The timestamps in row order, or None when the batch has no @timestamp field.
+        :rtype: numpy.ndarray or list
+        """
+        if TIMESTAMP_FIELD not in self.fields:
+            return None
+        timestamp_index = self.fields.index(TIMESTAMP_FIELD)
+        return DateUtilities.convert_iso8601_column_to_unix_timestamps(
+            [row[timestamp_index] for row in self.rows]
+        )
+
+    def as_dicts(self):
+        """
+        :return: A generator of rows as dicts that map field names to values.
+        :rtype: generator
+        """
+        for row in self.rows:
+            yield {
+                field: value
+                for field, value in zip(self.fields, row)
+                if value is not None
+            }
+
+
+class ListSink:
+    """
+    A sink that keeps every batch in memory. This is the default sink.
+
+    The sink behaves like a read-only list of rows: `len` returns the total number
+    of rows and iterating it yields each row as a dict of field names to values.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.row_count = 0
+
+    def write(self, batch):
+        """
+        :param batch: The batch of results to keep.
+        :type batch: ResultBatch
+        """
+        self.batches.append(batch)
+        self.row_count += len(batch)
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return self.row_count
+
+    def __iter__(self):
+        for batch in self.batches:
+            yield from batch.as_dicts()
+
+
+class CallbackSink:
+    """A sink that passes each batch to a callback as soon as it completes."""
+
+    def __init__(self, callback):
+        """
+        :param callback: A function that is called with each ResultBatch.
+        :type callback: callable
+        """
+        self.callback = callback
+
+    def write(self, batch):
+        self.callback(batch)
+
+    def close(self):
+        pass
+
+
+class NdjsonFileSink:
+    """
+    A sink that streams each row to a newline-delimited JSON file, so rows
+    are not kept in memory.
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: The path of the file to write.
+        :type file_path: str
+        """
+        self.file = open(file_path, "w", encoding="utf-8")
+
+    def write(self, batch):
+        self.file.writelines(json.dumps(row) + "\n" for row in batch.as_dicts())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class QueueSink:
+    """
+    A sink that hands batches to a consumer thread through a bounded queue. When
+    the consumer falls behind, query workers block instead of buffering results.
+    """
+
+    _DONE = object()
+
+    def __init__(self, max_batches=4):
+        """
+        :param max_batches: The maximum number of batches waiting to be consumed.
+        :type max_batches: int
+        """
+        self.queue = queue.Queue(maxsize=max_batches)
+
+    def write(self, batch):
+        self.queue.put(batch)
+
+    def close(self):
+        self.queue.put(self._DONE)
+
+    def __iter__(self):
+        while True:
+            batch = self.queue.get()
+            if batch is self._DONE:
+                return
+            yield batch
@@ -0,0 +1,127 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for cloudwatch_query.py.
+"""
+
+import sys
+
+import boto3
+import pytest
+
+sys.path.append("../")
+import cloudwatch_query
+from cloudwatch_query import CloudWatchQuery
+from date_utilities import DateUtilities
+
+date_utilities = DateUtilities()
+
+
+def to_unix_timestamp(iso8601):
+    return round(date_utilities.convert_iso8601_to_unix_timestamp(iso8601))
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(cloudwatch_query.time, "sleep", lambda seconds: None)
+
+
+def test_partition_date_range():
+    partitions = date_utilities.partition_date_range(
+        ("2024-01-01 00:00:00", "2024-01-01 04:00:00"), 4
+    )
+    assert partitions == [
+        ("2024-01-01 00:00:00", "2024-01-01T01:00:00"),
+        ("2024-01-01T01:00:00", "2024-01-01T02:00:00"),
+        ("2024-01-01T02:00:00", "2024-01-01T03:00:00"),
+        ("2024-01-01T03:00:00", "2024-01-01 04:00:00"),
+    ]
+
+
+def test_recursive_query_splits_full_batches(make_stubber):
+    logs_client = boto3.client("logs")
+    logs_stubber = make_stubber(logs_client)
+    # A single worker keeps stubbed calls in the order they were added.
+    query = CloudWatchQuery(
+        log_group="test-group",
+        query_string="fields @timestamp",
+        client=logs_client,
+        max_concurrent_queries=1,
+    )
+    query.limit = 2
+    start, end = "2024-01-01 00:00:00", "2024-01-01 04:00:00"
+    first_batch = [
+        {"@timestamp": "2024-01-01 00:10:00.000"},
+        {"@timestamp": "2024-01-01 01:00:00.000"},
+    ]
+    midpoint = date_utilities.find_middle_time(("2024-01-01 01:00:00.000", end))
+    ranges = [
+        (start, end, first_batch),
+        ("2024-01-01 01:00:00.000", midpoint, [{"@timestamp": midpoint}]),
+        (midpoint, end, []),
+    ]
+    for index, (range_start, range_end, results) in enumerate(ranges):
+        logs_stubber.stub_start_query(
+            "test-group",
+            to_unix_timestamp(range_start),
+            to_unix_timestamp(range_end),
+            "fields @timestamp",
+            2,
+            f"query-{index}",
+        )
+        logs_stubber.stub_get_query_results(f"query-{index}", "Running", [])
+        logs_stubber.stub_get_query_results(f"query-{index}", "Complete", results)
+
+    query.recursive_query((start, end))
+
+    assert query.queries_run == 3
+    assert len(query.query_results) == 3
+
+
+def test_perform_query_retries_when_limit_exceeded(make_stubber):
+    logs_client = boto3.client("logs")
+    logs_stubber = make_stubber(logs_client)
+    query = CloudWatchQuery(
+        log_group="test-group", query_string="fields @timestamp", client=logs_client
+    )
+    date_range = ("2024-01-01 00:00:00", "2024-01-01 04:00:00")
+    start_query_args = (
+        "test-group",
+        to_unix_timestamp(date_range[0]),
+        to_unix_timestamp(date_range[1]),
+        "fields @timestamp",
+        query.limit,
+        "query-id",
+    )
+    logs_stubber.stub_start_query(
+        *start_query_args, error_code="LimitExceededException"
+    )
+    logs_stubber.stub_start_query(*start_query_args)
+    logs_stubber.stub_get_query_results(
+        "query-id", "Complete", [{"@timestamp": "2024-01-01 00:10:00.000"}]
+    )
+
+    assert query.perform_query(date_range) == [
+        [{"field": "@timestamp", "value": "2024-01-01 00:10:00.000"}]
+    ]
+
+
+def test_perform_query_out_of_bounds(make_stubber):
+    logs_client = boto3.client("logs")
+    logs_stubber = make_stubber(logs_client)
+    query = CloudWatchQuery(
+        log_group="test-group", query_string="fields @timestamp", client=logs_client
+    )
+    date_range = ("2024-01-01 00:00:00", "2024-01-01 04:00:00")
+    logs_stubber.stub_start_query(
+        "test-group",
+        to_unix_timestamp(date_range[0]),
+        to_unix_timestamp(date_range[1]),
+        "fields @timestamp",
+        query.limit,
+        "query-id",
+        error_code="ResourceNotFoundException",
+    )
+
+    assert query.perform_query(date_range) == []
@@ -0,0 +1,60 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for date_utilities.py.
+"""
+
+import sys
+
+import pytest
+
+sys.path.append("../")
+import date_utilities
+from date_utilities import DateUtilities, parse_iso8601
+
+TIMESTAMPS = [
+    "2024-01-01 00:00:00.000",
+    "2024-01-01T00:00:01.250",
+    "2024-01-02 12:30:00",
+]
+EXPECTED_MILLIS = [1704067200000, 1704067201250, 1704198600000]
+
+
+def test_scalar_parsing_is_cached():
+    parse_iso8601.cache_clear()
+    utilities = DateUtilities()
+
+    utilities.find_middle_time((TIMESTAMPS[0], TIMESTAMPS[2]))
+    utilities.compare_dates(TIMESTAMPS[0], TIMESTAMPS[2])
+
+    info = parse_iso8601.cache_info()
+    assert info.misses == 2
+    assert info.hits == 2
+    assert [
+        round(utilities.convert_iso8601_to_unix_timestamp(value))
+        for value in TIMESTAMPS
+    ] == EXPECTED_MILLIS
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_convert_iso8601_column_to_unix_timestamps(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(date_utilities, "numpy", None)
+
+    millis = DateUtilities.convert_iso8601_column_to_unix_timestamps(TIMESTAMPS)
+
+    assert list(millis) == EXPECTED_MILLIS
+
+
+def test_convert_iso8601_column_with_offsets_matches_scalar_path():
+    values = ["2024-01-01T00:00:00+02:00", "2024-01-01T00:00:00.500+00:00"]
+    utilities = DateUtilities()
+
+    millis = DateUtilities.convert_iso8601_column_to_unix_timestamps(values)
+
+    assert list(millis) == [
+        round(utilities.convert_iso8601_to_unix_timestamp(value)) for value in values
+    ]
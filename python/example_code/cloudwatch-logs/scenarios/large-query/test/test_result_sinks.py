@@ -0,0 +1,139 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for result_sinks.py and streaming CloudWatchQuery results.
+"""
+
+import json
+import sys
+
+import boto3
+import pytest
+
+sys.path.append("../")
+import cloudwatch_query
+from cloudwatch_query import CloudWatchQuery
+from date_utilities import DateUtilities
+from result_sinks import CallbackSink, ListSink, NdjsonFileSink, ResultBatch
+
+RESULTS = [
+    [
+        {"field": "@timestamp", "value": "2024-01-01 00:00:01.000"},
+        {"field": "@message", "value": "first"},
+    ],
+    [
+        {"field": "@timestamp", "value": "2024-01-01 00:00:03.000"},
+        {"field": "@ptr", "value": "ptr-2"},
+    ],
+    [
+        {"field": "@timestamp", "value": "2024-01-01 00:00:02.000"},
+        {"field": "@message", "value": "third"},
+    ],
+]
+
+
+@pytest.mark.parametrize(
+    "sort_order,max_timestamp",
+    [
+        ("asc", "2024-01-01 00:00:02.000"),
+        ("desc", "2024-01-01 00:00:01.000"),
+        (None, "2024-01-01 00:00:03.000"),
+    ],
+)
+def test_result_batch_from_query_results(sort_order, max_timestamp):
+    batch = ResultBatch.from_query_results(RESULTS, sort_order=sort_order)
+
+    assert batch.fields == ("@timestamp", "@message", "@ptr")
+    assert batch.rows == [
+        ("2024-01-01 00:00:01.000", "first", None),
+        ("2024-01-01 00:00:03.000", None, "ptr-2"),
+        ("2024-01-01 00:00:02.000", "third", None),
+    ]
+    assert batch.max_timestamp == max_timestamp
+    assert list(batch.as_dicts())[1] == {
+        "@timestamp": "2024-01-01 00:00:03.000",
+        "@ptr": "ptr-2",
+    }
+
+
+@pytest.mark.parametrize(
+    "query_string,sort_order",
+    [
+        ("fields @timestamp, @message | sort @timestamp asc", "asc"),
+        ("fields @timestamp | SORT @timestamp DESC | limit 20", "desc"),
+        ("fields @timestamp | sort @timestamp", None),
+        ("fields @timestamp | sort @timestamp asc | sort @message asc", None),
+        ("fields @timestamp, @message", None),
+    ],
+)
+def test_find_timestamp_sort_order(query_string, sort_order):
+    assert CloudWatchQuery.find_timestamp_sort_order(query_string) == sort_order
+
+
+def test_sinks(tmp_path):
+    batch = ResultBatch.from_query_results(RESULTS)
+    list_sink = ListSink()
+    callback_batches = []
+    callback_sink = CallbackSink(callback_batches.append)
+    ndjson_file = tmp_path / "results.ndjson"
+
+    with NdjsonFileSink(ndjson_file) as ndjson_sink:
+        for sink in (list_sink, callback_sink, ndjson_sink):
+            sink.write(batch)
+            sink.write(batch)
+
+    assert len(list_sink) == 6
+    assert list(list_sink)[0] == {
+        "@timestamp": "2024-01-01 00:00:01.000",
+        "@message": "first",
+    }
+    assert callback_batches == [batch, batch]
+    lines = ndjson_file.read_text().splitlines()
+    assert len(lines) == 6
+    assert json.loads(lines[2]) == {
+        "@timestamp": "2024-01-01 00:00:02.000",
+        "@message": "third",
+    }
+
+
+def test_iter_query_logs(make_stubber, monkeypatch):
+    monkeypatch.setattr(cloudwatch_query.time, "sleep", lambda seconds: None)
+    date_utilities = DateUtilities()
+    logs_client = boto3.client("logs")
+    logs_stubber = make_stubber(logs_client)
+    query = CloudWatchQuery(
+        log_group="test-group",
+        query_string="fields @timestamp | sort @timestamp asc",
+        client=logs_client,
+        max_concurrent_queries=1,
+    )
+    date_range = ("2024-01-01 00:00:00", "2024-01-01 04:00:00")
+    logs_stubber.stub_start_query(
+        "test-group",
+        round(date_utilities.convert_iso8601_to_unix_timestamp(date_range[0])),
+        round(date_utilities.convert_iso8601_to_unix_timestamp(date_range[1])),
+        "fields @timestamp | sort @timestamp asc",
+        query.limit,
+        "query-id",
+    )
+    logs_stubber.stub_get_query_results(
+        "query-id", "Complete", [{"@timestamp": "2024-01-01 00:10:00.000"}]
+    )
+
+    batches = list(query.iter_query_logs(date_range))
+
+    assert [batch.rows for batch in batches] == [[("2024-01-01 00:10:00.000",)]]
+    assert query.rows_returned == 1
+    assert isinstance(query.sink, ListSink)
+
+
+def test_result_batch_unix_timestamps():
+    batch = ResultBatch.from_query_results(RESULTS)
+
+    assert list(batch.unix_timestamps()) == [
+        1704067201000,
+        1704067203000,
+        1704067202000,
+    ]
+    assert ResultBatch(("@message",), [("no timestamp",)]).unix_timestamps() is None
@@ -10,7 +10,11 @@ detect entities, phrases, and more in a document.
 
 # snippet-start:[python.example_code.comprehend.ComprehendDetect_imports]
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
+import random
+import time
 import boto3
 from botocore.exceptions import ClientError
 
@@ -168,8 +172,216 @@ class ComprehendDetect:
         else:
             return tokens
 
+    # snippet-end:[python.example_code.comprehend.DetectSyntax]
 
-# snippet-end:[python.example_code.comprehend.DetectSyntax]
+    def batch_detect_entities(self, texts, language_code, **kwargs):
+        """
+        Detects entities in many documents by sending them in batches.
+
+        :param texts: An iterable of documents to inspect.
+        :param language_code: The language of the documents.
+        :param kwargs: Options passed to batch_detect.
+        :return: A generator of entity lists, in the order of the documents.
+        """
+        return self.batch_detect("entities", texts, language_code, **kwargs)
+
+    def batch_detect_key_phrases(self, texts, language_code, **kwargs):
+        """
+        Detects key phrases in many documents by sending them in batches.
+
+        :param texts: An iterable of documents to inspect.
+        :param language_code: The language of the documents.
+        :param kwargs: Options passed to batch_detect.
+        :return: A generator of key phrase lists, in the order of the documents.
+        """
+        return self.batch_detect("key_phrases", texts, language_code, **kwargs)
+
+    def batch_detect_pii(self, texts, language_code, **kwargs):
+        """
+        Detects PII in many documents. Amazon Comprehend has no batch API for PII,
+        so each document is sent in its own request, with several requests in
+        flight at once.
+
+        :param texts: An iterable of documents to inspect.
+        :param language_code: The language of the documents.
+        :param kwargs: Options passed to batch_detect.
+        :return: A generator of PII entity lists, in the order of the documents.
+        """
+        return self.batch_detect("pii", texts, language_code, **kwargs)
+
+    def batch_detect_sentiment(self, texts, language_code, **kwargs):
+        """
+        Detects the sentiment of many documents by sending them in batches.
+
+        :param texts: An iterable of documents to inspect.
+        :param language_code: The language of the documents.
+        :param kwargs: Options passed to batch_detect.
+        :return: A generator of dicts that contain Sentiment and SentimentScore, in
+                 the order of the documents.
+        """
+        return self.batch_detect("sentiment", texts, language_code, **kwargs)
+
+    def batch_detect_syntax(self, texts, language_code, **kwargs):
+        """
+        Detects syntax tokens in many documents by sending them in batches.
+
+        :param texts: An iterable of documents to inspect.
+        :param language_code: The language of the documents.
+        :param kwargs: Options passed to batch_detect.
+        :return: A generator of syntax token lists, in the order of the documents.
+        """
+        return self.batch_detect("syntax", texts, language_code, **kwargs)
+
+    def batch_detect(self, analysis, texts, language_code, max_workers=4, max_tries=3):
+        """
+        Runs an analysis on many documents with as few requests as possible.
+
+        Documents are grouped into batches of up to 25 and sent to the batch API of
+        the analysis, with several batches in flight at once. Documents that are
+        reported in the ErrorList of a response are sent again in a later request.
+        Documents that are too large for the batch API are sent to the single
+        document API instead.
+
+        :param analysis: The analysis to run. One of the keys of BATCH_ANALYSES.
+        :param texts: An iterable of documents to inspect. Documents are read as
+                      they are needed, so this can be a generator.
+        :param language_code: The language of the documents.
+        :param max_workers: The maximum number of requests in flight.
+        :param max_tries: The maximum number of times a document is sent.
+        :return: A generator of results in the order of the documents. A document
+                 that still fails after max_tries is returned as a DocumentError.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            for group in self._batch_groups(analysis, texts):
+                in_flight.append(
+                    executor.submit(
+                        self._detect_group, analysis, group, language_code, max_tries
+                    )
+                )
+                # Keep enough groups in flight to use every worker, but read the
+                # documents only as fast as results are consumed.
+                while len(in_flight) > max_workers * 2 or (
+                    in_flight and in_flight[0].done()
+                ):
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    @staticmethod
+    def _batch_groups(analysis, texts):
+        """
+        Groups documents into the batches that are sent in one request. A document
+        that is larger than the batch API allows is put in a group of its own.
+        """
+        batch_operation = BATCH_ANALYSES[analysis][0]
+        group = []
+        for text in texts:
+            if (
+                batch_operation is None
+                or len(text.encode("utf-8")) > BATCH_MAX_DOCUMENT_BYTES
+            ):
+                if group:
+                    yield group
+                    group = []
+                yield [text]
+                continue
+            group.append(text)
+            if len(group) == BATCH_MAX_DOCUMENTS:
+                yield group
+                group = []
+        if group:
+            yield group
+
+    def _detect_group(self, analysis, group, language_code, max_tries):
+        """
+        Sends a group of documents and retries the documents that fail.
+
+        :return: The results of the documents in the group, in order.
+        """
+        batch_operation, result_key, single_method = BATCH_ANALYSES[analysis]
+        if len(group) == 1 and (
+            batch_operation is None
+            or len(group[0].encode("utf-8")) > BATCH_MAX_DOCUMENT_BYTES
+        ):
+            result = getattr(self, single_method)(group[0], language_code)
+            if isinstance(result, dict):
+                result = {
+                    key: value
+                    for key, value in result.items()
+                    if key != "ResponseMetadata"
+                }
+            return [result]
+
+        results = [None] * len(group)
+        pending = list(range(len(group)))
+        for tries in range(max_tries):
+            if tries > 0:
+                time.sleep(random.uniform(0, min(2**tries * 0.1, 5)))
+            try:
+                response = getattr(self.comprehend_client, batch_operation)(
+                    TextList=[group[index] for index in pending],
+                    LanguageCode=language_code,
+                )
+            except ClientError as err:
+                if err.response["Error"]["Code"] not in BATCH_RETRYABLE_ERRORS:
+                    logger.exception(
+                        "Couldn't run %s on a batch of %s documents.",
+                        batch_operation,
+                        len(pending),
+                    )
+                    raise
+                continue
+            for result in response["ResultList"]:
+                index = pending[result.pop("Index")]
+                results[index] = result[result_key] if result_key else result
+            errors = {pending[error["Index"]]: error for error in response["ErrorList"]}
+            for index, error in errors.items():
+                results[index] = DocumentError(
+                    error["ErrorCode"], error["ErrorMessage"]
+                )
+            pending = sorted(errors)
+            if not pending:
+                break
+            logger.info("Retrying %s failed documents.", len(pending))
+        if pending:
+            logger.warning(
+                "Couldn't run %s on %s documents after %s tries.",
+                batch_operation,
+                len(pending),
+                max_tries,
+            )
+        return results
+
+
+# The batch API operation, the key of each result in its ResultList, and the single
+# document method for each analysis. A result key of None returns the whole result.
+# PII has no batch API, so its documents are always sent one at a time.
+BATCH_ANALYSES = {
+    "entities": ("batch_detect_entities", "Entities", "detect_entities"),
+    "key_phrases": ("batch_detect_key_phrases", "KeyPhrases", "detect_key_phrases"),
+    "pii": (None, None, "detect_pii"),
+    "sentiment": ("batch_detect_sentiment", None, "detect_sentiment"),
+    "syntax": ("batch_detect_syntax", "SyntaxTokens", "detect_syntax"),
+}
+BATCH_MAX_DOCUMENTS = 25
+BATCH_MAX_DOCUMENT_BYTES = 5000
+BATCH_RETRYABLE_ERRORS = ("ThrottlingException", "InternalServerException")
+
+
+class DocumentError:
+    """A document that could not be analyzed by a batch API."""
+
+    def __init__(self, error_code, message):
+        """
+        :param error_code: The error code reported by Amazon Comprehend.
+        :param message: The error message reported by Amazon Comprehend.
+        """
+        self.error_code = error_code
+        self.message = message
+
+    def __repr__(self):
+        return f"DocumentError({self.error_code}: {self.message})"
 
 
 # snippet-start:[python.example_code.comprehend.Usage_DetectApis]
@@ -222,6 +434,16 @@ def usage_demo():
     print(f"The first {demo_size} are:")
     pprint(syntax_tokens[:demo_size])
 
+    print("Detecting the sentiment of each paragraph in batches.")
+    paragraphs = [para.strip() for para in sample_text.split("\n\n") if para.strip()]
+    for paragraph, sentiment in zip(
+        paragraphs, comp_detect.batch_detect_sentiment(paragraphs, lang_code)
+    ):
+        if isinstance(sentiment, DocumentError):
+            print(f"{sentiment}: {paragraph[:60]}...")
+        else:
+            print(f"{sentiment['Sentiment']}: {paragraph[:60]}...")
+
     print("Thanks for watching!")
     print("-" * 88)
 
@@ -9,7 +9,8 @@ import boto3
 from botocore.exceptions import ClientError
 import pytest
 
-from comprehend_detect import ComprehendDetect
+import comprehend_detect
+from comprehend_detect import ComprehendDetect, DocumentError
 
 
 @pytest.mark.parametrize("error_code", [None, "TestException"])
@@ -172,3 +173,102 @@ def test_detect_syntax(make_stubber, error_code):
         with pytest.raises(ClientError) as exc_info:
             comp_detect.detect_syntax(text, language)
         assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_batch_detect_entities(make_stubber, monkeypatch, error_code):
+    comprehend_client = boto3.client("comprehend")
+    comprehend_stubber = make_stubber(comprehend_client)
+    comp_detect = ComprehendDetect(comprehend_client)
+    monkeypatch.setattr(comprehend_detect.time, "sleep", lambda seconds: None)
+    texts = [f"test-text-{index}" for index in range(30)]
+    large_text = "x" * (comprehend_detect.BATCH_MAX_DOCUMENT_BYTES + 1)
+    language = "fr"
+
+    def entities(text):
+        return [{"Text": text, "Type": "TEST", "BeginOffset": 0, "EndOffset": 1}]
+
+    comprehend_stubber.stub_batch_detect(
+        "batch_detect_entities",
+        texts[:25],
+        language,
+        {index: {"Entities": entities(texts[index])} for index in range(1, 24)},
+        errors={0: "InternalServerException", 24: "InternalServerException"},
+        error_code=error_code,
+    )
+    if error_code is None:
+        comprehend_stubber.stub_batch_detect(
+            "batch_detect_entities",
+            [texts[0], texts[24]],
+            language,
+            {0: {"Entities": entities(texts[0])}},
+            errors={1: "TextSizeLimitExceededException"},
+        )
+        comprehend_stubber.stub_batch_detect(
+            "batch_detect_entities",
+            [texts[24]],
+            language,
+            {},
+            errors={0: "TextSizeLimitExceededException"},
+        )
+        comprehend_stubber.stub_detect_entities(large_text, language, entities("large"))
+        comprehend_stubber.stub_batch_detect(
+            "batch_detect_entities",
+            texts[25:],
+            language,
+            {index: {"Entities": entities(texts[25 + index])} for index in range(5)},
+        )
+
+    # Documents are read one at a time, as they would be from a large corpus.
+    corpus = iter(texts[:25] + [large_text] + texts[25:])
+    if error_code is None:
+        results = list(
+            comp_detect.batch_detect_entities(corpus, language, max_workers=1)
+        )
+        assert len(results) == 31
+        assert results[0] == entities(texts[0])
+        assert results[1:24] == [entities(text) for text in texts[1:24]]
+        assert isinstance(results[24], DocumentError)
+        assert results[24].error_code == "TextSizeLimitExceededException"
+        assert results[25] == entities("large")
+        assert results[26:] == [entities(text) for text in texts[25:]]
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            list(comp_detect.batch_detect_entities(corpus, language, max_workers=1))
+        assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_batch_detect_sentiment(make_stubber):
+    comprehend_client = boto3.client("comprehend")
+    comprehend_stubber = make_stubber(comprehend_client)
+    comp_detect = ComprehendDetect(comprehend_client)
+    texts = ["test-text-1", "test-text-2"]
+    language = "fr"
+    sentiments = [
+        {"Sentiment": "POSITIVE", "SentimentScore": {"Positive": 1.0}},
+        {"Sentiment": "NEGATIVE", "SentimentScore": {"Negative": 1.0}},
+    ]
+
+    comprehend_stubber.stub_batch_detect(
+        "batch_detect_sentiment", texts, language, dict(enumerate(sentiments))
+    )
+
+    assert list(comp_detect.batch_detect_sentiment(texts, language)) == sentiments
+
+
+def test_batch_detect_pii_uses_single_requests(make_stubber):
+    comprehend_client = boto3.client("comprehend")
+    comprehend_stubber = make_stubber(comprehend_client)
+    comp_detect = ComprehendDetect(comprehend_client)
+    texts = ["test-text-1", "test-text-2"]
+    language = "fr"
+    entities = [
+        [{"Score": 1.0, "Type": "NAME", "BeginOffset": 0, "EndOffset": index}]
+        for index in range(len(texts))
+    ]
+
+    for text, text_entities in zip(texts, entities):
+        comprehend_stubber.stub_detect_pii_entities(text, language, text_entities)
+
+    got_entities = list(comp_detect.batch_detect_pii(texts, language, max_workers=1))
+    assert got_entities == entities
@@ -21,6 +21,7 @@ import logging
 import os
 from pprint import pprint
 import requests
+import sys
 from zipfile import ZipFile
 import boto3
 from boto3.dynamodb.conditions import Key
@@ -30,6 +31,10 @@ from question import Question
 logger = logging.getLogger(__name__)
 # snippet-end:[python.example_code.dynamodb.helper.Movies.imports]
 
+# Add relative path to include demo_tools in this code example without need for setup.
+sys.path.append("../../..")
+from demo_tools.dynamodb_parallel_scan import parallel_scan  # noqa
+
 
 # snippet-start:[python.example_code.dynamodb.helper.Movies.class_full]
 # snippet-start:[python.example_code.dynamodb.helper.Movies.class_decl]
@@ -339,6 +344,37 @@ class Movies:
 
     # snippet-end:[python.example_code.dynamodb.Scan]
 
+    def scan_movies_parallel(self, year_range, total_segments=4, max_workers=None):
+        """
+        Scans for movies that were released in a range of years by scanning several
+        segments of the table at the same time. Movies are returned as soon as they
+        are read, so even a very large table is never held in memory at once.
+
+        :param year_range: The range of years to retrieve.
+        :param total_segments: The number of segments to split the table into.
+        :param max_workers: The number of threads that scan segments. Defaults to
+                            one thread for each segment.
+        :return: A generator of the movies released in the specified years. Movies
+                 are not returned in any particular order.
+        """
+        try:
+            yield from parallel_scan(
+                self.table,
+                total_segments,
+                max_workers,
+                attributes=["year", "title", "info.rating"],
+                FilterExpression=Key("year").between(
+                    year_range["first"], year_range["second"]
+                ),
+            )
+        except ClientError as err:
+            logger.error(
+                "Couldn't scan for movies. Here's why: %s: %s",
+                err.response["Error"]["Code"],
+                err.response["Error"]["Message"],
+            )
+            raise
+
     # snippet-start:[python.example_code.dynamodb.DeleteItem]
     def delete_movie(self, title, year):
         """
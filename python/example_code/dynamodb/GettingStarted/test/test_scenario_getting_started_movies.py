@@ -149,6 +149,62 @@ def test_list_tables(make_stubber, error_code):
         assert exc_info.value.response["Error"]["Code"] == error_code
 
 
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_scan_movies_parallel(make_stubber, error_code):
+    dynamodb_resource = boto3.resource("dynamodb")
+    dynamodb_stubber = make_stubber(dynamodb_resource.meta.client)
+    movies = scenario.Movies(dynamodb_resource)
+    movies.table = dynamodb_resource.Table("test-table")
+    movie_data = [
+        {"title": f"Movie {index}", "year": 1990 + index, "info": {"rating": index}}
+        for index in range(6)
+    ]
+    scan_params = {
+        "filter_expression": "#n0 BETWEEN :v0 AND :v1",
+        "projection_expression": "#n0, #p0, #p1.#p2",
+        "expression_attrs": {
+            "#n0": "year",
+            "#p0": "title",
+            "#p1": "info",
+            "#p2": "rating",
+        },
+        "expression_attr_vals": {":v0": 1990, ":v1": 2000},
+        "total_segments": 2,
+    }
+    last_key = {"year": {"N": "1991"}, "title": {"S": "Movie 1"}}
+
+    # A single worker scans the segments in order, which keeps stubbed calls in order.
+    dynamodb_stubber.stub_scan(
+        movies.table.name,
+        movie_data[:2],
+        segment=0,
+        last_key=last_key,
+        error_code=error_code,
+        **scan_params,
+    )
+    if error_code is None:
+        dynamodb_stubber.stub_scan(
+            movies.table.name,
+            movie_data[2:4],
+            segment=0,
+            start_key={"year": 1991, "title": "Movie 1"},
+            **scan_params,
+        )
+        dynamodb_stubber.stub_scan(
+            movies.table.name, movie_data[4:], segment=1, **scan_params
+        )
+
+    got_movies = movies.scan_movies_parallel(
+        {"first": 1990, "second": 2000}, total_segments=2, max_workers=1
+    )
+    if error_code is None:
+        assert list(got_movies) == movie_data
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            list(got_movies)
+        assert exc_info.value.response["Error"]["Code"] == error_code
+
+
 @pytest.mark.integ
 def test_run_scenario_integ(monkeypatch):
     dynamodb_resource = boto3.resource("dynamodb")
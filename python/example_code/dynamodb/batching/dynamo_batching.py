@@ -18,10 +18,16 @@ import json
 import logging
 import os
 import pprint
+import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import boto3
 from botocore.exceptions import ClientError
 
+# Add relative path to include demo_tools in this code example without need for setup.
+sys.path.append("../../..")
+from demo_tools.dynamodb_batch_writer import ParallelBatchWriter
+
 logger = logging.getLogger(__name__)
 dynamodb = boto3.resource("dynamodb")
 
@@ -109,6 +115,118 @@ def do_batch_get(batch_keys):
 # snippet-end:[python.example_code.dynamodb.BatchGetItem]
 
 
+def _hashable_key(key):
+    """
+    Makes a hashable version of an item key so that duplicate keys can be detected.
+
+    :param key: The key of an item, such as {"year": 1999, "title": "The Matrix"}.
+    :return: The key as a sorted tuple of (attribute name, value) pairs.
+    """
+    return tuple(sorted(key.items()))
+
+
+def _chunk_batch_keys(table_keys, table_options, seen_keys):
+    """
+    Groups a stream of keys into batch_get_item requests of at most MAX_GET_SIZE
+    keys. Keys that have already been requested are skipped.
+
+    :param table_keys: An iterable of (table name, key) tuples.
+    :param table_options: Additional request parameters for each table, such as
+                          ProjectionExpression or ConsistentRead.
+    :param seen_keys: The set of (table name, key) pairs that were already requested.
+    :return: A generator of RequestItems dicts.
+    """
+    request_items = {}
+    key_count = 0
+    for table_name, key in table_keys:
+        seen_key = (table_name, _hashable_key(key))
+        if seen_key in seen_keys:
+            continue
+        seen_keys.add(seen_key)
+        if table_name not in request_items:
+            request_items[table_name] = {
+                "Keys": [],
+                **table_options.get(table_name, {}),
+            }
+        request_items[table_name]["Keys"].append(key)
+        key_count += 1
+        if key_count == MAX_GET_SIZE:
+            yield request_items
+            request_items = {}
+            key_count = 0
+    if request_items:
+        yield request_items
+
+
+def _get_batch_with_retries(batch_keys, max_tries):
+    """
+    Gets one batch of items and retries only the unprocessed keys, sleeping for an
+    exponentially increasing time between requests.
+
+    :param batch_keys: The RequestItems for a single batch_get_item request.
+    :param max_tries: The maximum number of requests to make for the batch.
+    :return: The retrieved items grouped under their respective table names.
+    """
+    retrieved = {}
+    sleepy_time = 1  # Start with 1 second of sleep, then exponentially increase.
+    for tries in range(max_tries):
+        response = dynamodb.batch_get_item(RequestItems=batch_keys)
+        for table_name, items in response.get("Responses", {}).items():
+            retrieved.setdefault(table_name, []).extend(items)
+        batch_keys = response["UnprocessedKeys"]
+        if not batch_keys:
+            break
+        if tries < max_tries - 1:
+            logger.info("Sleeping for %s seconds.", sleepy_time)
+            time.sleep(sleepy_time)
+            sleepy_time = min(sleepy_time * 2, 32)
+    else:
+        unprocessed_count = sum(len(keys["Keys"]) for keys in batch_keys.values())
+        logger.error(
+            "%s keys were still unprocessed after %s tries.",
+            unprocessed_count,
+            max_tries,
+        )
+    return retrieved
+
+
+def batch_get_all(table_keys, table_options=None, max_workers=4, max_tries=8):
+    """
+    Gets any number of items from one or more Amazon DynamoDB tables.
+
+    The keys are deduplicated and grouped into batch_get_item requests of at most
+    100 keys, and several requests run concurrently. Amazon DynamoDB also limits a
+    batch_get_item response to 16 MB and returns the keys that didn't fit as
+    unprocessed keys. Only those unprocessed keys are retried. Items are yielded
+    as each request completes, so callers can process them before all keys are
+    retrieved.
+
+    :param table_keys: An iterable of (table name, key) tuples. The iterable can be
+                       a generator and is consumed as requests are sent.
+    :param table_options: Optional additional request parameters for each table,
+                          such as {"movies": {"ProjectionExpression": "title"}}.
+    :param max_workers: The maximum number of requests that run concurrently.
+    :param max_tries: The maximum number of requests made for each batch of keys.
+    :return: A generator of (table name, list of items) tuples.
+    """
+    table_options = table_options or {}
+    batches = _chunk_batch_keys(table_keys, table_options, set())
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for batch_keys in batches:
+            pending.add(executor.submit(_get_batch_with_retries, batch_keys, max_tries))
+            # Bound the number of queued requests so that keys are read lazily.
+            if len(pending) < max_workers * 2:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result().items()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result().items()
+
+
 # snippet-start:[python.example_code.dynamodb.PutItem_BatchWriter]
 def fill_table(table, table_data):
     """
@@ -137,6 +255,39 @@ def fill_table(table, table_data):
 # snippet-end:[python.example_code.dynamodb.PutItem_BatchWriter]
 
 
+def fill_table_parallel(table, table_data, key_names, writer_count=4):
+    """
+    Fills an Amazon DynamoDB table with the specified data by using several threads
+    that each send their own batches of up to 25 items. Unlike Table.batch_writer,
+    which sends one batch at a time, this keeps several batches in flight.
+
+    :param table: The table to fill.
+    :param table_data: The data to put in the table. Each item must contain at least
+                       the keys required by the schema that was specified when the
+                       table was created.
+    :param key_names: The names of the key attributes of the table. Items with the
+                      same key are always written by the same thread, and a later
+                      item overwrites an earlier one in the same batch.
+    :param writer_count: The number of threads that write to the table.
+    :return: Statistics about the load, such as items/s and consumed write capacity.
+    """
+    writer = ParallelBatchWriter(
+        table.meta.client,
+        table.name,
+        writer_count=writer_count,
+        key_names=key_names,
+        serialize=True,
+    )
+    try:
+        stats = writer.put_items(table_data)
+        logger.info("Loaded data into table %s. %s", table.name, stats)
+    except ClientError:
+        logger.exception("Couldn't load data into table %s.", table.name)
+        raise
+    else:
+        return stats
+
+
 # snippet-start:[python.example_code.dynamodb.BatchGetItem_CallBatchGet]
 def get_batch_data(movie_table, movie_list, actor_table, actor_list):
     """
@@ -322,8 +473,9 @@ def usage_demo():
     actor_table = create_table(f"demo-batch-actors-{time.time_ns()}", actor_schema)
     print(f"Created {movie_table.name} and {actor_table.name}.")
 
-    print(f"Putting {len(movie_data)} movies into {movie_table.name}.")
-    fill_table(movie_table, movie_data)
+    print(f"Putting {len(movie_data)} movies into {movie_table.name} in parallel.")
+    stats = fill_table_parallel(movie_table, movie_data, ["year", "title"])
+    print(stats)
 
     print(f"Putting {len(actor_data)} actors into {actor_table.name}.")
     fill_table(actor_table, actor_data)
@@ -343,6 +495,22 @@ def usage_demo():
     print(f"The first 2 actors returned are: ")
     pprint.pprint(items[actor_table.name][:2])
 
+    print(
+        f"Getting all {len(movie_data)} movies and {len(actor_data)} actors with "
+        f"concurrent requests."
+    )
+    all_keys = [
+        (movie_table.name, {"year": movie["year"], "title": movie["title"]})
+        for movie in movie_data
+    ] + [(actor_table.name, {"name": actor["name"]}) for actor in actor_data]
+    item_counts = {movie_table.name: 0, actor_table.name: 0}
+    for table_name, table_items in batch_get_all(all_keys):
+        item_counts[table_name] += len(table_items)
+    print(
+        f"Got {item_counts[movie_table.name]} movies and "
+        f"{item_counts[actor_table.name]} actors."
+    )
+
     print(
         "Archiving the first 10 movies by creating a table to store archived "
         "movies and deleting them from the main movie table."
@@ -210,3 +210,145 @@ def test_archive_movies(
         with pytest.raises(ClientError) as exc_info:
             dynamo_batching.archive_movies(movie_table, movie_list)
         assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_batch_get_all(make_stubber, monkeypatch):
+    dyn_stubber = make_stubber(dynamo_batching.dynamodb.meta.client)
+    monkeypatch.setattr(time, "sleep", lambda x: None)
+    movie_keys = [("movie-test", {"year": index}) for index in range(120)]
+    actor_keys = [("actor-test", {"name": f"actor-{index}"}) for index in range(30)]
+    # Duplicate keys are only requested once.
+    table_keys = movie_keys + actor_keys + movie_keys[:10]
+    first_request = {
+        "movie-test": {
+            "Keys": [{"year": index} for index in range(100)],
+            "ProjectionExpression": "title",
+        }
+    }
+    second_request = {
+        "movie-test": {
+            "Keys": [{"year": index} for index in range(100, 120)],
+            "ProjectionExpression": "title",
+        },
+        "actor-test": {"Keys": [{"name": f"actor-{index}"} for index in range(30)]},
+    }
+    # Responses are stubbed in their serialized form, requests in their Python form.
+    unprocessed = {
+        "movie-test": {
+            "Keys": [{"year": {"N": str(index)}} for index in range(90, 100)],
+            "ProjectionExpression": "title",
+        }
+    }
+    retry_request = {
+        "movie-test": {
+            "Keys": [{"year": index} for index in range(90, 100)],
+            "ProjectionExpression": "title",
+        }
+    }
+
+    dyn_stubber.stub_batch_get_item(
+        first_request,
+        response_items={
+            "movie-test": [{"title": {"S": f"title-{index}"}} for index in range(90)]
+        },
+        unprocessed_keys=unprocessed,
+    )
+    dyn_stubber.stub_batch_get_item(
+        retry_request,
+        response_items={
+            "movie-test": [
+                {"title": {"S": f"title-{index}"}} for index in range(90, 100)
+            ]
+        },
+    )
+    dyn_stubber.stub_batch_get_item(
+        second_request,
+        response_items={
+            "movie-test": [
+                {"title": {"S": f"title-{index}"}} for index in range(100, 120)
+            ],
+            "actor-test": [{"name": {"S": f"actor-{index}"}} for index in range(30)],
+        },
+    )
+
+    # A single worker keeps stubbed calls in the order they were added.
+    got_items = {}
+    for table_name, items in dynamo_batching.batch_get_all(
+        iter(table_keys),
+        table_options={"movie-test": {"ProjectionExpression": "title"}},
+        max_workers=1,
+    ):
+        got_items.setdefault(table_name, []).extend(items)
+
+    assert len(got_items["movie-test"]) == 120
+    assert len(got_items["actor-test"]) == 30
+
+
+def test_fill_table_parallel(make_stubber, monkeypatch):
+    dyn_stubber = make_stubber(dynamo_batching.dynamodb.meta.client)
+    monkeypatch.setattr(time, "sleep", lambda x: None)
+    table = dynamo_batching.dynamodb.Table("test-table")
+    table_data = [{"year": index, "title": f"title-{index}"} for index in range(30)]
+    # The last item replaces an earlier item with the same key in its batch.
+    table_data.append({"year": 29, "title": "title-29", "rating": 5})
+
+    def put_requests(items):
+        return [
+            {
+                "PutRequest": {
+                    "Item": {
+                        name: {"N": str(value)} if name != "title" else {"S": value}
+                        for name, value in item.items()
+                    }
+                }
+            }
+            for item in items
+        ]
+
+    first_batch = put_requests(table_data[:25])
+    second_batch = put_requests(table_data[25:29] + table_data[30:])
+    dyn_stubber.stub_batch_write_item(
+        {table.name: first_batch},
+        unprocessed_items={table.name: first_batch[20:]},
+        consumed_capacity=[{"TableName": table.name, "CapacityUnits": 20.0}],
+    )
+    dyn_stubber.stub_batch_write_item(
+        {table.name: first_batch[20:]},
+        consumed_capacity=[{"TableName": table.name, "CapacityUnits": 5.0}],
+    )
+    dyn_stubber.stub_batch_write_item(
+        {table.name: second_batch},
+        consumed_capacity=[{"TableName": table.name, "CapacityUnits": 5.0}],
+    )
+
+    # A single writer keeps stubbed calls in the order they were added.
+    stats = dynamo_batching.fill_table_parallel(
+        table, table_data, ["year", "title"], writer_count=1
+    )
+
+    assert stats.items == 30
+    assert stats.requests == 3
+    assert stats.retries == 1
+    assert stats.consumed_wcu == 30.0
+
+
+def test_fill_table_parallel_error(make_stubber):
+    dyn_stubber = make_stubber(dynamo_batching.dynamodb.meta.client)
+    table = dynamo_batching.dynamodb.Table("test-table")
+    table_data = [{"title": f"title-{index}"} for index in range(3)]
+    dyn_stubber.stub_batch_write_item(
+        {
+            table.name: [
+                {"PutRequest": {"Item": {"title": {"S": item["title"]}}}}
+                for item in table_data
+            ]
+        },
+        consumed_capacity=[],
+        error_code="TestException",
+    )
+
+    with pytest.raises(ClientError) as exc_info:
+        dynamo_batching.fill_table_parallel(
+            table, table_data, ["title"], writer_count=1
+        )
+    assert exc_info.value.response["Error"]["Code"] == "TestException"
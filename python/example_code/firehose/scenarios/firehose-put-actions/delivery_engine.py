@@ -0,0 +1,276 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List
+
+import backoff
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Firehose rejects a PutRecordBatch request of more than 500 records or 4 MiB.
+MAX_BATCH_RECORDS = 500
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+# Firehose rejects a record larger than 1,000 KiB.
+MAX_RECORD_BYTES = 1000 * 1024
+
+# Errors that fail the whole request but can succeed when the request is sent again.
+RETRYABLE_ERROR_CODES = ("ServiceUnavailableException", "ThrottlingException")
+
+_DONE = object()
+
+
+def serialize_json_line(record: dict) -> bytes:
+    """
+    Serialize a record as a line of JSON.
+
+    Args:
+        record (dict): The data record.
+
+    Returns:
+        bytes: The record as UTF-8 encoded JSON followed by a newline, so that
+        records delivered to Amazon S3 can be read one per line.
+    """
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+class DeliveryStats:
+    """
+    Counters that describe a delivery.
+
+    Attributes:
+        records (int): The number of records delivered.
+        bytes (int): The number of bytes delivered.
+        requests (int): The number of PutRecordBatch requests sent.
+        retries (int): The number of requests that resent failed records.
+        failed_records (list): The records that could not be delivered.
+        seconds (float): The duration of the delivery.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+        self.requests = 0
+        self.retries = 0
+        self.failed_records = []
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, delivered: List[bytes], retried: bool):
+        with self._lock:
+            self.records += len(delivered)
+            self.bytes += sum(len(data) for data in delivered)
+            self.requests += 1
+            self.retries += int(retried)
+
+    def fail(self, failed: List[bytes]):
+        with self._lock:
+            self.failed_records += failed
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Delivered {self.records} records ({self.bytes} bytes) in "
+            f"{self.seconds:.2f} seconds: {self.records_per_second:.1f} records/s, "
+            f"{self.bytes_per_second / (1024 * 1024):.2f} MB/s. Sent {self.requests} "
+            f"requests ({self.retries} retries), {len(self.failed_records)} records "
+            f"failed."
+        )
+
+
+class DeliveryEngine:
+    """
+    Deliver records to a Firehose delivery stream with several PutRecordBatch
+    requests in flight.
+
+    Records are serialized and packed into batches on a worker thread. Batches are
+    limited to 500 records and 4 MiB by the byte size of the serialized records.
+    Sender threads each keep one request in flight. When Firehose reports that some
+    records in a batch failed, only those records are sent again, with exponential
+    backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        firehose_client,
+        delivery_stream_name: str,
+        max_in_flight: int = 4,
+        serializer: Callable[[dict], bytes] = serialize_json_line,
+        max_tries: int = 5,
+    ):
+        """
+        Initialize the DeliveryEngine.
+
+        Args:
+            firehose_client (boto3.client): Boto3 Firehose client. Clients can be
+                shared between threads.
+            delivery_stream_name (str): Name of the Firehose delivery stream.
+            max_in_flight (int): The number of PutRecordBatch requests to keep in
+                flight at the same time.
+            serializer (callable): Converts a record to the bytes that are delivered.
+            max_tries (int): The maximum number of times a record is sent.
+        """
+        self.firehose = firehose_client
+        self.delivery_stream_name = delivery_stream_name
+        self.max_in_flight = max_in_flight
+        self.serializer = serializer
+        self.max_tries = max_tries
+        self.stats = DeliveryStats()
+
+    def deliver(self, records: Iterable[dict]) -> DeliveryStats:
+        """
+        Deliver records to the delivery stream.
+
+        Args:
+            records (iterable): The data records to deliver. Records are read as
+                they are needed, so this can be a generator.
+
+        Returns:
+            DeliveryStats: Counters that describe the delivery, including the records
+            that could not be delivered.
+
+        Raises:
+            ClientError: If a request fails with an error that can't be retried.
+        """
+        self.stats = DeliveryStats()
+        batches = queue.Queue(maxsize=self.max_in_flight * 2)
+        errors = []
+        stop = threading.Event()
+
+        def serialize():
+            try:
+                for batch in self._batches(records, stop):
+                    batches.put(batch)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                for _ in range(self.max_in_flight):
+                    batches.put(_DONE)
+
+        def send():
+            while True:
+                batch = batches.get()
+                if batch is _DONE:
+                    return
+                if errors:
+                    # Drain the queue so that the serializer is never blocked.
+                    continue
+                try:
+                    self._send_batch(batch)
+                except Exception as error:
+                    errors.append(error)
+                    stop.set()
+
+        workers = [threading.Thread(target=serialize, daemon=True)]
+        workers += [
+            threading.Thread(target=send, daemon=True)
+            for _ in range(self.max_in_flight)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stats.seconds = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        logger.info(str(self.stats))
+        return self.stats
+
+    def _batches(self, records: Iterable[dict], stop: threading.Event):
+        """
+        Serialize records and pack them into batches.
+
+        Args:
+            records (iterable): The data records.
+            stop (threading.Event): Set when a sender fails.
+
+        Yields:
+            list: Batches of serialized records that fit in one request.
+        """
+        batch = []
+        batch_bytes = 0
+        for record in records:
+            if stop.is_set():
+                return
+            data = self.serializer(record)
+            if len(data) > MAX_RECORD_BYTES:
+                logger.warning(
+                    f"Skipped a record of {len(data)} bytes because it is larger "
+                    f"than the Firehose limit of {MAX_RECORD_BYTES} bytes."
+                )
+                self.stats.fail([data])
+                continue
+            if (
+                len(batch) == MAX_BATCH_RECORDS
+                or batch_bytes + len(data) > MAX_BATCH_BYTES
+            ):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(data)
+            batch_bytes += len(data)
+        if batch:
+            yield batch
+
+    def _send_batch(self, batch: List[bytes]):
+        """
+        Send a batch, resending only the records that fail.
+
+        Args:
+            batch (list): The serialized records to send.
+        """
+        pending = batch
+        for tries in range(self.max_tries):
+            if tries > 0:
+                self._backoff(tries)
+            try:
+                response = self.firehose.put_record_batch(
+                    DeliveryStreamName=self.delivery_stream_name,
+                    Records=[{"Data": data} for data in pending],
+                )
+            except ClientError as error:
+                if error.response["Error"]["Code"] not in RETRYABLE_ERROR_CODES:
+                    logger.error(
+                        f"Couldn't put a batch of {len(pending)} records to "
+                        f"{self.delivery_stream_name}. Here's why: "
+                        f"{error.response['Error']['Code']}: "
+                        f"{error.response['Error']['Message']}"
+                    )
+                    raise
+                continue
+            failed = []
+            delivered = []
+            if response.get("FailedPutCount", 0) == 0:
+                delivered = pending
+            else:
+                for data, result in zip(pending, response["RequestResponses"]):
+                    (failed if "ErrorCode" in result else delivered).append(data)
+            self.stats.record(delivered, tries > 0)
+            if not failed:
+                return
+            logger.info(
+                f"Resending {len(failed)} failed records of a batch of {len(pending)}."
+            )
+            pending = failed
+        logger.warning(
+            f"Failed to deliver {len(pending)} records after {self.max_tries} tries."
+        )
+        self.stats.fail(pending)
+
+    @staticmethod
+    def _backoff(tries: int):
+        # The exponential delay with full jitter that FirehoseClient gets from its
+        # backoff decorators, but shorter, because only failed records are resent.
+        time.sleep(backoff.full_jitter(min(0.1 * 2**tries, 10)))
@@ -9,6 +9,7 @@ import backoff
 import boto3
 
 from config import get_config
+from delivery_engine import DeliveryEngine, DeliveryStats
 
 
 def load_sample_data(path: str) -> dict:
@@ -112,6 +113,29 @@ class FirehoseClient:
 
     # snippet-end:[python.example_code.firehose.put_record_batch]
 
+    def deliver_records(self, data: list, max_in_flight: int = 4) -> DeliveryStats:
+        """
+        Deliver records to Firehose with several batches in flight.
+
+        Args:
+            data (list): List of data records to be sent to Firehose.
+            max_in_flight (int): The number of PutRecordBatch requests to keep in
+                flight at the same time. Default is 4.
+
+        Returns:
+            DeliveryStats: Counters that describe the delivery, including
+            delivered records per second and bytes per second.
+
+        Unlike put_record_batch, this method sizes batches by bytes as well as by
+        count, and when Firehose reports failed records in a batch, only those
+        records are sent again. Batches that were already delivered are never
+        resent.
+        """
+        engine = DeliveryEngine(
+            self.firehose, self.delivery_stream_name, max_in_flight=max_in_flight
+        )
+        return engine.deliver(data)
+
     # snippet-start:[python.example_code.firehose.get_stream_metrics]
     def get_metric_statistics(
         self,
@@ -246,9 +270,10 @@ if __name__ == "__main__":
             logger.info(f"Put record failed after retries and backoff: {e}")
     client.monitor_metrics()
 
-    # Process remaining records using the batch method
+    # Process remaining records using pipelined batches
     try:
-        client.put_record_batch(data[100:])
+        stats = client.deliver_records(data[100:])
+        logger.info(str(stats))
     except Exception as e:
         logger.info(f"Put record batch failed after retries and backoff: {e}")
     client.monitor_metrics()
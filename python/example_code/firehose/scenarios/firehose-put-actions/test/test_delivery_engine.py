@@ -0,0 +1,118 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+import sys
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.append("../../firehose-put-actions")
+import delivery_engine
+from delivery_engine import MAX_BATCH_BYTES, DeliveryEngine, serialize_json_line
+
+
+def make_response(results):
+    return {
+        "FailedPutCount": sum("ErrorCode" in result for result in results),
+        "RequestResponses": results,
+    }
+
+
+def success_response(Records, **kwargs):
+    return make_response([{"RecordId": "id"} for _ in Records])
+
+
+def test_deliver_batches_by_count_and_size():
+    firehose = mock.Mock()
+    firehose.put_record_batch.side_effect = success_response
+    small_records = [{"key": index} for index in range(600)]
+    large_records = [{"key": "x" * (900 * 1024)} for _ in range(5)]
+
+    engine = DeliveryEngine(firehose, "test_stream", max_in_flight=1)
+    stats = engine.deliver(small_records + large_records)
+
+    batch_sizes = [
+        len(call.kwargs["Records"]) for call in firehose.put_record_batch.call_args_list
+    ]
+    assert batch_sizes == [500, 100 + 4, 1]
+    for call in firehose.put_record_batch.call_args_list:
+        assert sum(len(record["Data"]) for record in call.kwargs["Records"]) <= (
+            MAX_BATCH_BYTES
+        )
+    assert stats.records == 605
+    assert stats.bytes == sum(
+        len(serialize_json_line(record)) for record in small_records + large_records
+    )
+    assert stats.records_per_second > 0
+
+
+def test_deliver_resends_only_failed_records(monkeypatch):
+    monkeypatch.setattr(DeliveryEngine, "_backoff", staticmethod(lambda tries: None))
+    firehose = mock.Mock()
+    firehose.put_record_batch.side_effect = [
+        make_response(
+            [
+                {"RecordId": "id-0"},
+                {"ErrorCode": "ServiceUnavailableException", "ErrorMessage": "Busy"},
+                {"RecordId": "id-2"},
+            ]
+        ),
+        make_response([{"RecordId": "id-1"}]),
+    ]
+    records = [{"key": index} for index in range(3)]
+
+    stats = DeliveryEngine(firehose, "test_stream", max_in_flight=1).deliver(records)
+
+    resent = firehose.put_record_batch.call_args_list[1].kwargs["Records"]
+    assert resent == [{"Data": serialize_json_line(records[1])}]
+    assert stats.records == 3
+    assert stats.retries == 1
+    assert stats.failed_records == []
+
+
+def test_deliver_gives_up_after_max_tries(monkeypatch):
+    monkeypatch.setattr(DeliveryEngine, "_backoff", staticmethod(lambda tries: None))
+    firehose = mock.Mock()
+    firehose.put_record_batch.return_value = make_response(
+        [{"ErrorCode": "ServiceUnavailableException", "ErrorMessage": "Busy"}]
+    )
+
+    stats = DeliveryEngine(firehose, "test_stream", max_tries=3).deliver([{"k": 1}])
+
+    assert firehose.put_record_batch.call_count == 3
+    assert stats.failed_records == [serialize_json_line({"k": 1})]
+
+
+@pytest.mark.parametrize(
+    "error_code,call_count",
+    [("ResourceNotFoundException", 1), ("ServiceUnavailableException", 2)],
+)
+def test_deliver_request_errors(monkeypatch, error_code, call_count):
+    monkeypatch.setattr(DeliveryEngine, "_backoff", staticmethod(lambda tries: None))
+    firehose = mock.Mock()
+    firehose.put_record_batch.side_effect = [
+        ClientError(
+            {"Error": {"Code": error_code, "Message": "Error"}}, "PutRecordBatch"
+        ),
+        make_response([{"RecordId": "id"}]),
+    ]
+
+    engine = DeliveryEngine(firehose, "test_stream")
+    if error_code == "ResourceNotFoundException":
+        with pytest.raises(ClientError):
+            engine.deliver([{"k": 1}])
+    else:
+        assert engine.deliver([{"k": 1}]).records == 1
+    assert firehose.put_record_batch.call_count == call_count
+
+
+def test_deliver_skips_oversized_records(monkeypatch):
+    firehose = mock.Mock()
+    firehose.put_record_batch.side_effect = success_response
+
+    stats = DeliveryEngine(firehose, "test_stream").deliver(
+        [{"key": "x" * delivery_engine.MAX_RECORD_BYTES}, {"key": "small"}]
+    )
+
+    assert stats.records == 1
+    assert len(stats.failed_records) == 1
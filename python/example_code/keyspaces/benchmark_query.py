@@ -0,0 +1,124 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Measures the throughput of the QueryManager bulk writes and paged reads against a
+local Cassandra-compatible database, such as one started with:
+
+    docker run --name cassandra -p 9042:9042 -d cassandra:4.1
+
+The benchmark creates a keyspace and a movie table like the one in the Amazon
+Keyspaces scenario, writes generated movies one at a time and then with several
+request windows, reads them back with several page sizes, and drops the keyspace.
+"""
+
+import argparse
+import time
+
+from cassandra.cluster import Cluster
+
+from query import QueryManager
+
+
+def make_movies(count):
+    return [
+        {
+            "year": 1900 + index % 120,
+            "title": f"Movie {index}",
+            "info": {
+                "release_date": f"{1900 + index % 120}-01-01T00:00:00Z",
+                "plot": f"The plot of movie {index}.",
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def report(label, rows, seconds):
+    print(
+        f"{label:<32} {rows:>8} rows in {seconds:6.2f}s {rows / seconds:>10.0f} rows/s"
+    )
+
+
+def run_benchmark(query_manager, table_name, movies, windows, fetch_sizes):
+    """
+    Writes and reads movies with each setting and prints the throughput.
+
+    :param query_manager: A QueryManager that is connected to the keyspace.
+    :param table_name: The name of the movie table.
+    :param movies: The movies to write.
+    :param windows: The max_in_flight values of the bulk writes.
+    :param fetch_sizes: The page sizes of the reads.
+    """
+    session = query_manager.session
+    stmt = session.prepare(
+        f"INSERT INTO {table_name} (year, title, release_date, plot) VALUES (?, ?, ?, ?);"
+    )
+    start = time.perf_counter()
+    for movie in movies:
+        session.execute(stmt, QueryManager._movie_parameters(movie))
+    report("One at a time", len(movies), time.perf_counter() - start)
+
+    for window in windows:
+        session.execute(f"TRUNCATE {table_name}")
+        start = time.perf_counter()
+        written, failed = query_manager.bulk_add_movies(
+            table_name, movies, max_in_flight=window
+        )
+        report(f"Bulk, {window} in flight", written, time.perf_counter() - start)
+        if failed:
+            print(f"  {len(failed)} movies failed, for example: {failed[0][1]}")
+
+    for fetch_size in fetch_sizes:
+        start = time.perf_counter()
+        count = sum(
+            1 for _ in query_manager.iter_movies(table_name, fetch_size=fetch_size)
+        )
+        report(f"Paged read, {fetch_size} per page", count, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark QueryManager against a local Cassandra database."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9042)
+    parser.add_argument("--movies", type=int, default=20000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--fetch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    keyspace_name = "benchmark_movies"
+    table_name = "movies"
+    with Cluster([args.host], port=args.port) as cluster:
+        session = cluster.connect()
+        session.execute(
+            f"CREATE KEYSPACE IF NOT EXISTS {keyspace_name} WITH replication = "
+            f"{{'class': 'SimpleStrategy', 'replication_factor': 1}}"
+        )
+        session.set_keyspace(keyspace_name)
+        session.execute(
+            f"CREATE TABLE IF NOT EXISTS {table_name} (year int, title text, "
+            f"release_date date, plot text, watched boolean, "
+            f"PRIMARY KEY ((year, title)))"
+        )
+        # The benchmark connects without TLS and SigV4, so it uses the session
+        # directly instead of entering the QueryManager.
+        query_manager = QueryManager(None, None, keyspace_name)
+        query_manager.session = session
+        try:
+            run_benchmark(
+                query_manager,
+                table_name,
+                make_movies(args.movies),
+                args.windows,
+                args.fetch_sizes,
+            )
+        finally:
+            session.execute(f"DROP KEYSPACE {keyspace_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from cassandra.cluster import (
     DCAwareRoundRobinPolicy,
 )
 from cassandra import ConsistencyLevel
+from cassandra.concurrent import execute_concurrent
 from cassandra.query import SimpleStatement
 from cassandra_sigv4.auth import SigV4AuthProvider
 
@@ -151,5 +152,91 @@ class QueryManager:
             parameters=[title, year],
         )
 
+    def bulk_add_movies(self, table_name, movies, max_in_flight=100):
+        """
+        Adds many movies to a table with up to max_in_flight requests running at the
+        same time.
+
+        The year and title of a movie are the whole primary key of the table, so
+        when movies in the list share a year and title, only the last one is
+        written, just as it would win if the movies were added one at a time. Each
+        movie is written by its own request, because a batch of writes to the same
+        row gives every write the same timestamp, and Cassandra then doesn't keep
+        the last one.
+
+        :param table_name: The name of the table.
+        :param movies: A list of movies in the format of the movie JSON file.
+        :param max_in_flight: The number of requests that run at the same time.
+        :return: The number of movies written, and a list of (movie, error) tuples for
+                 the movies that could not be written.
+        """
+        stmt = self.session.prepare(
+            f"INSERT INTO {table_name} (year, title, release_date, plot) VALUES (?, ?, ?, ?);"
+        )
+        latest = {}
+        for movie in movies:
+            latest[(movie["year"], movie["title"])] = movie
+        unique_movies = list(latest.values())
+
+        written = 0
+        failed = []
+        results = execute_concurrent(
+            self.session,
+            ((stmt, self._movie_parameters(movie)) for movie in unique_movies),
+            concurrency=max_in_flight,
+            raise_on_first_error=False,
+            results_generator=True,
+        )
+        for movie, (success, result) in zip(unique_movies, results):
+            if success:
+                written += 1
+            else:
+                failed.append((movie, result))
+        return written, failed
+
+    @staticmethod
+    def _movie_parameters(movie):
+        return [
+            movie["year"],
+            movie["title"],
+            date.fromisoformat(movie["info"]["release_date"].partition("T")[0]),
+            movie["info"]["plot"],
+        ]
+
+    def iter_movies(self, table_name, watched=None, fetch_size=1000):
+        """
+        Gets the title and year of movies from the table one page at a time. The
+        next page is requested before the rows of the current page are returned, so
+        the caller processes one page while the next one is on its way, and only
+        about two pages are held in memory.
+
+        :param table_name: The name of the movie table.
+        :param watched: When specified, only movies that have or have not been
+                        watched are returned.
+        :param fetch_size: The number of rows in each page.
+        :return: A generator of movies.
+        """
+        if watched is None:
+            stmt = SimpleStatement(
+                f"SELECT title, year from {table_name}", fetch_size=fetch_size
+            )
+            params = None
+        else:
+            stmt = SimpleStatement(
+                f"SELECT title, year from {table_name} WHERE watched = %s ALLOW FILTERING",
+                fetch_size=fetch_size,
+            )
+            params = [watched]
+        result = self.session.execute_async(stmt, parameters=params).result()
+        while True:
+            rows = result.current_rows
+            has_more_pages = result.has_more_pages
+            if has_more_pages:
+                result.response_future.start_fetching_next_page()
+            yield from rows
+            if not has_more_pages:
+                return
+            result = result.response_future.result()
+
 
 # snippet-end:[python.example_code.keyspaces.QueryManager.class]
@@ -0,0 +1,86 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import MagicMock
+
+import query
+
+
+def make_movie(title, year=1984, plot="test-plot"):
+    return {
+        "title": title,
+        "year": year,
+        "info": {"release_date": f"{year}-10-31T00:00:00Z", "plot": plot},
+    }
+
+
+def test_bulk_add_movies(monkeypatch):
+    movies = [
+        make_movie("one"),
+        make_movie("two"),
+        make_movie("one", plot="second-plot"),
+        make_movie("fail"),
+    ]
+    calls = {}
+
+    def fake_execute_concurrent(session, statements, **kwargs):
+        calls.update(kwargs)
+        for stmt, params in statements:
+            calls.setdefault("params", []).append(params)
+            if params[1] == "fail":
+                yield False, RuntimeError("test-error")
+            else:
+                yield True, None
+
+    monkeypatch.setattr(query, "execute_concurrent", fake_execute_concurrent)
+    qm = query.QueryManager("test-cert-path", MagicMock(), "test-ks")
+    qm.session = MagicMock()
+
+    written, failed = qm.bulk_add_movies("test-table", movies, max_in_flight=10)
+
+    assert written == 2
+    assert [movie["title"] for movie, _ in failed] == ["fail"]
+    assert calls["concurrency"] == 10
+    assert calls["raise_on_first_error"] is False
+    # Only the last movie with a year and title is written.
+    assert [(params[1], params[3]) for params in calls["params"]] == [
+        ("one", "second-plot"),
+        ("two", "test-plot"),
+        ("fail", "test-plot"),
+    ]
+
+
+class FakeResponseFuture:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetches = 0
+
+    def start_fetching_next_page(self):
+        self.fetches += 1
+
+    def result(self):
+        return FakeResultSet(self, self.fetches)
+
+
+class FakeResultSet:
+    def __init__(self, response_future, index):
+        self.response_future = response_future
+        self.current_rows = response_future.pages[index]
+        self.has_more_pages = index < len(response_future.pages) - 1
+
+
+def test_iter_movies():
+    pages = [[("one", 1984), ("two", 1985)], [("three", 1986)], []]
+    response_future = FakeResponseFuture(pages)
+    qm = query.QueryManager("test-cert-path", MagicMock(), "test-ks")
+    qm.session = MagicMock()
+    qm.session.execute_async.return_value = response_future
+
+    movies = qm.iter_movies("test-table", watched=True, fetch_size=2)
+    assert next(movies) == ("one", 1984)
+    # The second page is requested before the first is consumed.
+    assert response_future.fetches == 1
+    assert list(movies) == [("two", 1985), ("three", 1986)]
+    stmt = qm.session.execute_async.call_args.args[0]
+    assert stmt.fetch_size == 2
+    assert qm.session.execute_async.call_args.kwargs["parameters"] == [True]
@@ -24,9 +24,21 @@ def get_data():
     }
 
 
-def generate(stream_name, kinesis_client):
+def generate(stream_name, kinesis_client, producer=None):
+    """
+    Puts generated data into a stream until the process is stopped.
+
+    :param stream_name: The name of the stream.
+    :param kinesis_client: A Boto3 Kinesis client.
+    :param producer: When specified, records are put by using this producer, such
+                     as a KinesisProducer that sends them in batches. Otherwise, each
+                     record is printed and put with its own PutRecord request.
+    """
     while True:
         data = get_data()
+        if producer is not None:
+            producer.put(json.dumps(data), "partitionkey")
+            continue
         print(data)
         kinesis_client.put_record(
             StreamName=stream_name, Data=json.dumps(data), PartitionKey="partitionkey"
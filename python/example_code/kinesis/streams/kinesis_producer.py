@@ -0,0 +1,422 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to use the AWS SDK for Python (Boto3) with Amazon Kinesis to put records
+into a stream at a high rate. Records are buffered and sent from a background thread
+in PutRecords batches of up to 500 records and 5 MB. Only the records that fail in
+a batch are retried. Small records can optionally be aggregated into a single
+Kinesis record in the format used by the Kinesis Producer Library (KPL), which can
+be read by the Kinesis Client Library (KCL) or by the deaggregate function in this
+module.
+"""
+
+import hashlib
+import logging
+import queue
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_RECORDS = (
+    500  # Kinesis rejects a PutRecords request of more than 500 records.
+)
+MAX_BATCH_BYTES = 5 * 1024 * 1024  # Kinesis rejects a PutRecords request over 5 MB.
+
+# The first bytes of a record aggregated by the KPL.
+KPL_MAGIC = b"\xf3\x89\x9a\xc2"
+
+_CLOSE = object()
+
+
+class ProducerError(Exception):
+    pass
+
+
+def _varint(value):
+    """Encodes an unsigned integer as a protobuf varint."""
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def _length_delimited(field_number, payload):
+    """Encodes a protobuf string, bytes, or embedded message field."""
+    return _varint(field_number << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _read_varint(buffer, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _read_fields(buffer):
+    """
+    Decodes the fields of a protobuf message.
+
+    :return: A generator of (field number, value) tuples. Varint fields are returned
+             as integers and length-delimited fields as bytes.
+    """
+    offset = 0
+    while offset < len(buffer):
+        key, offset = _read_varint(buffer, offset)
+        field_number, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, offset = _read_varint(buffer, offset)
+        elif wire_type == 2:
+            length, offset = _read_varint(buffer, offset)
+            value = buffer[offset : offset + length]
+            offset += length
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}.")
+        yield field_number, value
+
+
+class RecordAggregator:
+    """
+    Packs small user records into a single Kinesis record in the KPL aggregated
+    record format. Every user record keeps its own partition key, but the aggregated
+    record is sent to the shard of the first partition key.
+    """
+
+    def __init__(self, max_bytes=50 * 1024):
+        """
+        :param max_bytes: The maximum size of an aggregated record.
+        """
+        self.max_bytes = max_bytes
+        self._clear()
+
+    def _clear(self):
+        self.partition_keys = {}
+        self.records = []
+        self.size = len(KPL_MAGIC) + hashlib.md5().digest_size
+
+    def __len__(self):
+        return len(self.records)
+
+    def _encoded_record(self, data, partition_key):
+        key_index = self.partition_keys.get(partition_key, len(self.partition_keys))
+        record = _varint(1 << 3 | 0) + _varint(key_index) + _length_delimited(3, data)
+        return _length_delimited(3, record)
+
+    def fits(self, data, partition_key):
+        """
+        :return: True when the record can be added without exceeding the maximum size.
+        """
+        added = len(self._encoded_record(data, partition_key))
+        if partition_key not in self.partition_keys:
+            added += len(_length_delimited(1, partition_key.encode()))
+        return self.size + added <= self.max_bytes
+
+    def add(self, data, partition_key):
+        """
+        Adds a user record.
+
+        :param data: The data of the record, as bytes.
+        :param partition_key: The partition key of the record.
+        """
+        encoded = self._encoded_record(data, partition_key)
+        if partition_key not in self.partition_keys:
+            self.partition_keys[partition_key] = len(self.partition_keys)
+            self.size += len(_length_delimited(1, partition_key.encode()))
+        self.records.append(encoded)
+        self.size += len(encoded)
+
+    def pop(self):
+        """
+        Builds the aggregated record from the records added so far and clears the
+        aggregator.
+
+        :return: A PutRecords entry that contains the aggregated record.
+        """
+        keys = list(self.partition_keys)
+        body = b"".join(_length_delimited(1, key.encode()) for key in keys)
+        body += b"".join(self.records)
+        entry = {
+            "Data": KPL_MAGIC + body + hashlib.md5(body).digest(),
+            "PartitionKey": keys[0],
+        }
+        self._clear()
+        return entry
+
+
+def deaggregate(data, partition_key):
+    """
+    Unpacks a Kinesis record that might have been aggregated by the KPL or by
+    RecordAggregator.
+
+    :param data: The data of the Kinesis record.
+    :param partition_key: The partition key of the Kinesis record.
+    :return: A list of (partition key, data) tuples for the user records. A record
+             that is not aggregated is returned as it is.
+    """
+    digest_size = hashlib.md5().digest_size
+    body = data[len(KPL_MAGIC) : -digest_size]
+    if (
+        not data.startswith(KPL_MAGIC)
+        or len(data) < len(KPL_MAGIC) + digest_size
+        or hashlib.md5(body).digest() != data[-digest_size:]
+    ):
+        return [(partition_key, data)]
+    keys = []
+    user_records = []
+    for field_number, value in _read_fields(body):
+        if field_number == 1:
+            keys.append(value.decode())
+        elif field_number == 3:
+            fields = dict(_read_fields(value))
+            user_records.append((fields[1], fields[3]))
+    return [(keys[key_index], record_data) for key_index, record_data in user_records]
+
+
+class ProducerStats:
+    """Counters that describe the records sent by a producer."""
+
+    def __init__(self):
+        self.user_records = 0
+        self.records = 0
+        self.bytes = 0
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+
+    def __str__(self):
+        return (
+            f"Sent {self.user_records} user records in {self.records} Kinesis records "
+            f"({self.bytes} bytes) with {self.requests} requests "
+            f"({self.retries} retries, {self.failed} failed)."
+        )
+
+
+class KinesisProducer:
+    """
+    Buffers records and puts them into a Kinesis stream in batches from a
+    background thread. A batch is sent when it reaches 500 records or 5 MB, or when
+    its oldest record has waited for the linger time.
+
+    Use the producer as a context manager, or call close when you are done, so that
+    buffered records are sent.
+    """
+
+    def __init__(
+        self,
+        kinesis_client,
+        stream_name,
+        linger_seconds=0.1,
+        aggregate=False,
+        max_aggregate_bytes=50 * 1024,
+        max_buffered_records=10000,
+        max_batch_records=MAX_BATCH_RECORDS,
+        max_batch_bytes=MAX_BATCH_BYTES,
+        max_tries=8,
+    ):
+        """
+        :param kinesis_client: A Boto3 Kinesis client.
+        :param stream_name: The name of the stream to put records into.
+        :param linger_seconds: The longest time that a record waits in the buffer
+                               before its batch is sent.
+        :param aggregate: When True, small records are packed into KPL aggregated
+                          records. Consumers must deaggregate them.
+        :param max_aggregate_bytes: The maximum size of an aggregated record.
+        :param max_buffered_records: The maximum number of records waiting to be
+                                     sent. When the buffer is full, put blocks.
+        :param max_batch_records: The maximum number of records in each PutRecords
+                                  request.
+        :param max_batch_bytes: The maximum size of each PutRecords request.
+        :param max_tries: The maximum number of times that a record is sent.
+        """
+        self.kinesis_client = kinesis_client
+        self.stream_name = stream_name
+        self.linger_seconds = linger_seconds
+        self.aggregator = RecordAggregator(max_aggregate_bytes) if aggregate else None
+        self.max_batch_records = max_batch_records
+        self.max_batch_bytes = max_batch_bytes
+        self.max_tries = max_tries
+        self.stats = ProducerStats()
+        self._buffer = queue.Queue(maxsize=max_buffered_records)
+        self._errors = []
+        self._batch = []
+        self._batch_bytes = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, data, partition_key):
+        """
+        Adds a record to the buffer.
+
+        :param data: The data to put in the stream, as a string or bytes.
+        :param partition_key: The partition key of the record.
+        :raise ProducerError: When the producer is closed.
+        """
+        self._raise_if_closed()
+        self._raise_error()
+        self._buffer.put((data, partition_key))
+
+    def flush(self):
+        """
+        Waits until every record put so far is sent.
+
+        :raise ProducerError: When the producer is closed.
+        """
+        self._raise_if_closed()
+        sent = threading.Event()
+        self._buffer.put(sent)
+        sent.wait()
+        self._raise_error()
+
+    def close(self):
+        """
+        Sends the buffered records and stops the background thread.
+        """
+        self._closed = True
+        if self._thread.is_alive():
+            self._buffer.put(_CLOSE)
+            self._thread.join()
+        logger.info("%s", self.stats)
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _raise_if_closed(self):
+        # The background thread is stopped, so nothing would take the item from
+        # the buffer.
+        if self._closed:
+            raise ProducerError(f"The producer for {self.stream_name} is closed.")
+
+    def _raise_error(self):
+        if self._errors:
+            raise self._errors[0]
+
+    def _run(self):
+        """
+        Collects records from the buffer into batches and sends them until the
+        producer is closed.
+        """
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = self._buffer.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, tuple):
+                if deadline is None:
+                    deadline = time.monotonic() + self.linger_seconds
+                self._add(*item)
+                continue
+            self._send_all()
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _CLOSE:
+                return
+
+    def _add(self, data, partition_key):
+        self.stats.user_records += 1
+        if self.aggregator is None:
+            self._add_entry({"Data": data, "PartitionKey": partition_key})
+            return
+        if isinstance(data, str):
+            data = data.encode()
+        if not self.aggregator.fits(data, partition_key):
+            if self.aggregator:
+                self._add_entry(self.aggregator.pop())
+            if not self.aggregator.fits(data, partition_key):
+                # Too large to aggregate, so send it on its own.
+                self._add_entry({"Data": data, "PartitionKey": partition_key})
+                return
+        self.aggregator.add(data, partition_key)
+
+    def _add_entry(self, entry):
+        entry_bytes = _entry_size(entry)
+        if (
+            len(self._batch) == self.max_batch_records
+            or self._batch_bytes + entry_bytes > self.max_batch_bytes
+        ):
+            self._send_batch()
+        self._batch.append(entry)
+        self._batch_bytes += entry_bytes
+
+    def _send_all(self):
+        if self.aggregator:
+            self._add_entry(self.aggregator.pop())
+        if self._batch:
+            self._send_batch()
+
+    def _send_batch(self):
+        """
+        Sends the current batch, retrying only the records that fail.
+        """
+        entries = self._batch
+        self._batch = []
+        self._batch_bytes = 0
+        if self._errors:
+            # Records are dropped after a failure so that put does not block.
+            self.stats.failed += len(entries)
+            return
+        try:
+            for tries in range(self.max_tries):
+                if tries > 0:
+                    self.stats.retries += 1
+                    time.sleep(random.uniform(0, min(2**tries * 0.1, 5)))
+                try:
+                    response = self.kinesis_client.put_records(
+                        StreamName=self.stream_name, Records=entries
+                    )
+                except ClientError as err:
+                    if (
+                        err.response["Error"]["Code"]
+                        != "ProvisionedThroughputExceededException"
+                    ):
+                        raise
+                    continue
+                self.stats.requests += 1
+                failed = []
+                for entry, result in zip(entries, response["Records"]):
+                    if "ErrorCode" in result:
+                        failed.append(entry)
+                    else:
+                        self.stats.records += 1
+                        self.stats.bytes += _entry_size(entry)
+                entries = failed
+                if not entries:
+                    return
+            raise ProducerError(
+                f"{len(entries)} records were not put into stream "
+                f"{self.stream_name} after {self.max_tries} tries."
+            )
+        except Exception as error:
+            logger.exception("Couldn't put records into stream %s.", self.stream_name)
+            self.stats.failed += len(entries)
+            self._errors.append(error)
+
+
+def _entry_size(entry):
+    data = entry["Data"]
+    if isinstance(data, str):
+        data = data.encode()
+    return len(data) + len(entry["PartitionKey"].encode())
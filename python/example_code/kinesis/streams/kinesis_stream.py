@@ -12,6 +12,9 @@ import json
 import logging
 from botocore.exceptions import ClientError
 
+from streams.kinesis_producer import KinesisProducer
+from streams.shard_consumer import CheckpointStore, MultiShardConsumer
+
 logger = logging.getLogger(__name__)
 
 
@@ -125,6 +128,19 @@ class KinesisStream:
 
     # snippet-end:[python.example_code.kinesis.PutRecord]
 
+    def get_producer(self, **kwargs):
+        """
+        Gets a producer that buffers records and puts them into the stream in
+        batches from a background thread. Use it instead of put_record when you put
+        many records, because put_record sends one request for each record.
+
+        :param kwargs: Other arguments to pass to KinesisProducer, such as
+                       linger_seconds or aggregate.
+        :return: The producer. Close it when you are done so that buffered records
+                 are sent.
+        """
+        return KinesisProducer(self.kinesis_client, self.name, **kwargs)
+
     # snippet-start:[python.example_code.kinesis.GetRecords]
     def get_records(self, max_records):
         """
@@ -159,5 +175,20 @@ class KinesisStream:
             logger.exception("Couldn't get records from stream %s.", self.name)
             raise
 
+    # snippet-end:[python.example_code.kinesis.GetRecords]
+
+    def get_consumer(self, checkpoint_file=None, **kwargs):
+        """
+        Gets a consumer that reads every shard of the stream at the same time.
+        Unlike get_records, which reads only the first shard, the consumer follows
+        resharding and checkpoints its progress so that it can resume after a restart.
 
-# snippet-end:[python.example_code.kinesis.GetRecords]
+        :param checkpoint_file: The path of a local JSON file where checkpoints are
+                                saved. When None, checkpoints are kept in memory.
+        :param kwargs: Other arguments to pass to MultiShardConsumer, such as
+                       max_workers or initial_position.
+        :return: The consumer. Call its consume method to start reading.
+        """
+        return MultiShardConsumer(
+            self.kinesis_client, self.name, CheckpointStore(checkpoint_file), **kwargs
+        )
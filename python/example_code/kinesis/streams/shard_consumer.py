@@ -0,0 +1,360 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to use the AWS SDK for Python (Boto3) with Amazon Kinesis to read every
+shard of a stream at the same time. The consumer follows resharding by reading a
+parent shard to its end before its child shards, and it checkpoints the last
+sequence number it processed in each shard so that a restarted consumer resumes
+where it stopped.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+SHARD_END = "SHARD_END"
+
+
+class CheckpointStore:
+    """
+    Stores the last sequence number processed in each shard. When a file path is
+    given, checkpoints are saved to a local JSON file after every change so that
+    they survive a restart.
+    """
+
+    def __init__(self, file_path=None):
+        """
+        :param file_path: The path of the JSON file that holds the checkpoints. When
+                          None, checkpoints are kept only in memory.
+        """
+        self.file_path = file_path
+        self.checkpoints = {}
+        self._lock = threading.Lock()
+        if file_path is not None and os.path.exists(file_path):
+            with open(file_path, encoding="utf-8") as checkpoint_file:
+                self.checkpoints = json.load(checkpoint_file)
+
+    def get(self, shard_id):
+        """
+        :param shard_id: The ID of the shard.
+        :return: The last sequence number processed in the shard, SHARD_END when the
+                 shard was read to its end, or None when the shard has no checkpoint.
+        """
+        with self._lock:
+            return self.checkpoints.get(shard_id)
+
+    def put(self, shard_id, sequence_number):
+        """
+        Records the last sequence number processed in a shard.
+
+        :param shard_id: The ID of the shard.
+        :param sequence_number: The sequence number, or SHARD_END.
+        """
+        with self._lock:
+            self.checkpoints[shard_id] = sequence_number
+            if self.file_path is not None:
+                # Write to a temporary file and rename it, so a crash never leaves
+                # a partly written checkpoint file.
+                temp_path = f"{self.file_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+                    json.dump(self.checkpoints, checkpoint_file)
+                os.replace(temp_path, self.file_path)
+
+    def is_finished(self, shard_id):
+        """
+        :param shard_id: The ID of the shard.
+        :return: True when the shard was read to its end.
+        """
+        return self.get(shard_id) == SHARD_END
+
+
+class ShardMetrics:
+    """Counters that describe how far a consumer has read a shard."""
+
+    def __init__(self, shard_id):
+        self.shard_id = shard_id
+        self.records = 0
+        self.batches = 0
+        self.millis_behind_latest = None
+        self.last_sequence_number = None
+        self.finished = False
+
+    def record(self, records, millis_behind_latest):
+        self.batches += 1
+        self.records += len(records)
+        self.millis_behind_latest = millis_behind_latest
+        if records:
+            self.last_sequence_number = records[-1]["SequenceNumber"]
+
+    def __str__(self):
+        return (
+            f"{self.shard_id}: {self.records} records in {self.batches} batches, "
+            f"{self.millis_behind_latest} ms behind latest"
+            f"{' (finished)' if self.finished else ''}."
+        )
+
+
+def _parent_shard_ids(shard):
+    """
+    :param shard: A shard returned by ListShards or a child shard returned by
+                  GetRecords.
+    :return: The IDs of the parents of the shard.
+    """
+    if "ParentShards" in shard:
+        return list(shard["ParentShards"])
+    return [
+        shard[key]
+        for key in ("ParentShardId", "AdjacentParentShardId")
+        if shard.get(key) is not None
+    ]
+
+
+class MultiShardConsumer:
+    """
+    Reads all shards of a Kinesis stream concurrently, one thread for each shard
+    that is being read.
+    """
+
+    def __init__(
+        self,
+        kinesis_client,
+        stream_name,
+        checkpoint_store=None,
+        max_workers=None,
+        batch_limit=10000,
+        initial_position="LATEST",
+        idle_interval=1.0,
+        max_tries=8,
+    ):
+        """
+        :param kinesis_client: A Boto3 Kinesis client. Clients can be shared between
+                               threads.
+        :param stream_name: The name of the stream to read.
+        :param checkpoint_store: Stores the progress of the consumer in each shard.
+                                 Defaults to an in-memory store.
+        :param max_workers: The maximum number of shards that are read at the same
+                            time. Open shards are read until the consumer is stopped,
+                            so this must be at least the number of open shards or
+                            some shards are never read. Defaults to no limit.
+        :param batch_limit: The maximum number of records returned by each
+                            GetRecords request. Kinesis allows up to 10,000.
+        :param initial_position: Where to start reading a shard that has no
+                                 checkpoint, either 'LATEST' or 'TRIM_HORIZON'.
+                                 Child shards of a shard that this consumer reads are
+                                 always read from the start.
+        :param idle_interval: The number of seconds to wait before polling a shard
+                              again after it returns no records.
+        :param max_tries: The maximum number of tries for a throttled request.
+        """
+        self.kinesis_client = kinesis_client
+        self.stream_name = stream_name
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.max_workers = max_workers
+        self.batch_limit = batch_limit
+        self.initial_position = initial_position
+        self.idle_interval = idle_interval
+        self.max_tries = max_tries
+        self.metrics = {}
+        self._stop = threading.Event()
+
+    def list_shards(self):
+        """
+        Gets all shards of the stream, including closed shards that are parents of
+        shards created by resharding.
+
+        :return: The list of shards.
+        """
+        shards = []
+        kwargs = {"StreamName": self.stream_name}
+        try:
+            while True:
+                response = self.kinesis_client.list_shards(**kwargs)
+                shards += response["Shards"]
+                if response.get("NextToken") is None:
+                    break
+                # ListShards rejects a stream name that is sent with a next token.
+                kwargs = {"NextToken": response["NextToken"]}
+        except ClientError:
+            logger.exception("Couldn't list shards for stream %s.", self.stream_name)
+            raise
+        else:
+            return shards
+
+    def lag(self):
+        """
+        :return: A dict of the number of milliseconds that each shard is behind the
+                 most recent record in the stream, keyed by shard ID.
+        """
+        return {
+            shard_id: metrics.millis_behind_latest
+            for shard_id, metrics in self.metrics.items()
+        }
+
+    def stop(self):
+        """
+        Stops the consumer. Each shard finishes processing its current batch.
+        """
+        self._stop.set()
+
+    def consume(self, process_records):
+        """
+        Reads the stream until every shard is read to its end or the consumer is
+        stopped. Parent shards are read before their children, and a shard that was
+        read to its end in an earlier run is skipped.
+
+        :param process_records: A function that is called with a shard ID and a
+                                list of records. It is called from the thread that
+                                reads the shard, so records from one shard are
+                                processed in order. The shard is checkpointed after
+                                the function returns.
+        """
+        self._stop.clear()
+        shards = {shard["ShardId"]: shard for shard in self.list_shards()}
+        pending = {
+            shard_id
+            for shard_id in shards
+            if not self.checkpoint_store.is_finished(shard_id)
+        }
+        completions = queue.Queue()
+        running = set()
+        errors = []
+
+        def is_ready(shard_id):
+            return all(
+                parent_id not in shards or self.checkpoint_store.is_finished(parent_id)
+                for parent_id in _parent_shard_ids(shards[shard_id])
+            )
+
+        def read_shard(shard_id, from_start):
+            child_shards = []
+            try:
+                child_shards = self._read_shard(shard_id, from_start, process_records)
+            except Exception as error:
+                errors.append(error)
+                self._stop.set()
+            finally:
+                completions.put((shard_id, child_shards))
+
+        while True:
+            if not self._stop.is_set():
+                for shard_id in sorted(pending):
+                    if (
+                        self.max_workers is not None
+                        and len(running) >= self.max_workers
+                    ):
+                        break
+                    if is_ready(shard_id):
+                        pending.discard(shard_id)
+                        running.add(shard_id)
+                        from_start = any(
+                            parent_id in shards
+                            for parent_id in _parent_shard_ids(shards[shard_id])
+                        )
+                        threading.Thread(
+                            target=read_shard, args=(shard_id, from_start), daemon=True
+                        ).start()
+            if not running:
+                break
+            shard_id, child_shards = completions.get()
+            running.discard(shard_id)
+            for child in child_shards:
+                if child["ShardId"] not in shards:
+                    shards[child["ShardId"]] = child
+                    pending.add(child["ShardId"])
+        if errors:
+            raise errors[0]
+        for metrics in self.metrics.values():
+            logger.info("%s", metrics)
+
+    def _read_shard(self, shard_id, from_start, process_records):
+        """
+        Reads a shard until it ends or the consumer is stopped.
+
+        :return: The child shards of the shard when it ends. Otherwise, an empty list.
+        """
+        metrics = self.metrics.setdefault(shard_id, ShardMetrics(shard_id))
+        shard_iter = self._get_shard_iterator(shard_id, from_start)
+        while not self._stop.is_set():
+            try:
+                response = self._get_records(shard_iter)
+            except ClientError as err:
+                if err.response["Error"]["Code"] != "ExpiredIteratorException":
+                    logger.exception(
+                        "Couldn't get records from shard %s of stream %s.",
+                        shard_id,
+                        self.stream_name,
+                    )
+                    raise
+                # Resume from the checkpoint when the consumer was idle too long.
+                shard_iter = self._get_shard_iterator(shard_id, from_start)
+                continue
+            records = response["Records"]
+            metrics.record(records, response.get("MillisBehindLatest"))
+            if records:
+                process_records(shard_id, records)
+                self.checkpoint_store.put(shard_id, records[-1]["SequenceNumber"])
+            shard_iter = response.get("NextShardIterator")
+            if shard_iter is None:
+                self.checkpoint_store.put(shard_id, SHARD_END)
+                metrics.finished = True
+                logger.info("Read shard %s to its end.", shard_id)
+                return response.get("ChildShards", [])
+            if not records:
+                self._stop.wait(self.idle_interval)
+        return []
+
+    def _get_shard_iterator(self, shard_id, from_start):
+        """
+        Gets a shard iterator that starts after the checkpoint of the shard or, when
+        the shard has no checkpoint, at the start or initial position.
+        """
+        kwargs = {"StreamName": self.stream_name, "ShardId": shard_id}
+        sequence_number = self.checkpoint_store.get(shard_id)
+        if sequence_number is not None:
+            kwargs["ShardIteratorType"] = "AFTER_SEQUENCE_NUMBER"
+            kwargs["StartingSequenceNumber"] = sequence_number
+        elif from_start:
+            kwargs["ShardIteratorType"] = "TRIM_HORIZON"
+        else:
+            kwargs["ShardIteratorType"] = self.initial_position
+        try:
+            response = self.kinesis_client.get_shard_iterator(**kwargs)
+        except ClientError:
+            logger.exception(
+                "Couldn't get a shard iterator for shard %s of stream %s.",
+                shard_id,
+                self.stream_name,
+            )
+            raise
+        else:
+            return response["ShardIterator"]
+
+    def _get_records(self, shard_iter):
+        """
+        Gets a batch of records, retrying with jittered exponential backoff while
+        the shard is throttled.
+        """
+        for tries in range(self.max_tries):
+            try:
+                return self.kinesis_client.get_records(
+                    ShardIterator=shard_iter, Limit=self.batch_limit
+                )
+            except ClientError as err:
+                if (
+                    err.response["Error"]["Code"]
+                    != "ProvisionedThroughputExceededException"
+                    or tries == self.max_tries - 1
+                ):
+                    raise
+                time.sleep(random.uniform(0, min(2**tries * 0.1, 5)))
@@ -6,6 +6,7 @@ Unit tests for stream data generators.
 """
 
 import importlib
+import json
 import random
 import time
 import boto3
@@ -42,6 +43,27 @@ def test_static_generator(make_stubber, monkeypatch, module_name, repeat):
         module.generate(stream, kinesis_client)
 
 
+@pytest.mark.parametrize("module_name", ["streams.dg_stockticker", "streams.dg_weblog"])
+def test_static_generator_with_producer(monkeypatch, module_name):
+    module = importlib.import_module(module_name)
+    data = module.get_data()
+    data_list = [data, data]
+    monkeypatch.setattr(module, "get_data", data_list.pop)
+
+    class FakeProducer:
+        def __init__(self):
+            self.records = []
+
+        def put(self, data, partition_key):
+            self.records.append((data, partition_key))
+
+    producer = FakeProducer()
+    with pytest.raises(IndexError):
+        module.generate(module.STREAM_NAME, None, producer)
+
+    assert producer.records == [(json.dumps(data), "partitionkey")] * 2
+
+
 @pytest.mark.parametrize(
     "module_name,data,rands,rates",
     [
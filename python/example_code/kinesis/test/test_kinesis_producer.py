@@ -0,0 +1,120 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for kinesis_producer.py.
+"""
+
+import boto3
+from botocore.exceptions import ClientError
+import pytest
+
+from streams import kinesis_producer
+from streams.kinesis_producer import (
+    KinesisProducer,
+    ProducerError,
+    RecordAggregator,
+    deaggregate,
+)
+from streams.kinesis_stream import KinesisStream
+
+STREAM_NAME = "test-stream"
+
+
+def make_entries(count, partition_key="test-key"):
+    return [
+        {"Data": f"test-data-{index}", "PartitionKey": partition_key}
+        for index in range(count)
+    ]
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_put_batches(make_stubber, error_code):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    stream = KinesisStream(kinesis_client)
+    stream.name = STREAM_NAME
+    entries = make_entries(5)
+
+    kinesis_stubber.stub_put_records_entries(
+        STREAM_NAME, entries[:2], error_code=error_code
+    )
+    if error_code is None:
+        kinesis_stubber.stub_put_records_entries(STREAM_NAME, entries[2:4])
+        kinesis_stubber.stub_put_records_entries(STREAM_NAME, entries[4:])
+
+    producer = stream.get_producer(linger_seconds=60, max_batch_records=2)
+    for entry in entries:
+        producer.put(entry["Data"], entry["PartitionKey"])
+    if error_code is None:
+        producer.close()
+        assert producer.stats.user_records == 5
+        assert producer.stats.records == 5
+        assert producer.stats.requests == 3
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            producer.close()
+        assert exc_info.value.response["Error"]["Code"] == error_code
+        assert producer.stats.failed == 5
+
+
+def test_put_retries_failed_records(make_stubber, monkeypatch):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    monkeypatch.setattr(kinesis_producer.time, "sleep", lambda seconds: None)
+    entries = make_entries(3)
+
+    kinesis_stubber.stub_put_records_entries(STREAM_NAME, entries, failed_indexes=[1])
+    kinesis_stubber.stub_put_records_entries(STREAM_NAME, entries[1:2])
+
+    with KinesisProducer(kinesis_client, STREAM_NAME) as producer:
+        for entry in entries:
+            producer.put(entry["Data"], entry["PartitionKey"])
+        producer.flush()
+        assert producer.stats.records == 3
+        assert producer.stats.retries == 1
+
+
+def test_use_after_close():
+    producer = KinesisProducer(boto3.client("kinesis"), STREAM_NAME)
+    producer.close()
+
+    with pytest.raises(ProducerError):
+        producer.put("test-data", "test-key")
+    with pytest.raises(ProducerError):
+        producer.flush()
+
+
+def test_put_aggregated(make_stubber):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    records = [
+        (f"test-data-{index}".encode(), f"test-key-{index % 2}") for index in range(4)
+    ]
+    aggregator = RecordAggregator()
+    for data, partition_key in records:
+        aggregator.add(data, partition_key)
+    aggregated = aggregator.pop()
+
+    kinesis_stubber.stub_put_records_entries(STREAM_NAME, [aggregated])
+
+    with KinesisProducer(kinesis_client, STREAM_NAME, aggregate=True) as producer:
+        for data, partition_key in records:
+            producer.put(data, partition_key)
+
+    assert producer.stats.user_records == 4
+    assert producer.stats.records == 1
+    assert deaggregate(aggregated["Data"], aggregated["PartitionKey"]) == [
+        (partition_key, data) for data, partition_key in records
+    ]
+
+
+def test_aggregator_max_bytes():
+    aggregator = RecordAggregator(max_bytes=64)
+    assert aggregator.fits(b"x" * 20, "key")
+    aggregator.add(b"x" * 20, "key")
+    assert not aggregator.fits(b"x" * 20, "key")
+
+
+def test_deaggregate_plain_record():
+    assert deaggregate(b"test-data", "test-key") == [("test-key", b"test-data")]
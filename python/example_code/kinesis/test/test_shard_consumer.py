@@ -0,0 +1,160 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for shard_consumer.py.
+"""
+
+import json
+
+import boto3
+from botocore.exceptions import ClientError
+import pytest
+
+from streams import shard_consumer
+from streams.kinesis_stream import KinesisStream
+from streams.shard_consumer import SHARD_END, CheckpointStore, MultiShardConsumer
+
+STREAM_NAME = "test-stream"
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_consume_follows_resharding(make_stubber, tmp_path, error_code):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    stream = KinesisStream(kinesis_client)
+    stream.name = STREAM_NAME
+    checkpoint_file = tmp_path / "checkpoints.json"
+    consumer = stream.get_consumer(
+        str(checkpoint_file), initial_position="TRIM_HORIZON", idle_interval=0
+    )
+    limit = consumer.batch_limit
+
+    kinesis_stubber.stub_list_shards(
+        STREAM_NAME,
+        [{"ShardId": "parent"}],
+        next_token="test-token",
+    )
+    kinesis_stubber.stub_list_shards(
+        STREAM_NAME,
+        [{"ShardId": "child", "ParentShardId": "parent"}],
+        token="test-token",
+    )
+    kinesis_stubber.stub_get_shard_iterator(
+        STREAM_NAME, "parent", "parent-iter-1", iterator_type="TRIM_HORIZON"
+    )
+    kinesis_stubber.stub_get_records(
+        "parent-iter-1",
+        limit,
+        ["data-1", "data-2"],
+        next_shard_iter="parent-iter-2",
+        sequence_numbers=["1", "2"],
+        millis_behind_latest=100,
+        error_code=error_code,
+    )
+    if error_code is None:
+        kinesis_stubber.stub_get_records(
+            "parent-iter-2", limit, [], next_shard_iter=None, millis_behind_latest=0
+        )
+        kinesis_stubber.stub_get_shard_iterator(
+            STREAM_NAME, "child", "child-iter", iterator_type="TRIM_HORIZON"
+        )
+        kinesis_stubber.stub_get_records(
+            "child-iter",
+            limit,
+            ["data-3"],
+            next_shard_iter=None,
+            sequence_numbers=["3"],
+            millis_behind_latest=0,
+            child_shards={"grandchild": ["child"]},
+        )
+        kinesis_stubber.stub_get_shard_iterator(
+            STREAM_NAME, "grandchild", "grandchild-iter", iterator_type="TRIM_HORIZON"
+        )
+        kinesis_stubber.stub_get_records(
+            "grandchild-iter", limit, [], next_shard_iter=None
+        )
+
+    processed = []
+
+    def process_records(shard_id, records):
+        processed.extend((shard_id, record["Data"]) for record in records)
+
+    if error_code is None:
+        consumer.consume(process_records)
+        assert processed == [
+            ("parent", "data-1"),
+            ("parent", "data-2"),
+            ("child", "data-3"),
+        ]
+        assert json.loads(checkpoint_file.read_text()) == {
+            "parent": SHARD_END,
+            "child": SHARD_END,
+            "grandchild": SHARD_END,
+        }
+        assert consumer.metrics["parent"].records == 2
+        assert consumer.lag() == {"parent": 0, "child": 0, "grandchild": None}
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            consumer.consume(process_records)
+        assert exc_info.value.response["Error"]["Code"] == error_code
+        assert processed == []
+        assert not checkpoint_file.exists()
+
+
+def test_consume_resumes_from_checkpoint(make_stubber, tmp_path):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    checkpoint_file = tmp_path / "checkpoints.json"
+    checkpoint_file.write_text(json.dumps({"parent": SHARD_END, "child": "3"}))
+    consumer = MultiShardConsumer(
+        kinesis_client,
+        STREAM_NAME,
+        CheckpointStore(str(checkpoint_file)),
+        max_workers=1,
+    )
+
+    kinesis_stubber.stub_list_shards(
+        STREAM_NAME,
+        [{"ShardId": "parent"}, {"ShardId": "child", "ParentShardId": "parent"}],
+    )
+    kinesis_stubber.stub_get_shard_iterator(
+        STREAM_NAME,
+        "child",
+        "child-iter",
+        iterator_type="AFTER_SEQUENCE_NUMBER",
+        sequence_number="3",
+    )
+    kinesis_stubber.stub_get_records(
+        "child-iter", consumer.batch_limit, ["data-4"], sequence_numbers=["4"]
+    )
+
+    def process_records(shard_id, records):
+        # Stop after the first batch, as a shutdown signal would.
+        consumer.stop()
+
+    consumer.consume(process_records)
+
+    assert json.loads(checkpoint_file.read_text()) == {
+        "parent": SHARD_END,
+        "child": "4",
+    }
+
+
+def test_get_records_retries_throttling(make_stubber, monkeypatch):
+    kinesis_client = boto3.client("kinesis")
+    kinesis_stubber = make_stubber(kinesis_client)
+    consumer = MultiShardConsumer(kinesis_client, STREAM_NAME)
+    monkeypatch.setattr(shard_consumer.time, "sleep", lambda seconds: None)
+
+    kinesis_stubber.stub_get_records(
+        "test-iter",
+        consumer.batch_limit,
+        [],
+        error_code="ProvisionedThroughputExceededException",
+    )
+    kinesis_stubber.stub_get_records("test-iter", consumer.batch_limit, ["data"])
+
+    response = consumer._get_records("test-iter")
+
+    assert [record["Data"] for record in response["Records"]] == ["data"]
@@ -0,0 +1,235 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to download, decode, and verify AWS HealthImaging image frames with a
+pipeline that overlaps network fetches with decoding. Frames are fetched on a
+thread pool, and each fetched buffer is handed directly to a process pool that
+decodes the HTJ2K data with OpenJPEG and verifies its CRC32 checksum. Frames are
+decoded straight from memory, so nothing is written to disk unless an output
+directory is given.
+"""
+
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import openjpeg
+
+logger = logging.getLogger(__name__)
+
+
+def decode_and_check_frame(image_frame_id, htj2k_data, expected_checksum):
+    """
+    Decode HTJ2K encoded pixel data and verify it against the full resolution
+    checksum from the image set metadata. This function runs in a worker process,
+    so it is defined at module level where it can be pickled.
+
+    :param image_frame_id: The ID of the image frame.
+    :param htj2k_data: The HTJ2K encoded pixel data.
+    :param expected_checksum: The CRC32 checksum from the image set metadata.
+    :return: The image frame ID, whether the checksum matched, the size of the
+             decoded bitmap in bytes, and the seconds spent decoding.
+    """
+    start = time.perf_counter()
+    # Use format 2 for HTJ2K data, as in MedicalImagingWrapper.jph_image_to_opj_bitmap.
+    image_array = openjpeg.utils.decode(htj2k_data, 2)
+    crc32_calculated = zlib.crc32(image_array)
+    return (
+        image_frame_id,
+        crc32_calculated == expected_checksum,
+        image_array.nbytes,
+        time.perf_counter() - start,
+    )
+
+
+class StageStats:
+    """Thread-safe throughput counters for a single pipeline stage."""
+
+    def __init__(self, name):
+        """
+        :param name: The name of the stage, used when reporting.
+        """
+        self.name = name
+        self.frames = 0
+        self.bytes = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, byte_count, seconds):
+        """
+        Record one frame that passed through the stage.
+
+        :param byte_count: The number of bytes the stage produced for the frame.
+        :param seconds: The time the stage spent working on the frame.
+        """
+        with self._lock:
+            self.frames += 1
+            self.bytes += byte_count
+            self.busy_seconds += seconds
+
+    def summary(self, wall_seconds):
+        """
+        :param wall_seconds: The elapsed time of the whole pipeline run.
+        :return: A one-line description of the stage's throughput.
+        """
+        wall_seconds = max(wall_seconds, 1e-9)
+        return (
+            f"{self.name}: {self.frames} frames, {self.bytes / 1_000_000:.2f} MB, "
+            f"{self.frames / wall_seconds:.1f} frames/s, "
+            f"{self.bytes / 1_000_000 / wall_seconds:.2f} MB/s, "
+            f"{self.busy_seconds:.2f} s worker time"
+        )
+
+
+class ImageFramePipeline:
+    """
+    Downloads, decodes, and verifies image frames with fetch and decode stages that
+    run concurrently.
+    """
+
+    def __init__(
+        self,
+        medical_imaging_wrapper,
+        fetch_workers=8,
+        decode_workers=None,
+        max_frames_in_flight=None,
+        decode_executor=None,
+    ):
+        """
+        :param medical_imaging_wrapper: A MedicalImagingWrapper used to fetch frames.
+        :param fetch_workers: The number of threads that fetch frames.
+        :param decode_workers: The number of processes that decode frames. Defaults
+                               to the number of CPUs.
+        :param max_frames_in_flight: The maximum number of frames that are being
+                                     fetched or decoded at one time. This bounds
+                                     the memory used by encoded buffers. Defaults
+                                     to twice the total number of workers.
+        :param decode_executor: An optional executor used for the decode stage in
+                                place of a process pool. The caller is responsible
+                                for shutting it down.
+        """
+        self.medical_imaging_wrapper = medical_imaging_wrapper
+        self.fetch_workers = fetch_workers
+        self.decode_workers = decode_workers or os.cpu_count() or 1
+        self.max_frames_in_flight = max_frames_in_flight or 2 * (
+            self.fetch_workers + self.decode_workers
+        )
+        self.decode_executor = decode_executor
+        self.fetch_stats = StageStats("fetch")
+        self.decode_stats = StageStats("decode")
+        self.wall_seconds = 0.0
+
+    def _fetch_frame(self, data_store_id, image_frame, out_directory):
+        start = time.perf_counter()
+        htj2k_data = self.medical_imaging_wrapper.get_pixel_data_bytes(
+            data_store_id, image_frame["imageSetId"], image_frame["imageFrameId"]
+        )
+        if out_directory is not None:
+            image_file_path = os.path.join(
+                out_directory, f"image_{image_frame['imageFrameId']}.jph"
+            )
+            with open(image_file_path, "wb") as f:
+                f.write(htj2k_data)
+        self.fetch_stats.record(len(htj2k_data), time.perf_counter() - start)
+        return image_frame, htj2k_data
+
+    def download_decode_and_check_image_frames(
+        self, data_store_id, image_frames, out_directory=None
+    ):
+        """
+        Downloads image frames, decodes them, and uses the checksum to validate
+        the decoded images.
+
+        :param data_store_id: The HealthImaging data store ID.
+        :param image_frames: An iterable of dicts containing image frame information,
+                             as returned by get_image_frames_for_image_set.
+        :param out_directory: An optional directory for the downloaded HTJ2K images.
+                              When not specified, frames are only held in memory.
+        :return: A dict that maps each image frame ID to True if its checksum was
+                 verified; otherwise, False.
+        """
+        results = {}
+        frames = iter(image_frames)
+        self.fetch_stats = StageStats("fetch")
+        self.decode_stats = StageStats("decode")
+        owns_decode_executor = self.decode_executor is None
+        decode_executor = self.decode_executor or ProcessPoolExecutor(
+            max_workers=self.decode_workers
+        )
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetch_executor:
+                fetching = set()
+                decoding = {}
+                while True:
+                    while len(fetching) + len(decoding) < self.max_frames_in_flight:
+                        image_frame = next(frames, None)
+                        if image_frame is None:
+                            break
+                        fetching.add(
+                            fetch_executor.submit(
+                                self._fetch_frame,
+                                data_store_id,
+                                image_frame,
+                                out_directory,
+                            )
+                        )
+                    if not fetching and not decoding:
+                        break
+
+                    done, _ = wait(
+                        fetching | decoding.keys(), return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        if future in fetching:
+                            fetching.remove(future)
+                            image_frame, htj2k_data = future.result()
+                            decode_future = decode_executor.submit(
+                                decode_and_check_frame,
+                                image_frame["imageFrameId"],
+                                htj2k_data,
+                                image_frame["fullResolutionChecksum"],
+                            )
+                            decoding[decode_future] = image_frame["imageFrameId"]
+                        else:
+                            image_frame_id = decoding.pop(future)
+                            try:
+                                _, verified, decoded_size, seconds = future.result()
+                            except Exception as err:
+                                logger.error(
+                                    "Couldn't decode image frame %s. Here's why: %s",
+                                    image_frame_id,
+                                    err,
+                                )
+                                verified = False
+                            else:
+                                self.decode_stats.record(decoded_size, seconds)
+                            results[image_frame_id] = verified
+        finally:
+            self.wall_seconds = time.perf_counter() - start
+            if owns_decode_executor:
+                decode_executor.shutdown(cancel_futures=True)
+        return results
+
+    def report(self):
+        """
+        :return: A description of the throughput of each stage of the last run.
+        """
+        return "\n".join(
+            [
+                f"Processed frames in {self.wall_seconds:.2f} s.",
+                self.fetch_stats.summary(self.wall_seconds),
+                self.decode_stats.summary(self.wall_seconds),
+            ]
+        )
@@ -0,0 +1,107 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to read AWS HealthImaging image set metadata incrementally. The metadata
+document is parsed as a stream of JSON events, and only one instance is held in
+memory at a time, so memory use does not grow with the size of the series.
+"""
+
+import ijson
+from ijson.common import ObjectBuilder
+
+
+def _build_value(events):
+    """
+    Build the next complete JSON value from a stream of parse events.
+
+    :param events: An iterator of (event, value) tuples from ijson.basic_parse.
+    :return: The value as Python objects.
+    """
+    builder = ObjectBuilder()
+    depth = 0
+    for event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return builder.value
+    raise ValueError("The metadata document ended in the middle of a value.")
+
+
+def _is_instance_key(keys):
+    """
+    :param keys: The keys of the maps that enclose the current parse position.
+    :return: True when the position is an instance in Study.Series.*.Instances.
+    """
+    return (
+        len(keys) == 5
+        and keys[0] == "Study"
+        and keys[1] == "Series"
+        and keys[3] == "Instances"
+    )
+
+
+def iter_instances(metadata_stream):
+    """
+    Iterate the instances in an image set metadata document.
+
+    :param metadata_stream: A binary file-like object that contains the uncompressed
+                            JSON metadata.
+    :return: A generator of instance dicts.
+    """
+    events = ijson.basic_parse(metadata_stream, use_float=True)
+    # The key of each enclosing map. Arrays are recorded as None because
+    # instances are never nested inside an array.
+    keys = []
+    for event, value in events:
+        if event in ("start_map", "start_array"):
+            keys.append(None)
+        elif event in ("end_map", "end_array"):
+            keys.pop()
+        elif event == "map_key":
+            keys[-1] = value
+            if _is_instance_key(keys):
+                yield _build_value(events)
+
+
+def iter_image_frame_info(metadata_stream, image_set_id):
+    """
+    Iterate the image frames in an image set metadata document. This is a streaming
+    equivalent of the jmespath queries in
+    MedicalImagingWrapper.get_image_frames_for_image_set.
+
+    :param metadata_stream: A binary file-like object that contains the uncompressed
+                            JSON metadata.
+    :param image_set_id: The ID of the image set.
+    :return: A generator of dicts containing image frame information.
+    """
+    for instance in iter_instances(metadata_stream):
+        dicom = instance.get("DICOM") or {}
+        rescale_slope = dicom.get("RescaleSlope")
+        rescale_intercept = dicom.get("RescaleIntercept")
+        for image_frame in instance.get("ImageFrames") or []:
+            # Image frames can be nested one level deep, as with "ImageFrames[][]".
+            nested_frames = (
+                image_frame if isinstance(image_frame, list) else [image_frame]
+            )
+            for frame in nested_frames:
+                checksums = frame.get("PixelDataChecksumFromBaseToFullResolution")
+                full_resolution = (
+                    max(checksums, key=lambda checksum: checksum["Width"])
+                    if checksums
+                    else {}
+                )
+                yield {
+                    "imageSetId": image_set_id,
+                    "imageFrameId": frame["ID"],
+                    "rescaleIntercept": rescale_intercept,
+                    "rescaleSlope": rescale_slope,
+                    "minPixelValue": frame.get("MinPixelValue"),
+                    "maxPixelValue": frame.get("MaxPixelValue"),
+                    "fullResolutionChecksum": full_resolution.get("Checksum"),
+                }
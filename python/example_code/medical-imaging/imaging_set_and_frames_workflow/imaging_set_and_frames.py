@@ -24,6 +24,7 @@ from threading import Thread
 
 # Import the wrapper for the service functionality.
 from medicalimaging import MedicalImagingWrapper
+from image_frame_pipeline import ImageFramePipeline
 
 # Add relative path to include demo_tools in this code example without need for setup.
 sys.path.append("../../..")
@@ -202,8 +203,8 @@ class MedicalImagingWorkflowScenario:
 
         all_image_frame_ids = []
         for image_set in image_sets:
-            image_frames = self.medical_imaging_wrapper.get_image_frames_for_image_set(
-                self.data_store_id, image_set, out_dir
+            image_frames = self.medical_imaging_wrapper.iter_image_frames_for_image_set(
+                self.data_store_id, image_set
             )
 
             all_image_frame_ids.extend(image_frames)
@@ -225,9 +226,13 @@ class MedicalImagingWorkflowScenario:
 
         q.ask("\t\tPress Enter to download and convert the images.")
 
-        self.medical_imaging_wrapper.download_decode_and_check_image_frames(
+        pipeline = ImageFramePipeline(self.medical_imaging_wrapper)
+        results = pipeline.download_decode_and_check_image_frames(
             self.data_store_id, all_image_frame_ids, out_dir
         )
+        for image_frame_id, image_result in results.items():
+            print(f"\t\tImage checksum verified for {image_frame_id}: {image_result}")
+        print(f"\t\t{pipeline.report()}".replace("\n", "\n\t\t"))
 
         print(
             f"""\
@@ -12,6 +12,8 @@ import jmespath
 import time
 from botocore.exceptions import ClientError
 
+from image_set_metadata import iter_image_frame_info
+
 logger = logging.getLogger(__name__)
 
 
@@ -244,6 +246,33 @@ class MedicalImagingWrapper:
 
     # snippet-end:[python.example_code.medical-imaging.workflow.GetImageFrames]
 
+    def iter_image_frames_for_image_set(self, datastore_id, image_set_id):
+        """
+        Get the image frames for an image set by streaming its metadata. The
+        metadata is decompressed and parsed as it is downloaded, so memory use
+        is bounded by the size of a single instance rather than the whole document.
+
+        :param datastore_id: The ID of the data store.
+        :param image_set_id: The ID of the image set.
+        :return: A generator of dicts containing image frame information.
+        """
+        try:
+            image_set_metadata = self.medical_imaging_client.get_image_set_metadata(
+                imageSetId=image_set_id, datastoreId=datastore_id
+            )
+        except ClientError as err:
+            logger.error(
+                "Couldn't get image metadata. Here's why: %s: %s",
+                err.response["Error"]["Code"],
+                err.response["Error"]["Message"],
+            )
+            raise
+        metadata_stream = image_set_metadata["imageSetMetadataBlob"]
+        if image_set_metadata.get("contentEncoding") == "gzip":
+            metadata_stream = gzip.GzipFile(fileobj=metadata_stream)
+        with metadata_stream:
+            yield from iter_image_frame_info(metadata_stream, image_set_id)
+
     # snippet-start:[python.example_code.medical-imaging.workflow.GetImageSet]
     def get_image_set(self, datastore_id, image_set_id, version_id=None):
         """
@@ -359,6 +388,30 @@ class MedicalImagingWrapper:
 
     # snippet-end:[python.example_code.medical-imaging.workflow.GetPixelData]
 
+    def get_pixel_data_bytes(self, datastore_id, image_set_id, image_frame_id):
+        """
+        Get an image frame's pixel data as an in-memory buffer.
+
+        :param datastore_id: The ID of the data store.
+        :param image_set_id: The ID of the image set.
+        :param image_frame_id: The ID of the image frame.
+        :return: The image frame's HTJ2K encoded pixel data.
+        """
+        try:
+            image_frame = self.medical_imaging_client.get_image_frame(
+                datastoreId=datastore_id,
+                imageSetId=image_set_id,
+                imageFrameInformation={"imageFrameId": image_frame_id},
+            )
+            return b"".join(image_frame["imageFrameBlob"].iter_chunks())
+        except ClientError as err:
+            logger.error(
+                "Couldn't get image frame. Here's why: %s: %s",
+                err.response["Error"]["Code"],
+                err.response["Error"]["Message"],
+            )
+            raise
+
     # snippet-start:[python.example_code.medical-imaging.workflow.DeleteImageSet]
     def delete_image_set(self, datastore_id, image_set_id):
         """
@@ -0,0 +1,120 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for image_frame_pipeline.py.
+"""
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import numpy
+from botocore.exceptions import ClientError
+import pytest
+
+import image_frame_pipeline
+from image_frame_pipeline import ImageFramePipeline
+from medicalimaging import MedicalImagingWrapper
+
+# The stubbed get_image_frame response returns this data for every frame.
+STUB_FRAME_DATA = b"akdelfaldkflakdflkajs"
+
+
+@pytest.fixture
+def fake_decode(monkeypatch):
+    decoded = numpy.frombuffer(STUB_FRAME_DATA[::-1], dtype=numpy.uint8)
+    monkeypatch.setattr(
+        image_frame_pipeline.openjpeg.utils,
+        "decode",
+        lambda data, j2k_format: decoded,
+    )
+    return zlib.crc32(decoded)
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_download_decode_and_check_image_frames(
+    make_stubber, fake_decode, tmp_path, error_code
+):
+    medical_imaging_client = boto3.client("medical-imaging")
+    medical_imaging_stubber = make_stubber(medical_imaging_client)
+    wrapper = MedicalImagingWrapper(medical_imaging_client, boto3.client("s3"))
+    datastore_id = "abcdedf1234567890abcdef123456789"
+    image_set_id = "cccccc1234567890abcdef123456789"
+    image_frame_ids = [f"{index}cccc1234567890abcdef123456789" for index in range(3)]
+    image_frames = [
+        {
+            "imageSetId": image_set_id,
+            "imageFrameId": image_frame_id,
+            "fullResolutionChecksum": fake_decode if index != 1 else 0,
+        }
+        for index, image_frame_id in enumerate(image_frame_ids)
+    ]
+
+    for image_frame_id in image_frame_ids:
+        medical_imaging_stubber.stub_get_pixel_data(
+            datastore_id, image_set_id, image_frame_id, error_code=error_code
+        )
+        if error_code is not None:
+            break
+
+    with ThreadPoolExecutor() as decode_executor:
+        # A single fetch worker keeps stubbed calls in the order they were added.
+        pipeline = ImageFramePipeline(
+            wrapper, fetch_workers=1, decode_executor=decode_executor
+        )
+        if error_code is None:
+            results = pipeline.download_decode_and_check_image_frames(
+                datastore_id, iter(image_frames), tmp_path
+            )
+            assert results == {
+                image_frame_ids[0]: True,
+                image_frame_ids[1]: False,
+                image_frame_ids[2]: True,
+            }
+            for image_frame_id in image_frame_ids:
+                jph_file = tmp_path / f"image_{image_frame_id}.jph"
+                assert jph_file.read_bytes() == STUB_FRAME_DATA
+            assert pipeline.fetch_stats.frames == 3
+            assert pipeline.fetch_stats.bytes == 3 * len(STUB_FRAME_DATA)
+            assert pipeline.decode_stats.frames == 3
+            assert "decode: 3 frames" in pipeline.report()
+        else:
+            with pytest.raises(ClientError) as exc_info:
+                pipeline.download_decode_and_check_image_frames(
+                    datastore_id, image_frames[:1]
+                )
+            assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_download_decode_and_check_image_frames_decode_error(make_stubber, monkeypatch):
+    medical_imaging_client = boto3.client("medical-imaging")
+    medical_imaging_stubber = make_stubber(medical_imaging_client)
+    wrapper = MedicalImagingWrapper(medical_imaging_client, boto3.client("s3"))
+    datastore_id = "abcdedf1234567890abcdef123456789"
+    image_set_id = "cccccc1234567890abcdef123456789"
+    image_frame_id = "cccccc1234567890abcdef123456789"
+
+    def bad_decode(data, j2k_format):
+        raise RuntimeError("Not an HTJ2K stream.")
+
+    monkeypatch.setattr(image_frame_pipeline.openjpeg.utils, "decode", bad_decode)
+    medical_imaging_stubber.stub_get_pixel_data(
+        datastore_id, image_set_id, image_frame_id
+    )
+
+    with ThreadPoolExecutor() as decode_executor:
+        pipeline = ImageFramePipeline(wrapper, decode_executor=decode_executor)
+        results = pipeline.download_decode_and_check_image_frames(
+            datastore_id,
+            [
+                {
+                    "imageSetId": image_set_id,
+                    "imageFrameId": image_frame_id,
+                    "fullResolutionChecksum": 0,
+                }
+            ],
+        )
+
+    assert results == {image_frame_id: False}
+    assert pipeline.decode_stats.frames == 0
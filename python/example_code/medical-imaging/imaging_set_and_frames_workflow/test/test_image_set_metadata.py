@@ -0,0 +1,117 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for image_set_metadata.py.
+"""
+
+import io
+import json
+
+import boto3
+from botocore.exceptions import ClientError
+import pytest
+
+from image_set_metadata import iter_image_frame_info
+from medicalimaging import MedicalImagingWrapper
+
+
+def make_image_frame(frame_id, checksum):
+    return {
+        "ID": frame_id,
+        "MinPixelValue": 0,
+        "MaxPixelValue": 4095,
+        "PixelDataChecksumFromBaseToFullResolution": [
+            {"Width": 256, "Height": 256, "Checksum": 1},
+            {"Width": 512, "Height": 512, "Checksum": checksum},
+            {"Width": 128, "Height": 128, "Checksum": 2},
+        ],
+    }
+
+
+def test_iter_image_frame_info():
+    # DICOM UIDs contain dots, so they can't be addressed with dotted prefixes.
+    metadata = {
+        "SchemaVersion": "1.1",
+        "Patient": {"DICOM": {"PatientID": "3524578"}},
+        "Study": {
+            "DICOM": {"StudyInstanceUID": "1.2.3"},
+            "Series": {
+                "1.2.3.4": {
+                    "DICOM": {"Modality": "CT"},
+                    "Instances": {
+                        "1.2.3.4.1": {
+                            "DICOM": {"RescaleSlope": 1, "RescaleIntercept": -1024.5},
+                            "ImageFrames": [
+                                make_image_frame("frame-1", 11),
+                                make_image_frame("frame-2", 12),
+                            ],
+                        },
+                    },
+                },
+                "1.2.3.5": {
+                    "Instances": {
+                        "1.2.3.5.1": {
+                            "ImageFrames": [[make_image_frame("frame-3", 13)]],
+                            "DICOM": {"RescaleSlope": 2, "RescaleIntercept": 0},
+                        },
+                        "1.2.3.5.2": {"DICOM": {}},
+                    },
+                },
+            },
+        },
+    }
+    metadata_stream = io.BytesIO(json.dumps(metadata).encode())
+
+    frames = iter_image_frame_info(metadata_stream, "image-set-id")
+
+    assert list(frames) == [
+        {
+            "imageSetId": "image-set-id",
+            "imageFrameId": "frame-1",
+            "rescaleIntercept": -1024.5,
+            "rescaleSlope": 1,
+            "minPixelValue": 0,
+            "maxPixelValue": 4095,
+            "fullResolutionChecksum": 11,
+        },
+        {
+            "imageSetId": "image-set-id",
+            "imageFrameId": "frame-2",
+            "rescaleIntercept": -1024.5,
+            "rescaleSlope": 1,
+            "minPixelValue": 0,
+            "maxPixelValue": 4095,
+            "fullResolutionChecksum": 12,
+        },
+        {
+            "imageSetId": "image-set-id",
+            "imageFrameId": "frame-3",
+            "rescaleIntercept": 0,
+            "rescaleSlope": 2,
+            "minPixelValue": 0,
+            "maxPixelValue": 4095,
+            "fullResolutionChecksum": 13,
+        },
+    ]
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_iter_image_frames_for_image_set(make_stubber, error_code):
+    medical_imaging_client = boto3.client("medical-imaging")
+    medical_imaging_stubber = make_stubber(medical_imaging_client)
+    wrapper = MedicalImagingWrapper(medical_imaging_client, boto3.client("s3"))
+    datastore_id = "abcdedf1234567890abcdef123456789"
+    image_set_id = "cccccc1234567890abcdef123456789"
+    medical_imaging_stubber.stub_get_image_set_metadata(
+        datastore_id, image_set_id, error_code=error_code
+    )
+
+    frames = wrapper.iter_image_frames_for_image_set(datastore_id, image_set_id)
+    if error_code is None:
+        # The stubbed metadata is gzipped JSON that contains no instances.
+        assert list(frames) == []
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            list(frames)
+        assert exc_info.value.response["Error"]["Code"] == error_code
@@ -11,7 +11,10 @@ speech and manage custom lexicons.
 import io
 import json
 import logging
+import re
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
@@ -354,3 +357,270 @@ class PollyWrapper:
             for vo in self.voice_metadata
             if engine in vo["SupportedEngines"] and language_code == vo["LanguageCode"]
         }
+
+    def synthesize_chunks(
+        self,
+        text,
+        engine,
+        voice,
+        audio_format,
+        lang_code=None,
+        include_visemes=False,
+        sample_rate=None,
+        max_chars=1500,
+        max_workers=4,
+    ):
+        """
+        Synthesizes long text by splitting it into chunks at sentence boundaries and
+        synthesizing the chunks concurrently. Chunks are returned in order as soon
+        as each one and all the chunks before it are ready, so playback can start
+        long before the whole text is synthesized.
+
+        Text that starts with <speak> is treated as SSML. It is split only between
+        top-level elements or sentences, and each chunk is wrapped in its own
+        <speak> element.
+
+        :param text: The text to synthesize.
+        :param engine: The kind of engine used. Can be standard or neural.
+        :param voice: The ID of the voice to use.
+        :param audio_format: The audio format to return. Can be mp3, ogg_vorbis, or
+                             pcm. MP3 and PCM chunks can be concatenated into a
+                             single stream. Concatenated Ogg chunks form a chained
+                             Ogg stream.
+        :param lang_code: The language code of the voice to use. This has an effect
+                          only when a bilingual voice is selected.
+        :param include_visemes: When True, the visemes of each chunk are synthesized
+                                concurrently with its audio.
+        :param sample_rate: The audio sample rate in Hz, such as "16000". When this
+                            is None, the Amazon Polly default is used.
+        :param max_chars: The maximum number of characters in each chunk.
+        :param max_workers: The number of requests in flight at the same time.
+        :return: A generator of (audio bytes, visemes) tuples, one for each chunk.
+                 Viseme times are relative to the start of the first chunk.
+        """
+        is_ssml = text.lstrip().startswith("<speak")
+        kwargs = {"Engine": engine, "VoiceId": voice}
+        if lang_code is not None:
+            kwargs["LanguageCode"] = lang_code
+        if is_ssml:
+            kwargs["TextType"] = "ssml"
+        if sample_rate is not None:
+            kwargs["SampleRate"] = sample_rate
+
+        def synthesize_chunk(chunk, output_format):
+            chunk_kwargs = {**kwargs, "Text": chunk, "OutputFormat": output_format}
+            if output_format == "json":
+                chunk_kwargs["SpeechMarkTypes"] = ["viseme"]
+            try:
+                response = self.polly_client.synthesize_speech(**chunk_kwargs)
+                data = response["AudioStream"].read()
+            except ClientError:
+                logger.exception("Couldn't synthesize a chunk of %s.", output_format)
+                raise
+            if output_format != "json":
+                return data
+            return [json.loads(v) for v in data.decode().split() if v]
+
+        offset_ms = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+
+            def next_ready():
+                audio_future, viseme_future = in_flight.popleft()
+                audio = audio_future.result()
+                visemes = None
+                if viseme_future is not None:
+                    visemes = [
+                        {**viseme, "time": viseme["time"] + offset_ms}
+                        for viseme in viseme_future.result()
+                    ]
+                return audio, visemes
+
+            for chunk in split_text(text, max_chars, is_ssml):
+                if is_ssml:
+                    chunk = f"<speak>{chunk}</speak>"
+                audio_future = executor.submit(synthesize_chunk, chunk, audio_format)
+                viseme_future = None
+                if include_visemes:
+                    viseme_future = executor.submit(synthesize_chunk, chunk, "json")
+                in_flight.append((audio_future, viseme_future))
+                while len(in_flight) > max_workers or (
+                    in_flight and in_flight[0][0].done()
+                ):
+                    audio, visemes = next_ready()
+                    offset_ms += audio_duration_ms(audio, audio_format, sample_rate)
+                    yield audio, visemes
+            while in_flight:
+                audio, visemes = next_ready()
+                offset_ms += audio_duration_ms(audio, audio_format, sample_rate)
+                yield audio, visemes
+
+    def synthesize_long(self, text, engine, voice, audio_format, **kwargs):
+        """
+        Synthesizes long text in concurrent chunks and joins the chunks into a
+        single audio stream. This is a faster alternative to do_synthesis_task
+        that needs no Amazon S3 bucket.
+
+        :param text: The text to synthesize.
+        :param engine: The kind of engine used. Can be standard or neural.
+        :param voice: The ID of the voice to use.
+        :param audio_format: The audio format to return.
+        :param kwargs: Other arguments that are passed to synthesize_chunks.
+        :return: The audio stream that contains the synthesized speech and a list
+                 of visemes that are associated with the speech audio.
+        """
+        audio_stream = io.BytesIO()
+        visemes = None
+        for audio, chunk_visemes in self.synthesize_chunks(
+            text, engine, voice, audio_format, **kwargs
+        ):
+            audio_stream.write(audio)
+            if chunk_visemes is not None:
+                visemes = (visemes or []) + chunk_visemes
+        audio_stream.seek(0)
+        return audio_stream, visemes
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_SSML_TOKEN = re.compile(r"<[^>]*>|[^<]+")
+
+
+def _split_sentences(text):
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def _ssml_pieces(ssml):
+    """
+    Splits the content of a <speak> element into pieces that are complete at the top
+    level: top-level elements, and the sentences of top-level text.
+    """
+    body = re.sub(r"^\s*<speak[^>]*>|</speak>\s*$", "", ssml)
+    pieces = []
+    current = ""
+    depth = 0
+    for token in _SSML_TOKEN.findall(body):
+        if token.startswith("</"):
+            depth -= 1
+            current += token
+            if depth == 0:
+                pieces.append(current)
+                current = ""
+        elif token.startswith("<"):
+            if not token.endswith("/>"):
+                depth += 1
+            current += token
+            if depth == 0:
+                pieces.append(current)
+                current = ""
+        elif depth > 0:
+            current += token
+        else:
+            sentences = _SENTENCE_END.split(token)
+            for sentence in sentences[:-1]:
+                pieces.append(current + sentence + " ")
+                current = ""
+            current += sentences[-1]
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def split_text(text, max_chars=1500, is_ssml=False):
+    """
+    Splits text into chunks of at most max_chars characters at sentence boundaries.
+    A sentence that is longer than max_chars is split between words.
+
+    :param text: The text to split.
+    :param max_chars: The maximum number of characters in a chunk.
+    :param is_ssml: When True, the text is the SSML of a <speak> element. Chunks are
+                    split only between top-level elements and sentences and are
+                    returned without the <speak> element.
+    :return: A generator of chunks.
+    """
+    pieces = _ssml_pieces(text) if is_ssml else _split_sentences(text)
+    chunk = ""
+    for piece in pieces:
+        if len(chunk) + len(piece) + 1 > max_chars and chunk.strip():
+            yield chunk.strip()
+            chunk = ""
+        if len(piece) > max_chars and not is_ssml:
+            words = piece.split()
+            piece = ""
+            for word in words:
+                if len(piece) + len(word) + 1 > max_chars and piece:
+                    yield piece
+                    piece = ""
+                piece = f"{piece} {word}" if piece else word
+        chunk = f"{chunk} {piece}" if chunk and not is_ssml else chunk + piece
+    if chunk.strip():
+        yield chunk.strip()
+
+
+# MPEG audio bitrates in kbps for layer III, by MPEG version 1 and versions 2 and 2.5.
+_MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def audio_duration_ms(audio, audio_format, sample_rate=None):
+    """
+    Calculates the playing time of audio returned by Amazon Polly, so that speech
+    marks of a later chunk can be shifted to follow it.
+
+    :param audio: The audio bytes.
+    :param audio_format: The format of the audio. Can be mp3, ogg_vorbis, or pcm.
+    :param sample_rate: The sample rate that was requested for PCM audio.
+    :return: The playing time in milliseconds.
+    """
+    if audio_format == "pcm":
+        # Amazon Polly returns signed 16-bit, 1 channel PCM.
+        return len(audio) // 2 * 1000 // int(sample_rate or 16000)
+    if audio_format == "ogg_vorbis":
+        # The granule position of the last page is the number of samples.
+        last_page = audio.rfind(b"OggS")
+        header = audio.find(b"\x01vorbis")
+        if last_page == -1 or header == -1:
+            return 0
+        samples = int.from_bytes(audio[last_page + 6 : last_page + 14], "little")
+        rate = int.from_bytes(audio[header + 12 : header + 16], "little")
+        return samples * 1000 // rate if rate else 0
+    if audio_format == "mp3":
+        return _mp3_duration_ms(audio)
+    raise ValueError(f"Can't get the duration of {audio_format} audio.")
+
+
+def _mp3_duration_ms(audio):
+    offset = 0
+    if audio[:3] == b"ID3":
+        size = audio[6:10]
+        offset = 10 + (size[0] << 21 | size[1] << 14 | size[2] << 7 | size[3])
+    samples = 0.0
+    while offset + 4 <= len(audio):
+        header = int.from_bytes(audio[offset : offset + 4], "big")
+        version_bits = header >> 19 & 0x3
+        bitrate_index = header >> 12 & 0xF
+        rate_index = header >> 10 & 0x3
+        if (
+            header >> 21 != 0x7FF
+            or version_bits == 1
+            or header >> 17 & 0x3 != 1
+            or bitrate_index in (0, 15)
+            or rate_index == 3
+        ):
+            # Not a layer III frame header, so look at the next byte.
+            offset += 1
+            continue
+        version = 1 if version_bits == 3 else 2
+        bitrate = _MP3_BITRATES[version][bitrate_index] * 1000
+        rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+        padding = header >> 9 & 0x1
+        frame_samples = 1152 if version == 1 else 576
+        offset += frame_samples // 8 * bitrate // rate + padding
+        samples += frame_samples / rate
+    return int(samples * 1000)
@@ -12,7 +12,7 @@ import boto3
 from botocore.exceptions import ClientError
 import pytest
 
-from polly_wrapper import PollyWrapper
+from polly_wrapper import PollyWrapper, audio_duration_ms, split_text
 
 
 @pytest.mark.parametrize("error_code", [None, "TestException"])
@@ -324,3 +324,121 @@ def test_get_voices(engine, lang_code, voices):
     polly_wrapper.voice_metadata = voice_metadata
     got_voices = polly_wrapper.get_voices(engine, lang_code)
     assert got_voices == voices
+
+
+@pytest.mark.parametrize(
+    "text,max_chars,is_ssml,chunks",
+    [
+        ("One. Two! Three?", 100, False, ["One. Two! Three?"]),
+        ("One. Two! Three?", 9, False, ["One. Two!", "Three?"]),
+        ("one two three four", 9, False, ["one two", "three", "four"]),
+        (
+            "<speak><p>One. Two.</p><s>Three.</s> Four. Five.</speak>",
+            22,
+            True,
+            ["<p>One. Two.</p>", "<s>Three.</s> Four.", "Five."],
+        ),
+        (
+            '<speak>One <break time="1s"/>two. Three.</speak>',
+            100,
+            True,
+            ['One <break time="1s"/>two. Three.'],
+        ),
+    ],
+)
+def test_split_text(text, max_chars, is_ssml, chunks):
+    assert list(split_text(text, max_chars, is_ssml)) == chunks
+
+
+def test_audio_duration_ms():
+    assert audio_duration_ms(bytes(3200), "pcm") == 100
+    assert audio_duration_ms(bytes(1600), "pcm", "8000") == 100
+    # Two MPEG-1 layer III frames at 128 kbps and 44.1 kHz, without padding.
+    frame = b"\xff\xfb\x90\x00" + bytes(413)
+    assert audio_duration_ms(frame * 2, "mp3") == 52
+    with pytest.raises(ValueError):
+        audio_duration_ms(b"", "wav")
+
+
+def make_viseme_stream(visemes):
+    return io.BytesIO(
+        "\n".join([json.dumps(v, separators=(",", ":")) for v in visemes]).encode()
+    )
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_synthesize_long(make_stubber, error_code):
+    polly_client = boto3.client("polly")
+    polly_stubber = make_stubber(polly_client)
+    polly_wrapper = PollyWrapper(polly_client, None)
+    chunks = ["First sentence.", "Second sentence."]
+    if error_code is not None:
+        chunks = chunks[:1]
+    engine = "standard"
+    voice = "Test"
+    lang_code = "en-US"
+    audio = [bytes([1]) * 3200, bytes([2]) * 6400]
+    visemes = [{"value": "i", "time": index * 10} for index in range(2)]
+
+    for chunk, chunk_audio in zip(chunks, audio):
+        polly_stubber.stub_synthesize_speech(
+            chunk, engine, voice, "pcm", lang_code, io.BytesIO(chunk_audio)
+        )
+        polly_stubber.stub_synthesize_speech(
+            chunk,
+            engine,
+            voice,
+            "json",
+            lang_code,
+            make_viseme_stream(visemes),
+            mark_types=["viseme"],
+            error_code=error_code,
+        )
+
+    kwargs = {
+        "lang_code": lang_code,
+        "include_visemes": True,
+        "max_chars": 20,
+        "max_workers": 1,
+    }
+    if error_code is None:
+        got_audio, got_visemes = polly_wrapper.synthesize_long(
+            " ".join(chunks), engine, voice, "pcm", **kwargs
+        )
+        assert got_audio.read() == b"".join(audio)
+        assert got_visemes == visemes + [
+            {**viseme, "time": viseme["time"] + 100} for viseme in visemes
+        ]
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            polly_wrapper.synthesize_long(chunks[0], engine, voice, "pcm", **kwargs)
+        assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_synthesize_chunks_ssml(make_stubber):
+    polly_client = boto3.client("polly")
+    polly_stubber = make_stubber(polly_client)
+    polly_wrapper = PollyWrapper(polly_client, None)
+    chunks = ["<s>One.</s>", "<s>Two.</s>"]
+
+    for chunk in chunks:
+        polly_stubber.stub_synthesize_speech(
+            f"<speak>{chunk}</speak>",
+            "neural",
+            "Test",
+            "mp3",
+            "en-US",
+            io.BytesIO(chunk.encode()),
+            text_type="ssml",
+        )
+
+    got_chunks = polly_wrapper.synthesize_chunks(
+        f"<speak>{''.join(chunks)}</speak>",
+        "neural",
+        "Test",
+        "mp3",
+        lang_code="en-US",
+        max_chars=12,
+        max_workers=1,
+    )
+    assert [audio for audio, _ in got_chunks] == [chunk.encode() for chunk in chunks]
@@ -9,6 +9,8 @@ Shows how to use the AWS SDK for Python (Boto3) to access Amazon Redshift data.
 
 import boto3
 import logging
+import random
+import time
 from botocore.exceptions import ClientError
 
 
@@ -140,6 +142,164 @@ class RedshiftDataWrapper:
 
     # snippet-end:[python.example_code.redshift_data.GetStatementResult]
 
+    def iter_statement_pages(self, statement_id):
+        """
+        Gets the result of a SQL statement one page at a time. Each page is decoded
+        into plain Python values and handed to the caller before the next page is
+        requested, so only one page is held in memory.
+
+        The typed field of each column is chosen once from the column metadata
+        instead of being looked up in every cell.
+
+        :param statement_id: The SQL statement identifier.
+        :return: A generator of (column names, rows) tuples, one for each page. Each
+                 row is a tuple of values, with None for NULL.
+        """
+        try:
+            paginator = self.client.get_paginator("get_statement_result")
+            columns = None
+            readers = None
+            for page in paginator.paginate(Id=statement_id):
+                if readers is None:
+                    columns = [column["name"] for column in page["ColumnMetadata"]]
+                    readers = [
+                        _field_reader(column) for column in page["ColumnMetadata"]
+                    ]
+                yield columns, [
+                    tuple(read(cell) for read, cell in zip(readers, record))
+                    for record in page["Records"]
+                ]
+        except ClientError as err:
+            logging.error(
+                "Couldn't get statement result. Here's why: %s: %s",
+                err.response["Error"]["Code"],
+                err.response["Error"]["Message"],
+            )
+            raise
+
+    def iter_statement_rows(self, statement_id):
+        """
+        Gets the rows of the result of a SQL statement as they are read, one page at
+        a time.
+
+        :param statement_id: The SQL statement identifier.
+        :return: A generator of rows. Each row is a tuple of values.
+        """
+        for _, rows in self.iter_statement_pages(statement_id):
+            yield from rows
+
+    def iter_statement_columns(self, statement_id):
+        """
+        Gets the result of a SQL statement as column batches, one for each page.
+        The lists of a batch can be passed directly to columnar libraries, such as
+        numpy.asarray or pandas.DataFrame.
+
+        :param statement_id: The SQL statement identifier.
+        :return: A generator of dicts that map each column name to a list of the
+                 values of that column in one page.
+        """
+        for columns, rows in self.iter_statement_pages(statement_id):
+            values = zip(*rows) if rows else ([] for _ in columns)
+            yield {column: list(value) for column, value in zip(columns, values)}
+
+    def wait_for_statement(self, statement_id, max_wait_seconds=300):
+        """
+        Waits for a SQL statement to finish. The statement is polled quickly at
+        first and then with exponential backoff, so short queries return quickly
+        and long ones don't use up the request quota.
+
+        :param statement_id: The SQL statement identifier.
+        :param max_wait_seconds: The maximum number of seconds to wait.
+        :return: The description of the finished statement.
+        """
+        deadline = time.monotonic() + max_wait_seconds
+        tries = 0
+        while True:
+            response = self.describe_statement(statement_id)
+            status = response["Status"]
+            if status == "FINISHED":
+                return response
+            if status in ("FAILED", "ABORTED"):
+                raise StatementError(statement_id, status, response.get("Error"))
+            if time.monotonic() >= deadline:
+                raise StatementError(
+                    statement_id, status, f"Not finished after {max_wait_seconds}s."
+                )
+            tries += 1
+            time.sleep(random.uniform(0, min(2**tries * 0.05, 5)))
+
+    def execute_and_fetch(
+        self,
+        cluster_identifier,
+        database_name,
+        user_name,
+        sql,
+        parameter_list=None,
+        max_wait_seconds=300,
+    ):
+        """
+        Executes a SQL statement, waits for it to finish, and returns its rows.
+
+        :param cluster_identifier: The cluster identifier.
+        :param database_name: The database name.
+        :param user_name: The user's name.
+        :param sql: The SQL statement.
+        :param parameter_list: The optional SQL statement parameters.
+        :param max_wait_seconds: The maximum number of seconds to wait for the
+                                 statement to finish.
+        :return: A generator of the rows of the result, which are read one page at
+                 a time. When the statement has no result set, the generator is
+                 empty.
+        """
+        response = self.execute_statement(
+            cluster_identifier, database_name, user_name, sql, parameter_list
+        )
+        description = self.wait_for_statement(response["Id"], max_wait_seconds)
+        if not description.get("HasResultSet"):
+            return iter(())
+        return self.iter_statement_rows(response["Id"])
+
+
+class StatementError(Exception):
+    """Raised when a SQL statement fails, is aborted, or doesn't finish in time."""
+
+    def __init__(self, statement_id, status, error):
+        super().__init__(f"Statement {statement_id} is {status}: {error}")
+        self.statement_id = statement_id
+        self.status = status
+        self.error = error
+
+
+# The typed field that the Redshift Data API uses for each column type. Other types,
+# such as numeric, date, and timestamp, are returned as strings.
+_TYPE_FIELDS = {
+    "bool": "booleanValue",
+    "int2": "longValue",
+    "int4": "longValue",
+    "int8": "longValue",
+    "float4": "doubleValue",
+    "float8": "doubleValue",
+}
+
+
+def _field_reader(column):
+    """
+    :param column: The metadata of a column.
+    :return: A function that gets the value of a cell of the column.
+    """
+    key = _TYPE_FIELDS.get(column.get("typeName"), "stringValue")
+
+    def read(cell):
+        try:
+            return cell[key]
+        except KeyError:
+            # Nulls, and values of unexpected types, are decoded from the cell.
+            if cell.get("isNull"):
+                return None
+            return next(iter(cell.values()))
+
+    return read
+
 
 if __name__ == "__main__":
     # Demonstrates how to initiate the wrapper object and use it.
@@ -9,7 +9,7 @@ import boto3
 import pytest
 from botocore.exceptions import ClientError
 
-from redshift_data import RedshiftDataWrapper
+from redshift_data import RedshiftDataWrapper, StatementError
 
 
 @pytest.mark.parametrize("error_code", [None, "TestException"])
@@ -103,3 +103,94 @@ def test_get_statement_result(make_stubber, error_code):
         with pytest.raises(ClientError) as exc_info:
             redshift_data_wrapper.get_statement_result(statement_id)
         assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+column_metadata = [
+    {"name": "id", "typeName": "int4"},
+    {"name": "title", "typeName": "varchar"},
+    {"name": "rating", "typeName": "float8"},
+]
+pages = [
+    [
+        [{"longValue": 1}, {"stringValue": "One"}, {"doubleValue": 7.5}],
+        [{"longValue": 2}, {"isNull": True}, {"doubleValue": 8.0}],
+    ],
+    [[{"longValue": 3}, {"stringValue": "Three"}, {"isNull": True}]],
+]
+
+
+def stub_pages(redshift_data_stubber, statement_id):
+    redshift_data_stubber.stub_get_statement_result(
+        statement_id,
+        pages[0],
+        column_metadata,
+        response_next_token="token",
+    )
+    redshift_data_stubber.stub_get_statement_result(
+        statement_id, pages[1], column_metadata, next_token="token"
+    )
+
+
+def test_iter_statement_rows(make_stubber):
+    redshift_data_client = boto3.client("redshift-data")
+    redshift_data_stubber = make_stubber(redshift_data_client)
+    redshift_data_wrapper = RedshiftDataWrapper(redshift_data_client)
+
+    stub_pages(redshift_data_stubber, "id")
+
+    got_rows = list(redshift_data_wrapper.iter_statement_rows("id"))
+    assert got_rows == [(1, "One", 7.5), (2, None, 8.0), (3, "Three", None)]
+
+
+def test_iter_statement_columns(make_stubber):
+    redshift_data_client = boto3.client("redshift-data")
+    redshift_data_stubber = make_stubber(redshift_data_client)
+    redshift_data_wrapper = RedshiftDataWrapper(redshift_data_client)
+
+    stub_pages(redshift_data_stubber, "id")
+
+    got_batches = list(redshift_data_wrapper.iter_statement_columns("id"))
+    assert got_batches == [
+        {"id": [1, 2], "title": ["One", None], "rating": [7.5, 8.0]},
+        {"id": [3], "title": ["Three"], "rating": [None]},
+    ]
+
+
+@pytest.mark.parametrize(
+    "status,has_result_set",
+    [("FINISHED", True), ("FINISHED", False), ("FAILED", None)],
+)
+def test_execute_and_fetch(make_stubber, monkeypatch, status, has_result_set):
+    redshift_data_client = boto3.client("redshift-data")
+    redshift_data_stubber = make_stubber(redshift_data_client)
+    redshift_data_wrapper = RedshiftDataWrapper(redshift_data_client)
+    monkeypatch.setattr("redshift_data.time.sleep", lambda _: None)
+
+    cluster_identifier = "test-cluster"
+    database_name = "test-database"
+    user_name = "XXXXXXXXX"
+    sql = "SELECT * FROM test_table"
+
+    redshift_data_stubber.stub_execute_statement(
+        cluster_identifier, database_name, user_name, sql
+    )
+    redshift_data_stubber.stub_describe_statement("id", status="STARTED")
+    redshift_data_stubber.stub_describe_statement(
+        "id", status=status, has_result_set=has_result_set
+    )
+    if has_result_set:
+        stub_pages(redshift_data_stubber, "id")
+
+    if status == "FINISHED":
+        got_rows = list(
+            redshift_data_wrapper.execute_and_fetch(
+                cluster_identifier, database_name, user_name, sql
+            )
+        )
+        assert len(got_rows) == (3 if has_result_set else 0)
+    else:
+        with pytest.raises(StatementError) as exc_info:
+            redshift_data_wrapper.execute_and_fetch(
+                cluster_identifier, database_name, user_name, sql
+            )
+        assert exc_info.value.status == status
@@ -299,8 +299,30 @@ class RekognitionCollection:
         else:
             return deleted_ids
 
+    # snippet-end:[python.example_code.rekognition.DeleteFaces]
 
-# snippet-end:[python.example_code.rekognition.DeleteFaces]
+    def iter_faces(self, page_size=1000):
+        """
+        Lists all of the faces in the collection. Pages of results are requested
+        only as the faces are consumed, so this can be used on collections that
+        are too large to hold in memory.
+
+        :param page_size: The number of faces to request in each call.
+        :return: A generator of the faces in the collection.
+        """
+        paginator = self.rekognition_client.get_paginator("list_faces")
+        try:
+            for page in paginator.paginate(
+                CollectionId=self.collection_id,
+                PaginationConfig={"PageSize": page_size},
+            ):
+                for face in page["Faces"]:
+                    yield RekognitionFace(face)
+        except ClientError:
+            logger.exception(
+                "Couldn't list faces in collection %s.", self.collection_id
+            )
+            raise
 
 
 # snippet-start:[python.example_code.rekognition.RekognitionCollectionManager]
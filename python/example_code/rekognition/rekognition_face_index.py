@@ -0,0 +1,314 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to use the AWS SDK for Python (Boto3) with Amazon Rekognition to index
+faces from a large number of images into a collection.
+
+Images are indexed concurrently, and throttled requests are retried with
+exponential backoff. The faces that are indexed are recorded in a local index file
+so that repeated lookups of face metadata, and checks for images that are already
+indexed, don't call Amazon Rekognition.
+"""
+
+import json
+import logging
+import mmap
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = (
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+)
+
+
+class FaceIndex:
+    """
+    A local, on-disk index of face IDs to face metadata.
+
+    Records are appended to a file as JSON lines and read back through a memory map
+    of the file, so only the position of each record is held in memory. Deleted
+    faces are recorded as tombstones, so the file only ever grows. To compact it,
+    delete the file and rebuild the index with load_collection.
+    """
+
+    def __init__(self, file_path):
+        """
+        Opens the index file, creating it if it does not exist, and reads the
+        position of every record.
+
+        :param file_path: The path to the index file.
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._image_faces = {}
+        self._file = open(file_path, "a+b")
+        self._map = None
+        self._load()
+
+    def _load(self):
+        self._remap()
+        if self._map is None:
+            return
+        offset = 0
+        while offset < len(self._map):
+            end = self._map.find(b"\n", offset)
+            if end == -1:
+                # A partial record from an interrupted write is ignored.
+                break
+            self._apply(json.loads(self._map[offset:end]), offset, end - offset)
+            offset = end + 1
+
+    def _remap(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0 or (self._map is not None and len(self._map) == size):
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+
+    def _apply(self, record, offset, length):
+        face_id = record["face_id"]
+        image_name = record.get("external_image_id")
+        if record.get("deleted"):
+            old = self._positions.pop(face_id, None)
+            if old is not None:
+                self._image_faces.get(old[2], set()).discard(face_id)
+            return
+        self._positions[face_id] = (offset, length, image_name)
+        self._image_faces.setdefault(image_name, set()).add(face_id)
+
+    def _append(self, record):
+        line = json.dumps(record, separators=(",", ":"), default=str).encode()
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(line + b"\n")
+        self._file.flush()
+        self._apply(record, offset, len(line))
+
+    def put(self, face_id, external_image_id, metadata=None):
+        """
+        Adds a face to the index, or replaces its metadata.
+
+        :param face_id: The ID of the face in the collection.
+        :param external_image_id: The name of the image that the face was indexed from.
+        :param metadata: Other JSON-serializable data about the face.
+        """
+        with self._lock:
+            self._append(
+                {
+                    **(metadata or {}),
+                    "face_id": face_id,
+                    "external_image_id": external_image_id,
+                }
+            )
+
+    def get(self, face_id):
+        """
+        :param face_id: The ID of a face.
+        :return: The metadata of the face, or None when the face is not in the index.
+        """
+        with self._lock:
+            position = self._positions.get(face_id)
+            if position is None:
+                return None
+            offset, length, _ = position
+            if self._map is None or len(self._map) < offset + length:
+                self._remap()
+            return json.loads(self._map[offset : offset + length])
+
+    def remove(self, face_ids):
+        """
+        Removes faces from the index.
+
+        :param face_ids: The IDs of the faces to remove.
+        """
+        with self._lock:
+            for face_id in face_ids:
+                position = self._positions.get(face_id)
+                if position is not None:
+                    self._append(
+                        {
+                            "face_id": face_id,
+                            "external_image_id": position[2],
+                            "deleted": True,
+                        }
+                    )
+
+    def has_image(self, external_image_id):
+        """
+        :param external_image_id: The name of an image.
+        :return: True when faces from the image are in the index.
+        """
+        with self._lock:
+            return bool(self._image_faces.get(external_image_id))
+
+    def faces_in_image(self, external_image_id):
+        """
+        :param external_image_id: The name of an image.
+        :return: The IDs of the faces in the index that came from the image.
+        """
+        with self._lock:
+            return set(self._image_faces.get(external_image_id, ()))
+
+    def load_collection(self, collection, page_size=1000):
+        """
+        Adds every face in a collection that is not yet in the index.
+
+        :param collection: A RekognitionCollection.
+        :param page_size: The number of faces to request in each call.
+        :return: The number of faces that were added.
+        """
+        added = 0
+        for face in collection.iter_faces(page_size):
+            if face.face_id not in self:
+                self.put(
+                    face.face_id,
+                    face.external_image_id,
+                    {"image_id": face.image_id, "bounding_box": face.bounding_box},
+                )
+                added += 1
+        logger.info(
+            "Added %s faces from %s to the index.", added, collection.collection_id
+        )
+        return added
+
+    def __contains__(self, face_id):
+        with self._lock:
+            return face_id in self._positions
+
+    def __len__(self):
+        with self._lock:
+            return len(self._positions)
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class IndexingStats:
+    """Counters that describe a bulk indexing run."""
+
+    def __init__(self):
+        self.images = 0
+        self.skipped = 0
+        self.faces = 0
+        self.unindexed_faces = 0
+        self.throttles = 0
+        self.failed_images = []
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def __str__(self):
+        return (
+            f"Indexed {self.faces} faces from {self.images} images in "
+            f"{self.seconds:.1f} seconds. Skipped {self.skipped} images that were "
+            f"already indexed, could not index {self.unindexed_faces} faces, "
+            f"{len(self.failed_images)} images failed, {self.throttles} requests "
+            f"were throttled."
+        )
+
+
+class BulkFaceIndexer:
+    """
+    Indexes faces from many images into a collection with several IndexFaces
+    requests in flight, and records the indexed faces in a FaceIndex.
+    """
+
+    def __init__(
+        self, collection, face_index, max_workers=4, max_faces=10, max_tries=8
+    ):
+        """
+        :param collection: The RekognitionCollection to index faces into.
+        :param face_index: The FaceIndex that records indexed faces. Images that
+                           already have faces in it are skipped.
+        :param max_workers: The number of IndexFaces requests in flight.
+        :param max_faces: The maximum number of faces to index from each image.
+        :param max_tries: The maximum number of times an image is sent when its
+                          request is throttled.
+        """
+        self.collection = collection
+        self.face_index = face_index
+        self.max_workers = max_workers
+        self.max_faces = max_faces
+        self.max_tries = max_tries
+        self.stats = IndexingStats()
+
+    def index_images(self, images):
+        """
+        Indexes faces from images. An image that fails with an error other than
+        throttling is recorded in the stats and does not stop the run.
+
+        :param images: An iterable of RekognitionImage objects. The image name is
+                       used as the external image ID of its faces.
+        :return: The stats of the run.
+        """
+        self.stats = IndexingStats()
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for image in images:
+                if self.face_index.has_image(image.image_name):
+                    self.stats.add(skipped=1)
+                    continue
+                slots.acquire()
+                future = executor.submit(self._index_image, image)
+                future.add_done_callback(lambda _: slots.release())
+        self.stats.seconds = time.perf_counter() - start
+        logger.info("%s", self.stats)
+        return self.stats
+
+    def _index_image(self, image):
+        for tries in range(self.max_tries):
+            if tries > 0:
+                time.sleep(random.uniform(0, min(2**tries * 0.1, 20)))
+            try:
+                indexed, unindexed = self.collection.index_faces(image, self.max_faces)
+            except ClientError as error:
+                if error.response["Error"]["Code"] in THROTTLING_ERROR_CODES:
+                    self.stats.add(throttles=1)
+                    continue
+                self.stats.add(failed_images=[image.image_name])
+                return
+            except Exception:
+                logger.exception("Couldn't index faces in %s.", image.image_name)
+                self.stats.add(failed_images=[image.image_name])
+                return
+            for face in indexed:
+                self.face_index.put(
+                    face.face_id,
+                    image.image_name,
+                    {"image_id": face.image_id, "bounding_box": face.bounding_box},
+                )
+            self.stats.add(images=1, faces=len(indexed), unindexed_faces=len(unindexed))
+            return
+        logger.warning(
+            "Couldn't index faces in %s after %s tries.",
+            image.image_name,
+            self.max_tries,
+        )
+        self.stats.add(failed_images=[image.image_name])
@@ -0,0 +1,274 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to use the AWS SDK for Python (Boto3) with Amazon Rekognition to analyze
+a large number of images. Images are read from a local folder or listed from an
+Amazon S3 bucket as they are needed, several detections run on each image at the
+same time, and the results of each image are written to a JSON Lines file as soon
+as its detections finish.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from rekognition_image_detection import RekognitionImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def make_rekognition_client(max_workers):
+    """
+    Creates a Rekognition client that can be shared by all the threads of a runner.
+    Its connection pool is large enough for every thread to keep a connection open,
+    and throttled requests are retried with adaptive backoff.
+
+    :param max_workers: The number of threads that will use the client.
+    :return: A Boto3 Rekognition client.
+    """
+    return boto3.client(
+        "rekognition",
+        config=Config(
+            max_pool_connections=max_workers,
+            retries={"max_attempts": 10, "mode": "adaptive"},
+        ),
+    )
+
+
+def images_from_folder(folder, rekognition_client, extensions=IMAGE_EXTENSIONS):
+    """
+    Lists the images in a local folder. The bytes of each image are read only when
+    the runner asks for the next image.
+
+    :param folder: The folder that contains the images.
+    :param rekognition_client: A Boto3 Rekognition client.
+    :param extensions: The file extensions of the files to include.
+    :return: A generator of RekognitionImage objects.
+    """
+    for entry in sorted(os.scandir(folder), key=lambda entry: entry.name):
+        if entry.is_file() and entry.name.lower().endswith(extensions):
+            yield RekognitionImage.from_file(entry.path, rekognition_client)
+
+
+def images_from_bucket(bucket, rekognition_client, prefix=""):
+    """
+    Lists the images in an Amazon S3 bucket. Objects are listed one page at a time
+    and the images are never downloaded, because Amazon Rekognition reads them
+    directly from Amazon S3.
+
+    :param bucket: A Boto3 Bucket resource.
+    :param rekognition_client: A Boto3 Rekognition client.
+    :param prefix: Only objects whose keys start with this prefix are included.
+    :return: A generator of RekognitionImage objects.
+    """
+    for s3_object in bucket.objects.filter(Prefix=prefix):
+        if s3_object.key.lower().endswith(IMAGE_EXTENSIONS):
+            yield RekognitionImage.from_bucket(s3_object, rekognition_client)
+
+
+class JsonLinesSink:
+    """Writes one JSON document per line to a file, from any number of threads."""
+
+    def __init__(self, file):
+        """
+        :param file: A text file that is open for writing.
+        """
+        self.file = file
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+
+class BatchStats:
+    """Counters that describe a batch run."""
+
+    def __init__(self):
+        self.images = 0
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, images=0, calls=0, errors=0):
+        with self._lock:
+            self.images += images
+            self.calls += calls
+            self.errors += errors
+
+    @property
+    def images_per_second(self):
+        return self.images / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Analyzed {self.images} images with {self.calls} calls "
+            f"({self.errors} errors) in {self.seconds:.1f} seconds, "
+            f"{self.images_per_second:.1f} images per second."
+        )
+
+
+class ImageBatchRunner:
+    """
+    Runs a set of detections on many images over a bounded pool of threads that
+    share one Rekognition client.
+    """
+
+    def __init__(self, detections=("labels",), max_workers=8, max_labels=10):
+        """
+        :param detections: The detections to run on each image. Each must be a key
+                           of DETECTIONS.
+        :param max_workers: The number of detection calls in flight at the same time.
+        :param max_labels: The maximum number of labels returned for each image.
+        """
+        unknown = set(detections) - set(DETECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown detections: {', '.join(sorted(unknown))}.")
+        self.detections = detections
+        self.max_workers = max_workers
+        self.max_labels = max_labels
+        self.stats = BatchStats()
+
+    def run(self, images, sink):
+        """
+        Analyzes images and writes a record for each image to the sink. The record
+        contains the image name, the results of each detection that succeeded, and
+        the error code of each detection that failed.
+
+        :param images: An iterable of RekognitionImage objects. Images are taken from
+                       it only when there is room in the pool, so only a few images
+                       are held in memory at a time.
+        :param sink: An object with a write(record) method, such as JsonLinesSink.
+        :return: The stats of the run.
+        """
+        self.stats = BatchStats()
+        # Bounds the images in flight so that the pool queue stays short.
+        slots = threading.BoundedSemaphore(
+            max(1, self.max_workers * 2 // len(self.detections))
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for image in images:
+                slots.acquire()
+                record = {"image": image.image_name}
+                remaining = [len(self.detections)]
+                lock = threading.Lock()
+                for detection in self.detections:
+                    executor.submit(
+                        self._detect,
+                        image,
+                        detection,
+                        record,
+                        remaining,
+                        lock,
+                        sink,
+                        slots,
+                    )
+        self.stats.seconds = time.perf_counter() - start
+        logger.info("%s", self.stats)
+        return self.stats
+
+    def _detect(self, image, detection, record, remaining, lock, sink, slots):
+        """
+        Runs one detection on an image. The thread that finishes the last detection
+        of an image writes its record.
+        """
+        try:
+            result = DETECTIONS[detection](image, self)
+            errors = 0
+        except ClientError as error:
+            result = {"error": error.response["Error"]["Code"]}
+            errors = 1
+        except Exception as error:
+            logger.exception("Couldn't run %s on %s.", detection, image.image_name)
+            result = {"error": type(error).__name__}
+            errors = 1
+        self.stats.add(calls=1, errors=errors)
+        with lock:
+            record[detection] = result
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            try:
+                sink.write(record)
+                self.stats.add(images=1)
+            except Exception:
+                logger.exception("Couldn't write the results of %s.", image.image_name)
+            finally:
+                slots.release()
+
+
+def _detect_celebrities(image, runner):
+    celebrities, other_faces = image.recognize_celebrities()
+    return {
+        "celebrities": [celebrity.to_dict() for celebrity in celebrities],
+        "other_faces": len(other_faces),
+    }
+
+
+# The detections that a runner can run, each as a function of an image and the runner
+# that returns a JSON-serializable result.
+DETECTIONS = {
+    "labels": lambda image, runner: [
+        label.to_dict() for label in image.detect_labels(runner.max_labels)
+    ],
+    "faces": lambda image, runner: [face.to_dict() for face in image.detect_faces()],
+    "moderation": lambda image, runner: [
+        label.to_dict() for label in image.detect_moderation_labels()
+    ],
+    "text": lambda image, runner: [text.to_dict() for text in image.detect_text()],
+    "celebrities": _detect_celebrities,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze the images in a local folder or an Amazon S3 bucket."
+    )
+    parser.add_argument(
+        "source", help="A local folder, or s3://bucket/prefix for images in Amazon S3."
+    )
+    parser.add_argument("output", help="The JSON Lines file to write results to.")
+    parser.add_argument(
+        "--detections",
+        nargs="+",
+        default=["labels"],
+        choices=list(DETECTIONS),
+        help="The detections to run on each image.",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    rekognition_client = make_rekognition_client(args.workers)
+    if args.source.startswith("s3://"):
+        bucket_name, _, prefix = args.source[len("s3://") :].partition("/")
+        bucket = boto3.resource("s3").Bucket(bucket_name)
+        images = images_from_bucket(bucket, rekognition_client, prefix)
+    else:
+        images = images_from_folder(args.source, rekognition_client)
+
+    runner = ImageBatchRunner(args.detections, max_workers=args.workers)
+    with open(args.output, "w") as output:
+        stats = runner.run(images, JsonLinesSink(output))
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
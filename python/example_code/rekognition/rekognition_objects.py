@@ -106,6 +106,7 @@ class RekognitionFace:
         ]
         self.face_id = face.get("FaceId")
         self.image_id = face.get("ImageId")
+        self.external_image_id = face.get("ExternalImageId")
         self.timestamp = timestamp
 
     def to_dict(self):
@@ -26,6 +26,44 @@ from rekognition_objects import (
 
 logger = logging.getLogger(__name__)
 
+# For each type of video job, the Boto3 functions that start the job and get its
+# results, the key of the results in a get response, and a function that wraps a
+# result in an object.
+VIDEO_JOBS = {
+    "label detection": (
+        "start_label_detection",
+        "get_label_detection",
+        "Labels",
+        lambda item: RekognitionLabel(item["Label"], item["Timestamp"]),
+    ),
+    "face detection": (
+        "start_face_detection",
+        "get_face_detection",
+        "Faces",
+        lambda item: RekognitionFace(item["Face"], item["Timestamp"]),
+    ),
+    "person tracking": (
+        "start_person_tracking",
+        "get_person_tracking",
+        "Persons",
+        lambda item: RekognitionPerson(item["Person"], item["Timestamp"]),
+    ),
+    "celebrity recognition": (
+        "start_celebrity_recognition",
+        "get_celebrity_recognition",
+        "Celebrities",
+        lambda item: RekognitionCelebrity(item["Celebrity"], item["Timestamp"]),
+    ),
+    "content moderation": (
+        "start_content_moderation",
+        "get_content_moderation",
+        "ModerationLabels",
+        lambda item: RekognitionModerationLabel(
+            item["ModerationLabel"], item["Timestamp"]
+        ),
+    ),
+}
+
 
 class RekognitionVideo:
     """
@@ -245,6 +283,45 @@ class RekognitionVideo:
         else:
             return results
 
+    def start_job(self, job_type):
+        """
+        Starts a job without waiting for it to complete. Amazon Rekognition
+        publishes a message to the notification channel when the job completes.
+
+        :param job_type: The type of job to start. One of the keys of VIDEO_JOBS.
+        :return: The ID of the job.
+        """
+        start_job_name = VIDEO_JOBS[job_type][0]
+        return self._start_rekognition_job(
+            job_type, getattr(self.rekognition_client, start_job_name)
+        )
+
+    def iter_job_results(self, job_type, job_id, page_size=1000):
+        """
+        Gets the results of a completed job. Pages of results are requested only as
+        the results are consumed, so the results of a long video are never all held
+        in memory.
+
+        :param job_type: The type of the job. One of the keys of VIDEO_JOBS.
+        :param job_id: The ID of the job.
+        :param page_size: The number of results to request in each call.
+        :return: A generator of result objects.
+        """
+        _, get_results_name, result_key, wrap_result = VIDEO_JOBS[job_type]
+        get_results_func = getattr(self.rekognition_client, get_results_name)
+        kwargs = {"JobId": job_id, "MaxResults": page_size}
+        while True:
+            try:
+                response = get_results_func(**kwargs)
+            except ClientError:
+                logger.exception("Couldn't get items for %s.", job_id)
+                raise
+            for item in response[result_key]:
+                yield wrap_result(item)
+            if not response.get("NextToken"):
+                break
+            kwargs["NextToken"] = response["NextToken"]
+
     def _do_rekognition_job(
         self, job_description, start_job_func, get_results_func, result_extractor
     ):
@@ -0,0 +1,241 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to use the AWS SDK for Python (Boto3) with Amazon Rekognition to run many
+video detection jobs at the same time.
+
+Every job sends its completion notification to the same Amazon SQS queue. A single
+thread long-polls the queue, matches each notification to its job, and runs the
+callback of the job on a worker thread. The results of a job are read one page at a
+time as the callback consumes them.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+class VideoJob:
+    """A video detection job that was started by a VideoJobManager."""
+
+    def __init__(self, video, job_type, job_id, on_complete):
+        """
+        :param video: The RekognitionVideo that the job analyzes.
+        :param job_type: The type of the job. One of the keys of VIDEO_JOBS.
+        :param job_id: The ID of the job.
+        :param on_complete: A function that is called with the job when it completes.
+        """
+        self.video = video
+        self.job_type = job_type
+        self.job_id = job_id
+        self.on_complete = on_complete
+        self.status = None
+        self._done = threading.Event()
+
+    def results(self, page_size=1000):
+        """
+        :param page_size: The number of results to request in each call.
+        :return: A generator of the result objects of the job.
+        """
+        return self.video.iter_job_results(self.job_type, self.job_id, page_size)
+
+    def wait(self, timeout=None):
+        """
+        Waits until the job completes and its callback returns.
+
+        :param timeout: The maximum number of seconds to wait.
+        :return: True when the job completed.
+        """
+        return self._done.wait(timeout)
+
+
+class VideoJobManager:
+    """
+    Starts video detection jobs and dispatches their completion notifications from
+    one Amazon SQS queue to a callback for each job.
+    """
+
+    def __init__(self, queue, callback_workers=4, wait_time_seconds=20):
+        """
+        :param queue: The Boto3 Queue resource that receives the notifications of
+                      the jobs. All jobs must use the notification channel that
+                      publishes to this queue.
+        :param callback_workers: The number of callbacks that can run at once.
+        :param wait_time_seconds: The long polling time of each receive request.
+        """
+        self.queue = queue
+        self.wait_time_seconds = wait_time_seconds
+        self._jobs = {}
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._callbacks = ThreadPoolExecutor(
+            max_workers=callback_workers, thread_name_prefix="video-job-callback"
+        )
+        self._receiver = threading.Thread(target=self._receive, daemon=True)
+        self._receiver.start()
+
+    def start_job(self, video, job_type, on_complete):
+        """
+        Starts a job. The callback is called on a worker thread when the job
+        completes, whether it succeeded or not. Check job.status in the callback.
+
+        :param video: The RekognitionVideo to analyze. Its notification channel
+                      must publish to the queue of this manager.
+        :param job_type: The type of the job. One of the keys of VIDEO_JOBS.
+        :param on_complete: A function that takes the completed VideoJob.
+        :return: The VideoJob.
+        """
+        # The lock is held while the job starts so that its notification can't be
+        # received before the job is registered.
+        with self._condition:
+            job_id = video.start_job(job_type)
+            job = VideoJob(video, job_type, job_id, on_complete)
+            self._jobs[job_id] = job
+            self._in_flight += 1
+            self._condition.notify_all()
+        return job
+
+    def wait(self, timeout=None):
+        """
+        Waits until every job that was started has completed and its callback has
+        returned.
+
+        :param timeout: The maximum number of seconds to wait.
+        :return: True when all jobs completed.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def close(self):
+        """
+        Stops receiving notifications and waits for running callbacks to return.
+        """
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._receiver.join()
+        self._callbacks.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _receive(self):
+        """
+        Long-polls the queue while jobs are in flight and dispatches each
+        notification to the callback of its job.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or self._stop.is_set())
+            if self._stop.is_set():
+                return
+            try:
+                messages = self.queue.receive_messages(
+                    MaxNumberOfMessages=10, WaitTimeSeconds=self.wait_time_seconds
+                )
+            except ClientError:
+                logger.exception("Couldn't receive messages from %s.", self.queue.url)
+                time.sleep(1)
+                continue
+            handled = []
+            for message in messages:
+                job = self._match_job(message)
+                if job is not None:
+                    handled.append(message)
+                    self._callbacks.submit(self._complete, job)
+            if handled:
+                self._delete_messages(handled)
+
+    def _match_job(self, message):
+        """
+        Finds the job of a notification and records its status.
+
+        :return: The job, or None when the notification is not for a job of this
+                 manager. Such messages are left in the queue.
+        """
+        try:
+            notification = json.loads(json.loads(message.body)["Message"])
+            job_id = notification["JobId"]
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Got a message that isn't a job notification.")
+            return None
+        with self._condition:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            logger.warning("Got a notification for unknown job %s.", job_id)
+            return None
+        job.status = notification["Status"]
+        logger.info(
+            "Job %s on %s completed with status %s.",
+            job_id,
+            job.video.video_name,
+            job.status,
+        )
+        return job
+
+    def _delete_messages(self, messages):
+        try:
+            response = self.queue.delete_messages(
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": message.receipt_handle}
+                    for index, message in enumerate(messages)
+                ]
+            )
+            if response.get("Failed"):
+                logger.warning(
+                    "Couldn't delete %s notifications.", len(response["Failed"])
+                )
+        except ClientError:
+            logger.exception("Couldn't delete notifications from %s.", self.queue.url)
+
+    def _complete(self, job):
+        try:
+            job.on_complete(job)
+        except Exception:
+            logger.exception("The callback of job %s failed.", job.job_id)
+        finally:
+            job._done.set()
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+
+def usage_demo(videos, job_type="label detection"):
+    """
+    Runs a job on several videos at once and prints the first results of each.
+
+    :param videos: RekognitionVideo objects that share one notification channel,
+                   such as one created by create_notification_channel.
+    :param job_type: The type of job to run on each video.
+    """
+    print_lock = threading.Lock()
+
+    def on_complete(job):
+        first_results = []
+        if job.status == "SUCCEEDED":
+            for result in job.results():
+                first_results.append(result.to_dict())
+                if len(first_results) == 5:
+                    break
+        with print_lock:
+            print(f"{job.video.video_name}: {job.status}. First results:")
+            for result in first_results:
+                print(f"\t{result}")
+
+    with VideoJobManager(videos[0].queue) as manager:
+        for video in videos:
+            manager.start_job(video, job_type, on_complete)
+        manager.wait()
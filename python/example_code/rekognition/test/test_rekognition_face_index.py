@@ -0,0 +1,142 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Unit tests for rekognition_face_index.py.
+"""
+
+import boto3
+from botocore.exceptions import ClientError
+import pytest
+
+import rekognition_face_index
+from rekognition_collections import RekognitionCollection
+from rekognition_face_index import BulkFaceIndexer, FaceIndex
+from rekognition_image_detection import RekognitionImage
+from rekognition_objects import RekognitionFace
+
+COLLECTION_ID = "test-collection-id"
+
+
+def make_face(index):
+    return RekognitionFace(
+        {
+            "FaceId": f"face-{index}",
+            "ImageId": f"image-id-{index}",
+            "ExternalImageId": f"image-{index // 2}",
+            "BoundingBox": {"Left": 0, "Top": 0.5, "Width": 0.3, "Height": 0.7},
+        }
+    )
+
+
+def test_face_index_persists(tmp_path):
+    file_path = str(tmp_path / "faces.jsonl")
+    with FaceIndex(file_path) as face_index:
+        face_index.put("face-1", "image-1", {"image_id": "id-1"})
+        face_index.put("face-2", "image-1", {"image_id": "id-2"})
+        face_index.put("face-3", "image-2", {"image_id": "id-3"})
+        face_index.remove(["face-1", "face-unknown"])
+        assert face_index.get("face-2") == {
+            "image_id": "id-2",
+            "face_id": "face-2",
+            "external_image_id": "image-1",
+        }
+
+    with FaceIndex(file_path) as face_index:
+        assert len(face_index) == 2
+        assert "face-1" not in face_index
+        assert face_index.get("face-1") is None
+        assert face_index.get("face-3")["image_id"] == "id-3"
+        assert face_index.faces_in_image("image-1") == {"face-2"}
+        assert face_index.has_image("image-2")
+        assert not face_index.has_image("image-3")
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_load_collection(make_stubber, tmp_path, error_code):
+    rekognition_client = boto3.client("rekognition")
+    rekognition_stubber = make_stubber(rekognition_client)
+    collection = RekognitionCollection(
+        {"CollectionId": COLLECTION_ID}, rekognition_client
+    )
+    faces = [make_face(index) for index in range(4)]
+    page_size = 2
+
+    rekognition_stubber.stub_list_faces(
+        COLLECTION_ID, page_size, faces[:2], response_next_token="test-token"
+    )
+    rekognition_stubber.stub_list_faces(
+        COLLECTION_ID,
+        page_size,
+        faces[2:],
+        next_token="test-token",
+        error_code=error_code,
+    )
+
+    with FaceIndex(str(tmp_path / "faces.jsonl")) as face_index:
+        face_index.put("face-0", "image-0")
+        if error_code is None:
+            assert face_index.load_collection(collection, page_size) == 3
+            assert len(face_index) == 4
+            assert face_index.get("face-3")["image_id"] == "image-id-3"
+            assert face_index.faces_in_image("image-1") == {"face-2", "face-3"}
+        else:
+            with pytest.raises(ClientError) as exc_info:
+                face_index.load_collection(collection, page_size)
+            assert exc_info.value.response["Error"]["Code"] == error_code
+            assert len(face_index) == 2
+
+
+def test_index_images(make_stubber, make_faces, tmp_path, monkeypatch):
+    rekognition_client = boto3.client("rekognition")
+    rekognition_stubber = make_stubber(rekognition_client)
+    collection = RekognitionCollection(
+        {"CollectionId": COLLECTION_ID}, rekognition_client
+    )
+    monkeypatch.setattr(rekognition_face_index.time, "sleep", lambda seconds: None)
+    images = [
+        RekognitionImage({"Bytes": f"image {index}".encode()}, f"image-{index}", None)
+        for index in range(4)
+    ]
+    max_faces = 5
+    indexed_faces = [
+        RekognitionFace({**face, "FaceId": f"face-{index}", "ImageId": "test-id"})
+        for index, face in enumerate(make_faces(2, True))
+    ]
+    unindexed_faces = [RekognitionFace(face) for face in make_faces(1, True)]
+
+    rekognition_stubber.stub_index_faces(
+        COLLECTION_ID,
+        images[1],
+        max_faces,
+        [],
+        [],
+        error_code="ProvisionedThroughputExceededException",
+    )
+    rekognition_stubber.stub_index_faces(
+        COLLECTION_ID, images[1], max_faces, indexed_faces, unindexed_faces
+    )
+    rekognition_stubber.stub_index_faces(
+        COLLECTION_ID, images[2], max_faces, [], [], error_code="TestException"
+    )
+    rekognition_stubber.stub_index_faces(
+        COLLECTION_ID, images[3], max_faces, [], unindexed_faces
+    )
+
+    with FaceIndex(str(tmp_path / "faces.jsonl")) as face_index:
+        face_index.put("face-old", "image-0")
+        indexer = BulkFaceIndexer(
+            collection, face_index, max_workers=1, max_faces=max_faces
+        )
+        stats = indexer.index_images(images)
+
+        assert face_index.faces_in_image("image-1") == {"face-0", "face-1"}
+        assert face_index.get("face-1")["image_id"] == "test-id"
+    assert stats.skipped == 1
+    assert stats.images == 2
+    assert stats.faces == 2
+    assert stats.unindexed_faces == 2
+    assert stats.throttles == 1
+    assert stats.failed_images == ["image-2"]
@@ -0,0 +1,71 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Unit tests for rekognition_image_batch.py.
+"""
+
+import io
+import json
+
+import boto3
+import pytest
+
+from rekognition_image_batch import (
+    ImageBatchRunner,
+    JsonLinesSink,
+    images_from_folder,
+)
+from rekognition_objects import RekognitionLabel, RekognitionText
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_run(make_stubber, make_labels, make_texts, tmp_path, error_code):
+    rekognition_client = boto3.client("rekognition")
+    rekognition_stubber = make_stubber(rekognition_client)
+    for index in range(3):
+        (tmp_path / f"image-{index}.jpg").write_bytes(f"image {index}".encode())
+    (tmp_path / "notes.txt").write_text("not an image")
+    labels = [RekognitionLabel(label) for label in make_labels(2)]
+    texts = [RekognitionText(text) for text in make_texts(2)]
+    max_labels = 5
+
+    # With one worker, detections run in the order they are submitted.
+    for index in range(3):
+        image = {"Bytes": f"image {index}".encode()}
+        rekognition_stubber.stub_detect_labels(
+            image,
+            max_labels,
+            labels,
+            error_code=error_code if index == 1 else None,
+        )
+        rekognition_stubber.stub_detect_text(image, texts)
+
+    runner = ImageBatchRunner(("labels", "text"), max_workers=1, max_labels=max_labels)
+    output = io.StringIO()
+    stats = runner.run(
+        images_from_folder(str(tmp_path), rekognition_client), JsonLinesSink(output)
+    )
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["image"] for record in records] == [
+        str(tmp_path / f"image-{index}.jpg") for index in range(3)
+    ]
+    for index, record in enumerate(records):
+        if error_code is not None and index == 1:
+            assert record["labels"] == {"error": error_code}
+        else:
+            assert record["labels"] == [label.to_dict() for label in labels]
+        assert record["text"] == json.loads(
+            json.dumps([text.to_dict() for text in texts])
+        )
+    assert stats.images == 3
+    assert stats.calls == 6
+    assert stats.errors == (0 if error_code is None else 1)
+
+
+def test_runner_rejects_unknown_detection():
+    with pytest.raises(ValueError):
+        ImageBatchRunner(("labels", "unknown"))
@@ -438,3 +438,61 @@ def test_do_content_moderation(
         with pytest.raises(ClientError) as exc_info:
             video.do_content_moderation()
         assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_iter_job_results(make_stubber, monkeypatch, error_code):
+    rekognition_client = boto3.client("rekognition")
+    rekognition_stubber = make_stubber(rekognition_client)
+    video = mock_video(monkeypatch, "SUCCEEDED", rekognition_client)
+    job_id = "test-job-id"
+    page_size = 2
+    items = [
+        {"Timestamp": index, "Label": {"Name": f"label-{index}"}} for index in range(3)
+    ]
+
+    rekognition_stubber.stub_get_job_results_page(
+        "get_label_detection",
+        job_id,
+        page_size,
+        "Labels",
+        items[:2],
+        response_next_token="test-token",
+    )
+    rekognition_stubber.stub_get_job_results_page(
+        "get_label_detection",
+        job_id,
+        page_size,
+        "Labels",
+        items[2:],
+        next_token="test-token",
+        error_code=error_code,
+    )
+
+    results = video.iter_job_results("label detection", job_id, page_size)
+    # The first page is read only when the first result is consumed.
+    first = next(results)
+    assert first.to_dict() == {"name": "label-0", "timestamp": 0}
+    if error_code is None:
+        assert [label.name for label in results] == ["label-1", "label-2"]
+    else:
+        assert next(results).name == "label-1"
+        with pytest.raises(ClientError) as exc_info:
+            next(results)
+        assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_start_job(make_stubber, monkeypatch):
+    rekognition_client = boto3.client("rekognition")
+    rekognition_stubber = make_stubber(rekognition_client)
+    video = mock_video(monkeypatch, "SUCCEEDED", rekognition_client)
+    job_id = "test-job-id"
+
+    rekognition_stubber.stub_start_detection(
+        "start_face_detection",
+        video.video,
+        video.get_notification_channel(),
+        job_id,
+    )
+
+    assert video.start_job("face detection") == job_id
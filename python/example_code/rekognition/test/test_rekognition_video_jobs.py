@@ -0,0 +1,112 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Unit tests for rekognition_video_jobs.py.
+"""
+
+import json
+import queue
+import threading
+
+from rekognition_video_jobs import VideoJobManager
+
+
+class FakeMessage:
+    def __init__(self, job_id, status):
+        self.body = json.dumps(
+            {"Message": json.dumps({"JobId": job_id, "Status": status})}
+        )
+        self.receipt_handle = f"receipt-{job_id}"
+
+
+class FakeQueue:
+    """A stand-in for an SQS Queue resource that is fed by the test."""
+
+    url = "https://sqs.us-west-2.amazonaws.com/123456789012/test-queue"
+
+    def __init__(self):
+        self.incoming = queue.Queue()
+        self.deleted = []
+        self.receive_calls = 0
+        self._lock = threading.Lock()
+
+    def receive_messages(self, MaxNumberOfMessages, WaitTimeSeconds):
+        self.receive_calls += 1
+        messages = []
+        try:
+            messages.append(self.incoming.get(timeout=0.05))
+            while len(messages) < MaxNumberOfMessages:
+                messages.append(self.incoming.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def delete_messages(self, Entries):
+        with self._lock:
+            self.deleted += [entry["ReceiptHandle"] for entry in Entries]
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+
+class FakeVideo:
+    def __init__(self, name):
+        self.video_name = name
+        self.started = []
+
+    def start_job(self, job_type):
+        job_id = f"{self.video_name}-{job_type}"
+        self.started.append(job_id)
+        return job_id
+
+    def iter_job_results(self, job_type, job_id, page_size):
+        for index in range(3):
+            yield f"{job_id}-result-{index}"
+
+
+def test_manager_dispatches_completions():
+    fake_queue = FakeQueue()
+    videos = [FakeVideo(f"video-{index}") for index in range(3)]
+    completed = {}
+
+    def on_complete(job):
+        completed[job.job_id] = (job.status, list(job.results()))
+
+    with VideoJobManager(fake_queue, wait_time_seconds=1) as manager:
+        jobs = [manager.start_job(video, "labels", on_complete) for video in videos]
+        fake_queue.incoming.put(FakeMessage("unknown-job", "SUCCEEDED"))
+        fake_queue.incoming.put(FakeMessage(jobs[2].job_id, "FAILED"))
+        fake_queue.incoming.put(FakeMessage(jobs[0].job_id, "SUCCEEDED"))
+        assert jobs[0].wait(5)
+        fake_queue.incoming.put(FakeMessage(jobs[1].job_id, "SUCCEEDED"))
+        assert manager.wait(5)
+
+    assert completed == {
+        job.job_id: (
+            "FAILED" if job is jobs[2] else "SUCCEEDED",
+            [f"{job.job_id}-result-{index}" for index in range(3)],
+        )
+        for job in jobs
+    }
+    assert sorted(fake_queue.deleted) == sorted(f"receipt-{job.job_id}" for job in jobs)
+
+
+def test_manager_survives_callback_error():
+    fake_queue = FakeQueue()
+
+    def on_complete(job):
+        raise RuntimeError("test error")
+
+    with VideoJobManager(fake_queue, wait_time_seconds=1) as manager:
+        job = manager.start_job(FakeVideo("video"), "labels", on_complete)
+        fake_queue.incoming.put(FakeMessage(job.job_id, "SUCCEEDED"))
+        assert manager.wait(5)
+    assert job.status == "SUCCEEDED"
+
+
+def test_manager_does_not_poll_without_jobs():
+    fake_queue = FakeQueue()
+    with VideoJobManager(fake_queue, wait_time_seconds=1) as manager:
+        assert manager.wait(0.1)
+    assert fake_queue.receive_calls == 0
@@ -0,0 +1,466 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Synchronize a local folder with an Amazon S3 prefix by using one Boto 3 transfer
+manager for every file.
+
+Copying a tree of many small files one call at a time spends most of its time on
+per-file overhead. This example lists the local tree and the Amazon S3 prefix in
+parallel, skips files that have not changed, and submits every remaining file to a
+single transfer manager. The transfer manager runs small files as single requests
+and large files as multipart transfers, all on its shared pool of threads.
+
+Files are compared by size, and then by ETag. A local manifest records the size,
+modification time, and ETag of every file that was synchronized, so on later runs
+unchanged files are skipped without reading them.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config
+from s3transfer.utils import ChunksizeAdjuster
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = ".s3sync-manifest.json"
+
+
+class SyncManifest:
+    """
+    The size, modification time, and ETag of each file at the time it was last
+    synchronized, keyed by object key and saved as a JSON file.
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: The path of the manifest file. When the file does not
+                          exist, the manifest starts empty.
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        try:
+            with open(file_path) as file:
+                self._entries = json.load(file)
+        except FileNotFoundError:
+            self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, size, mtime_ns, etag):
+        with self._lock:
+            self._entries[key] = {"size": size, "mtime_ns": mtime_ns, "etag": etag}
+
+    def save(self):
+        """Writes the manifest to a temporary file and then replaces the old one."""
+        with self._lock:
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(self._entries, file, separators=(",", ":"))
+            os.replace(temp_path, self.file_path)
+
+
+@dataclass
+class SyncResult:
+    """The files that a synchronization run transferred, skipped, or failed."""
+
+    transferred: int = 0
+    skipped: int = 0
+    bytes: int = 0
+    failed: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def file_etag(file_path, size, config):
+    """
+    Calculates the ETag that Amazon S3 gives a file uploaded by the transfer
+    manager with a configuration. This is the MD5 digest of the file, or for
+    multipart uploads, the MD5 digest of the digests of its parts.
+
+    :param file_path: The path of the file.
+    :param size: The size of the file.
+    :param config: The TransferConfig of the upload.
+    :return: The ETag, without quotes.
+    """
+    with open(file_path, "rb") as file:
+        if size < config.multipart_threshold:
+            return hashlib.md5(file.read()).hexdigest()
+        chunksize = ChunksizeAdjuster().adjust_chunksize(
+            config.multipart_chunksize, size
+        )
+        digests = [
+            hashlib.md5(chunk).digest()
+            for chunk in iter(lambda: file.read(chunksize), b"")
+        ]
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+class DirectorySync:
+    """
+    Uploads a local folder to an Amazon S3 prefix, or downloads a prefix to a local
+    folder, transferring only files that have changed.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name,
+        config=None,
+        max_walkers=8,
+        max_pending=1000,
+        transfer_manager=None,
+    ):
+        """
+        :param s3_client: A Boto3 Amazon S3 client. Its connection pool should be at
+                          least as large as the max_concurrency of the config.
+        :param bucket_name: The bucket to synchronize with.
+        :param config: The TransferConfig of the shared transfer manager.
+        :param max_walkers: The number of threads that list folders and prefixes and
+                            compare file contents.
+        :param max_pending: The maximum number of transfers submitted to the
+                            transfer manager and not yet finished.
+        :param transfer_manager: A transfer manager to use instead of creating one.
+                                 The caller owns it, so close doesn't shut it down.
+        """
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.config = config or TransferConfig()
+        self.max_pending = max_pending
+        self._walkers = ThreadPoolExecutor(
+            max_workers=max_walkers, thread_name_prefix="s3sync-walker"
+        )
+        self._owns_manager = transfer_manager is None
+        self._manager = transfer_manager or create_transfer_manager(
+            s3_client, self.config
+        )
+
+    def close(self):
+        """
+        Stops the walker threads, and the transfer manager when this object
+        created it.
+        """
+        if self._owns_manager:
+            self._manager.shutdown()
+        self._walkers.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def upload(self, local_dir, prefix="", manifest_path=None):
+        """
+        Uploads every file in a local folder that is missing or different in the
+        prefix. Objects in the prefix that have no local file are left in place.
+
+        :param local_dir: The folder to upload.
+        :param prefix: The prefix of the object keys. Each key is the prefix
+                       followed by the path of the file relative to the folder.
+        :param manifest_path: The path of the manifest file. By default, it is kept
+                              in the local folder and is not uploaded.
+        :return: A SyncResult.
+        """
+        prefix = _normalize_prefix(prefix)
+        manifest = SyncManifest(
+            manifest_path or os.path.join(local_dir, MANIFEST_FILE_NAME)
+        )
+        start = time.perf_counter()
+        local_files, remote_objects = self._walk(local_dir, prefix)
+        local_files.pop(MANIFEST_FILE_NAME, None)
+
+        result = SyncResult()
+        changed = self._find_changed(
+            (
+                (prefix + rel_path, local, remote_objects.get(prefix + rel_path))
+                for rel_path, local in local_files.items()
+            ),
+            manifest,
+            result,
+        )
+        self._transfer(
+            (
+                (
+                    key,
+                    local,
+                    None,
+                    lambda path=local[0], key=key: self._manager.upload(
+                        path, self.bucket_name, key
+                    ),
+                )
+                for key, local, _ in changed
+            ),
+            manifest,
+            result,
+        )
+        manifest.save()
+        result.seconds = time.perf_counter() - start
+        logger.info(
+            "Uploaded %s files in %.1f seconds. %s were unchanged and %s failed.",
+            result.transferred,
+            result.seconds,
+            result.skipped,
+            len(result.failed),
+        )
+        return result
+
+    def download(self, prefix, local_dir, manifest_path=None):
+        """
+        Downloads every object in a prefix that is missing or different in a local
+        folder. Local files that have no object are left in place.
+
+        :param prefix: The prefix of the objects to download.
+        :param local_dir: The folder to download to. It is created if it does not
+                          exist.
+        :param manifest_path: The path of the manifest file. By default, it is kept
+                              in the local folder.
+        :return: A SyncResult.
+        """
+        prefix = _normalize_prefix(prefix)
+        os.makedirs(local_dir, exist_ok=True)
+        manifest = SyncManifest(
+            manifest_path or os.path.join(local_dir, MANIFEST_FILE_NAME)
+        )
+        start = time.perf_counter()
+        local_files, remote_objects = self._walk(local_dir, prefix)
+
+        result = SyncResult()
+        changed = self._find_changed(
+            (
+                (key, local_files.get(key[len(prefix) :]), remote)
+                for key, remote in remote_objects.items()
+                if not key.endswith("/")
+            ),
+            manifest,
+            result,
+            download=True,
+        )
+
+        def download_file(key):
+            path = os.path.join(local_dir, *key[len(prefix) :].split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return self._manager.download(self.bucket_name, key, path)
+
+        self._transfer(
+            (
+                (key, None, remote, lambda key=key: download_file(key))
+                for key, _, remote in changed
+            ),
+            manifest,
+            result,
+            local_dir=local_dir,
+            prefix=prefix,
+        )
+        manifest.save()
+        result.seconds = time.perf_counter() - start
+        logger.info(
+            "Downloaded %s files in %.1f seconds. %s were unchanged and %s failed.",
+            result.transferred,
+            result.seconds,
+            result.skipped,
+            len(result.failed),
+        )
+        return result
+
+    def _walk(self, local_dir, prefix):
+        """
+        Lists the local folder and the prefix at the same time. Each subfolder and
+        each level of the prefix is listed by a separate walker thread.
+
+        :return: A dict of relative paths to (path, size, mtime_ns) tuples, and a
+                 dict of keys to (size, etag) tuples.
+        """
+        with ThreadPoolExecutor(max_workers=1) as lister:
+            remote_future = lister.submit(
+                self._walk_tree, self._list_prefix_level, prefix
+            )
+            local_files = {
+                os.path.relpath(path, local_dir).replace(os.sep, "/"): local
+                for path, local in self._walk_tree(self._scan_folder, local_dir).items()
+            }
+            return local_files, remote_future.result()
+
+    def _walk_tree(self, list_level, root):
+        """
+        Lists a tree breadth first. Each level is listed on a walker thread, and
+        the subtrees it finds are submitted as soon as it returns.
+
+        :param list_level: A function that takes a node and returns a dict of the
+                           entries in it and a list of the nodes under it.
+        :param root: The root node.
+        :return: A dict of the entries in the tree.
+        """
+        entries = {}
+        pending = {self._walkers.submit(list_level, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                level_entries, children = future.result()
+                entries.update(level_entries)
+                pending.update(
+                    self._walkers.submit(list_level, child) for child in children
+                )
+        return entries
+
+    @staticmethod
+    def _scan_folder(path):
+        files = {}
+        folders = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (entry.path, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return files, folders
+
+    def _list_prefix_level(self, prefix):
+        objects = {}
+        prefixes = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"
+        ):
+            for obj in page.get("Contents", []):
+                objects[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+            prefixes.extend(
+                common["Prefix"] for common in page.get("CommonPrefixes", [])
+            )
+        return objects, prefixes
+
+    def _find_changed(self, pairs, manifest, result, download=False):
+        """
+        Compares local files with objects. A pair is unchanged when the local file
+        has the size and modification time recorded in the manifest and the object
+        has the recorded ETag. Otherwise, when the sizes match, the ETag of the local
+        file is calculated on a walker thread and compared.
+
+        :param pairs: An iterable of (key, local, remote) tuples. Local or remote is
+                      None when it does not exist.
+        :return: A list of the (key, local, remote) tuples that must be transferred.
+        """
+        changed = []
+        to_hash = []
+        for key, local, remote in pairs:
+            if local is None or remote is None or local[1] != remote[0]:
+                changed.append((key, local, remote))
+                continue
+            entry = manifest.get(key)
+            if (
+                entry is not None
+                and entry["size"] == local[1]
+                and entry["mtime_ns"] == local[2]
+                and entry["etag"] in (None, remote[1])
+            ):
+                # An ETag of None was recorded by an upload. The first listing
+                # after the upload supplies it.
+                manifest.put(key, local[1], local[2], remote[1])
+                result.skipped += 1
+            else:
+                to_hash.append((key, local, remote))
+
+        etags = self._walkers.map(
+            lambda pair: file_etag(pair[1][0], pair[1][1], self.config), to_hash
+        )
+        for (key, local, remote), etag in zip(to_hash, etags):
+            if etag == remote[1]:
+                manifest.put(key, local[1], local[2], remote[1])
+                result.skipped += 1
+            else:
+                changed.append((key, local, remote))
+        logger.info(
+            "%s files are unchanged and %s must be %s.",
+            result.skipped,
+            len(changed),
+            "downloaded" if download else "uploaded",
+        )
+        return changed
+
+    def _transfer(self, transfers, manifest, result, local_dir=None, prefix=None):
+        """
+        Submits transfers to the shared transfer manager, keeping at most
+        max_pending of them unfinished, and records each finished transfer in the
+        manifest.
+
+        :param transfers: An iterable of (key, local, remote, submit) tuples, where
+                          submit starts the transfer and returns its future.
+        """
+        pending = deque()
+
+        def finish():
+            key, local, remote, future = pending.popleft()
+            try:
+                future.result()
+            except Exception:
+                logger.exception("Couldn't transfer %s.", key)
+                result.failed.append(key)
+                return
+            if local is not None:
+                manifest.put(key, local[1], local[2], None)
+                result.transferred += 1
+                result.bytes += local[1]
+            else:
+                path = os.path.join(local_dir, *key[len(prefix) :].split("/"))
+                stat = os.stat(path)
+                manifest.put(key, stat.st_size, stat.st_mtime_ns, remote[1])
+                result.transferred += 1
+                result.bytes += stat.st_size
+
+        for key, local, remote, submit in transfers:
+            pending.append((key, local, remote, submit()))
+            if len(pending) >= self.max_pending:
+                finish()
+        while pending:
+            finish()
+
+
+def _normalize_prefix(prefix):
+    return prefix if not prefix or prefix.endswith("/") else f"{prefix}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Synchronize a local folder with an Amazon S3 prefix."
+    )
+    parser.add_argument("direction", choices=["upload", "download"])
+    parser.add_argument("local_dir", help="The local folder.")
+    parser.add_argument("bucket", help="The bucket to synchronize with.")
+    parser.add_argument("--prefix", default="", help="The prefix of the object keys.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    s3_client = boto3.client("s3", config=Config(max_pool_connections=args.concurrency))
+    config = TransferConfig(max_concurrency=args.concurrency)
+    with DirectorySync(s3_client, args.bucket, config) as sync:
+        if args.direction == "upload":
+            result = sync.upload(args.local_dir, args.prefix)
+        else:
+            result = sync.download(args.prefix, args.local_dir)
+    print(
+        f"Transferred {result.transferred} files ({result.bytes} bytes) and skipped "
+        f"{result.skipped} unchanged files in {result.seconds:.1f} seconds."
+    )
+    for key in result.failed:
+        print(f"Couldn't transfer {key}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ thread usage and time to transfer.
 # snippet-start:[S3.Python.s3_file_transfer.complete]
 import sys
 import threading
+import time
 
 import boto3
 from boto3.s3.transfer import TransferConfig
@@ -62,6 +63,69 @@ class TransferCallback:
             sys.stdout.flush()
 
 
+class CountingTransferCallback:
+    """
+    Handle callbacks from the transfer manager with as little overhead as possible.
+
+    Each thread adds to its own counter, so no lock is taken when bytes are
+    transferred. The counters are added together only when the totals are read.
+    Progress is written at most once every report_interval seconds instead of on
+    every chunk.
+    """
+
+    def __init__(self, target_size=None, report_interval=None):
+        """
+        :param target_size: The size of the transfer in bytes, used to report
+                            progress.
+        :param report_interval: The minimum number of seconds between progress
+                                reports. When this is None, no progress is written.
+        """
+        self._target_size = target_size
+        self._report_interval = report_interval
+        self._next_report = 0.0
+        self._local = threading.local()
+        self._counters = []
+
+    def __call__(self, bytes_transferred):
+        try:
+            counter = self._local.counter
+        except AttributeError:
+            # Each thread registers its counter once. Appending to a list is
+            # atomic, so this needs no lock either. Thread IDs can be reused by
+            # later threads, so each counter is kept in its own list entry.
+            counter = self._local.counter = [0, threading.get_ident()]
+            self._counters.append(counter)
+        counter[0] += bytes_transferred
+        if self._report_interval is not None:
+            now = time.monotonic()
+            if now >= self._next_report:
+                self._next_report = now + self._report_interval
+                self._report()
+
+    def _report(self):
+        total = self.total_transferred
+        if self._target_size:
+            sys.stdout.write(
+                f"\r{total} of {self._target_size} transferred "
+                f"({(total / self._target_size) * 100:.2f}%)."
+            )
+        else:
+            sys.stdout.write(f"\r{total} transferred.")
+        sys.stdout.flush()
+
+    @property
+    def thread_info(self):
+        """The number of bytes transferred by each thread, keyed by thread ID."""
+        thread_info = {}
+        for count, ident in list(self._counters):
+            thread_info[ident] = thread_info.get(ident, 0) + count
+        return thread_info
+
+    @property
+    def total_transferred(self):
+        return sum(count for count, _ in list(self._counters))
+
+
 def upload_with_default_configuration(
     local_file_path, bucket_name, object_key, file_size_mb
 ):
@@ -0,0 +1,214 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for directory_sync.py.
+
+These tests use a fake client and transfer manager that keep objects in a dict,
+because listing runs on several threads and the transfer manager is not
+compatible with the botocore Stubber.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+
+from boto3.s3.transfer import TransferConfig
+
+import directory_sync
+
+
+class FakePaginator:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def paginate(self, Bucket, Prefix, Delimiter):
+        contents = []
+        prefixes = set()
+        for key, data in sorted(self.objects.items()):
+            if not key.startswith(Prefix):
+                continue
+            rest = key[len(Prefix) :]
+            if Delimiter in rest:
+                prefixes.add(Prefix + rest.split(Delimiter)[0] + Delimiter)
+            else:
+                etag = hashlib.md5(data).hexdigest()
+                contents.append({"Key": key, "Size": len(data), "ETag": f'"{etag}"'})
+        yield {
+            "Contents": contents,
+            "CommonPrefixes": [{"Prefix": prefix} for prefix in sorted(prefixes)],
+        }
+
+
+class FakeClient:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return FakePaginator(self.objects)
+
+
+class FakeTransferManager:
+    def __init__(self, objects, fail_keys=()):
+        self.objects = objects
+        self.fail_keys = fail_keys
+        self.uploaded = []
+        self.shut_down = False
+        self.downloaded = []
+        self._lock = threading.Lock()
+
+    def _future(self, key, action):
+        future = Future()
+        if key in self.fail_keys:
+            future.set_exception(RuntimeError(f"Can't transfer {key}."))
+        else:
+            action()
+            future.set_result(None)
+        return future
+
+    def upload(self, path, bucket, key):
+        def action():
+            with open(path, "rb") as file, self._lock:
+                self.objects[key] = file.read()
+                self.uploaded.append(key)
+
+        return self._future(key, action)
+
+    def download(self, bucket, key, path):
+        def action():
+            with open(path, "wb") as file, self._lock:
+                file.write(self.objects[key])
+                self.downloaded.append(key)
+
+        return self._future(key, action)
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def write_tree(folder, files):
+    for rel_path, data in files.items():
+        path = os.path.join(folder, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+
+def make_sync(objects, **kwargs):
+    manager = FakeTransferManager(objects, **kwargs)
+    sync = directory_sync.DirectorySync(
+        FakeClient(objects), "test-bucket", max_walkers=4, transfer_manager=manager
+    )
+    return sync, manager
+
+
+def test_upload(tmp_path):
+    write_tree(
+        tmp_path,
+        {
+            "same.txt": b"same",
+            "changed.txt": b"new data",
+            "a/new.txt": b"new",
+            "a/b/deep.txt": b"deep",
+        },
+    )
+    objects = {"deploy/same.txt": b"same", "deploy/changed.txt": b"old data"}
+    sync, manager = make_sync(objects)
+
+    with sync:
+        result = sync.upload(str(tmp_path), "deploy")
+    assert sorted(manager.uploaded) == [
+        "deploy/a/b/deep.txt",
+        "deploy/a/new.txt",
+        "deploy/changed.txt",
+    ]
+    assert result.skipped == 1
+    assert result.transferred == 3
+    assert objects["deploy/changed.txt"] == b"new data"
+    assert os.path.exists(tmp_path / directory_sync.MANIFEST_FILE_NAME)
+
+    sync, manager = make_sync(objects)
+    with sync:
+        result = sync.upload(str(tmp_path), "deploy")
+    assert manager.uploaded == []
+    assert result.skipped == 4
+
+
+def test_upload_skips_by_manifest_without_reading(tmp_path, monkeypatch):
+    write_tree(tmp_path, {"file.txt": b"data"})
+    objects = {}
+    for _ in range(2):
+        # The first run uploads the file and the second records its ETag.
+        sync, _ = make_sync(objects)
+        with sync:
+            sync.upload(str(tmp_path))
+
+    def fail(*args):
+        raise AssertionError("The file should not be read.")
+
+    monkeypatch.setattr(directory_sync, "file_etag", fail)
+    sync, manager = make_sync(objects)
+    with sync:
+        result = sync.upload(str(tmp_path))
+    assert result.skipped == 1
+    assert manager.uploaded == []
+
+
+def test_download(tmp_path):
+    objects = {
+        "deploy/one.txt": b"one",
+        "deploy/a/two.txt": b"two",
+        "deploy/a/b/three.txt": b"three",
+        "deploy/a/": b"",
+        "other/four.txt": b"four",
+    }
+    write_tree(tmp_path, {"one.txt": b"one"})
+    sync, manager = make_sync(objects)
+
+    with sync:
+        result = sync.download("deploy/", str(tmp_path))
+    assert sorted(manager.downloaded) == ["deploy/a/b/three.txt", "deploy/a/two.txt"]
+    assert result.skipped == 1
+    assert (tmp_path / "a" / "b" / "three.txt").read_bytes() == b"three"
+
+    sync, manager = make_sync(objects)
+    with sync:
+        result = sync.download("deploy", str(tmp_path))
+    assert manager.downloaded == []
+    assert result.skipped == 3
+
+
+def test_upload_failure(tmp_path):
+    write_tree(tmp_path, {"good.txt": b"good", "bad.txt": b"bad"})
+    sync, _ = make_sync({}, fail_keys=("bad.txt",))
+
+    with sync:
+        result = sync.upload(str(tmp_path))
+    assert result.transferred == 1
+    assert result.failed == ["bad.txt"]
+
+
+def test_close_keeps_callers_manager(tmp_path):
+    sync, manager = make_sync({})
+    with sync:
+        sync.upload(str(tmp_path))
+    assert not manager.shut_down
+
+
+def test_file_etag(tmp_path):
+    mb = 1024 * 1024
+    parts = [b"a" * 5 * mb, b"b" * 5 * mb, b"c"]
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"".join(parts))
+    size = 10 * mb + 1
+    config = TransferConfig(multipart_threshold=8 * mb, multipart_chunksize=5 * mb)
+    digests = [hashlib.md5(part).digest() for part in parts]
+    assert directory_sync.file_etag(str(path), size, config) == (
+        f"{hashlib.md5(b''.join(digests)).hexdigest()}-3"
+    )
+    config = TransferConfig(multipart_threshold=100 * mb)
+    assert directory_sync.file_etag(str(path), size, config) == (
+        hashlib.md5(b"".join(parts)).hexdigest()
+    )
@@ -87,6 +87,23 @@ def test_transfer_callback():
         assert value == 60
 
 
+def test_counting_transfer_callback():
+    """Test the callback that counts without a lock from several threads."""
+    callback = file_transfer.CountingTransferCallback(800)
+    threads = [
+        threading.Thread(target=lambda: [callback(1) for _ in range(100)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    callback(400)
+    assert callback.total_transferred == 800
+    assert sum(callback.thread_info.values()) == 800
+    assert callback.thread_info[threading.get_ident()] >= 400
+
+
 @pytest.mark.parametrize(
     "upload_func,upload_kwargs,expected_upload_kwargs,"
     "download_func,download_kwargs,expected_download_kwargs",
@@ -0,0 +1,85 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for the transfer tuner and benchmark.
+"""
+
+import os
+import pytest
+
+from file_transfer import MB
+import transfer_tuning
+
+
+class FakeBucket:
+    """A bucket that reports the whole file to the callback of each transfer."""
+
+    def __init__(self):
+        self.configs = []
+
+    def upload_file(self, file_path, key, Config=None, Callback=None):
+        self.configs.append(Config)
+        Callback(os.path.getsize(file_path))
+
+    def download_file(self, key, file_path, Config=None, Callback=None):
+        self.configs.append(Config)
+        Callback(os.path.getsize(__file__))
+
+
+@pytest.mark.parametrize(
+    "file_size,chunksize,concurrency",
+    [
+        (1 * MB, 8 * MB, 1),
+        (100 * MB, 8 * MB, 10),
+        (400 * MB, 10 * MB, 10),
+        (200_000 * MB, 512 * MB, 10),
+    ],
+)
+def test_config_for(file_size, chunksize, concurrency):
+    config = transfer_tuning.TransferTuner().config_for(file_size)
+    assert config.multipart_chunksize == chunksize
+    assert config.max_concurrency == concurrency
+
+
+def test_config_for_part_limit():
+    tuner = transfer_tuning.TransferTuner(max_chunksize=5000 * MB)
+    config = tuner.config_for(200_000 * MB)
+    assert 200_000 * MB / config.multipart_chunksize <= transfer_tuning.MAX_PARTS
+
+
+def test_record_climbs_until_no_gain():
+    tuner = transfer_tuning.TransferTuner(initial_concurrency=4)
+    size = 1000 * MB
+    for seconds in (10, 5, 4.8):
+        tuner.record(size, seconds, tuner.config_for(size))
+    assert tuner.concurrency == 8
+    tuner.record(size, 1, tuner.config_for(size))
+    assert tuner.concurrency == 8
+    assert tuner.bandwidth > 0
+
+
+def test_run_benchmark():
+    bucket = FakeBucket()
+    results = list(
+        transfer_tuning.run_benchmark(
+            bucket, __file__, "test-key", [8 * MB, 16 * MB], [1, 4], [8 * MB], "x"
+        )
+    )
+    assert len(results) == 8
+    assert [result.direction for result in results[:2]] == ["upload", "download"]
+    assert {result.max_concurrency for result in results} == {1, 4}
+    assert all(result.mb_per_second >= 0 for result in results)
+    assert [config.multipart_chunksize for config in bucket.configs[::4]] == [
+        8 * MB,
+        16 * MB,
+    ]
+
+
+def test_run_auto():
+    tuner = transfer_tuning.TransferTuner()
+    results = list(
+        transfer_tuning.run_auto(FakeBucket(), __file__, "test-key", tuner, runs=2)
+    )
+    assert [result.direction for result in results] == ["auto", "auto"]
+    assert results[0].max_concurrency == 1
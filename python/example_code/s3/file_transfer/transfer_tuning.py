@@ -0,0 +1,304 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tune Boto 3 managed file transfers and measure their throughput.
+
+The benchmark uploads and downloads a file with every combination of a set of
+multipart chunk sizes, concurrency levels, and multipart thresholds, and reports the
+throughput and CPU time of each transfer. It can run against Amazon S3 or against a
+local S3-compatible endpoint, such as moto_server or MinIO, so that settings can be
+compared without network cost.
+
+The TransferTuner chooses a configuration from the size of a file and the
+throughput of earlier transfers, and adjusts its concurrency as it observes more
+transfers.
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from file_transfer import MB, CountingTransferCallback
+
+# Amazon S3 allows at most 10,000 parts in a multipart upload.
+MAX_PARTS = 10000
+
+
+@dataclass
+class BenchmarkResult:
+    """The measurements of a single transfer."""
+
+    direction: str
+    size: int
+    multipart_chunksize: int
+    max_concurrency: int
+    multipart_threshold: int
+    seconds: float
+    cpu_seconds: float
+
+    @property
+    def mb_per_second(self):
+        return self.size / MB / self.seconds if self.seconds else 0.0
+
+    @property
+    def cpu_percent(self):
+        return self.cpu_seconds / self.seconds * 100 if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.direction:<8} chunk {self.multipart_chunksize // MB:>4} MB  "
+            f"threads {self.max_concurrency:>3}  "
+            f"threshold {self.multipart_threshold // MB:>5} MB  "
+            f"{self.mb_per_second:>8.1f} MB/s  CPU {self.cpu_percent:>5.1f}%"
+        )
+
+
+class TransferTuner:
+    """
+    Chooses transfer settings from the size of a file and the observed throughput.
+
+    The chunk size is chosen so that every thread has several parts to transfer.
+    The concurrency starts at the transfer manager default and climbs while doubling
+    it keeps raising throughput by more than the gain threshold. When it stops
+    helping, the tuner steps back and stays at the best level it has seen.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency=10,
+        max_concurrency=64,
+        min_chunksize=8 * MB,
+        max_chunksize=512 * MB,
+        parts_per_thread=4,
+        gain_threshold=1.1,
+    ):
+        """
+        :param initial_concurrency: The concurrency of the first transfer.
+        :param max_concurrency: The highest concurrency the tuner tries.
+        :param min_chunksize: The smallest multipart chunk size. Files smaller than
+                              this are transferred in a single request.
+        :param max_chunksize: The largest multipart chunk size.
+        :param parts_per_thread: The number of parts each thread should transfer.
+        :param gain_threshold: The ratio of throughput that counts as an
+                               improvement.
+        """
+        self.concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_chunksize = min_chunksize
+        self.max_chunksize = max_chunksize
+        self.parts_per_thread = parts_per_thread
+        self.gain_threshold = gain_threshold
+        self.bandwidth = None
+        self._best = None
+        self._settled = False
+
+    def config_for(self, file_size):
+        """
+        :param file_size: The size of the file to transfer, in bytes.
+        :return: A TransferConfig for the file.
+        """
+        if file_size < self.min_chunksize * 2:
+            # Splitting a small file costs more in requests than it saves.
+            return TransferConfig(
+                multipart_threshold=self.min_chunksize * 2,
+                multipart_chunksize=self.min_chunksize,
+                max_concurrency=1,
+            )
+        chunksize = file_size / (self.concurrency * self.parts_per_thread)
+        chunksize = max(chunksize, file_size / MAX_PARTS, self.min_chunksize)
+        chunksize = min(chunksize, self.max_chunksize)
+        chunksize = math.ceil(chunksize / MB) * MB
+        concurrency = min(self.concurrency, math.ceil(file_size / chunksize))
+        return TransferConfig(
+            multipart_threshold=chunksize,
+            multipart_chunksize=chunksize,
+            max_concurrency=concurrency,
+        )
+
+    def record(self, size, seconds, config):
+        """
+        Records a finished multipart transfer and adjusts the concurrency of the
+        next one.
+
+        :param size: The number of bytes transferred.
+        :param seconds: The time the transfer took.
+        :param config: The TransferConfig that was used.
+        """
+        if seconds <= 0 or size < config.multipart_threshold:
+            return
+        throughput = size / seconds
+        self.bandwidth = (
+            throughput
+            if self.bandwidth is None
+            else 0.7 * self.bandwidth + 0.3 * throughput
+        )
+        if self._settled:
+            return
+        if self._best is None or throughput > self._best[0] * self.gain_threshold:
+            self._best = (throughput, config.max_concurrency)
+            if config.max_concurrency >= self.max_concurrency:
+                self._settled = True
+            else:
+                self.concurrency = min(config.max_concurrency * 2, self.max_concurrency)
+        else:
+            self.concurrency = self._best[1]
+            self._settled = True
+
+
+def timed_transfer(transfer, size, direction, config):
+    """
+    Runs a transfer and measures its elapsed and CPU time.
+
+    :param transfer: A function that takes a TransferConfig and a callback and
+                     runs the transfer.
+    :param size: The number of bytes that are transferred.
+    :param direction: A label for the transfer, such as upload or download.
+    :param config: The TransferConfig to use.
+    :return: A BenchmarkResult.
+    """
+    callback = CountingTransferCallback()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    transfer(config, callback)
+    seconds = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+    return BenchmarkResult(
+        direction,
+        size,
+        config.multipart_chunksize,
+        config.max_concurrency,
+        config.multipart_threshold,
+        seconds,
+        cpu_seconds,
+    )
+
+
+def run_benchmark(
+    bucket, file_path, object_key, chunksizes, concurrencies, thresholds, download_path
+):
+    """
+    Uploads and downloads a file with every combination of settings.
+
+    :param bucket: The Boto3 Bucket resource to transfer to and from.
+    :param file_path: The local file to upload.
+    :param object_key: The key of the uploaded object.
+    :param chunksizes: The multipart chunk sizes to try, in bytes.
+    :param concurrencies: The concurrency levels to try.
+    :param thresholds: The multipart thresholds to try, in bytes.
+    :param download_path: The local file to download to.
+    :return: A generator of BenchmarkResult objects, one for each transfer.
+    """
+    size = os.path.getsize(file_path)
+    for threshold in thresholds:
+        for chunksize in chunksizes:
+            for concurrency in concurrencies:
+                config = TransferConfig(
+                    multipart_threshold=threshold,
+                    multipart_chunksize=chunksize,
+                    max_concurrency=concurrency,
+                )
+                yield timed_transfer(
+                    lambda cfg, cb: bucket.upload_file(
+                        file_path, object_key, Config=cfg, Callback=cb
+                    ),
+                    size,
+                    "upload",
+                    config,
+                )
+                yield timed_transfer(
+                    lambda cfg, cb: bucket.download_file(
+                        object_key, download_path, Config=cfg, Callback=cb
+                    ),
+                    size,
+                    "download",
+                    config,
+                )
+
+
+def run_auto(bucket, file_path, object_key, tuner, runs=4):
+    """
+    Uploads a file several times with settings chosen by a tuner, so that the
+    tuner can adjust its concurrency to the observed throughput.
+
+    :param bucket: The Boto3 Bucket resource to upload to.
+    :param file_path: The local file to upload.
+    :param object_key: The key of the uploaded object.
+    :param tuner: The TransferTuner that chooses the settings.
+    :param runs: The number of uploads.
+    :return: A generator of BenchmarkResult objects, one for each upload.
+    """
+    size = os.path.getsize(file_path)
+    for _ in range(runs):
+        config = tuner.config_for(size)
+        result = timed_transfer(
+            lambda cfg, cb: bucket.upload_file(
+                file_path, object_key, Config=cfg, Callback=cb
+            ),
+            size,
+            "auto",
+            config,
+        )
+        tuner.record(size, result.seconds, config)
+        yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare transfer manager settings for uploads and downloads."
+    )
+    parser.add_argument("bucket", help="The bucket to transfer to and from.")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument(
+        "--endpoint-url",
+        help="An S3-compatible endpoint to use instead of Amazon S3, such as "
+        "http://localhost:5000 for moto_server.",
+    )
+    parser.add_argument("--chunk-mb", type=int, nargs="+", default=[8, 16, 64])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 10, 32])
+    parser.add_argument("--threshold-mb", type=int, nargs="+", default=[8])
+    parser.add_argument(
+        "--auto", action="store_true", help="Also run uploads chosen by the tuner."
+    )
+    args = parser.parse_args()
+
+    max_pool = max(args.concurrency + [64])
+    s3 = boto3.resource(
+        "s3",
+        endpoint_url=args.endpoint_url,
+        config=Config(max_pool_connections=max_pool),
+    )
+    bucket = s3.Bucket(args.bucket)
+    object_key = "transfer-benchmark.bin"
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "upload.bin")
+        with open(file_path, "wb") as file:
+            for _ in range(args.size_mb):
+                file.write(os.urandom(MB))
+        results = run_benchmark(
+            bucket,
+            file_path,
+            object_key,
+            [size * MB for size in args.chunk_mb],
+            args.concurrency,
+            [size * MB for size in args.threshold_mb],
+            os.path.join(folder, "download.bin"),
+        )
+        for result in results:
+            print(result)
+        if args.auto:
+            tuner = TransferTuner(max_concurrency=max_pool)
+            for result in run_auto(bucket, file_path, object_key, tuner):
+                print(result)
+        bucket.Object(object_key).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,29 @@ Show how to use AWS SDK for Python (Boto3) with Amazon Simple Storage Service
 (Amazon S3) to perform basic object operations
 """
 
+import base64
+import hashlib
+import io
 import json
 import logging
+import mmap
+import os
 import random
+import threading
+import time
 import uuid
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import (
+    ClientError,
+    FlexibleChecksumError,
+    IncompleteReadError,
+    ReadTimeoutError,
+    ResponseStreamingError,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +112,16 @@ class ObjectWrapper:
 
     # snippet-end:[python.example_code.s3.GetObject]
 
+    def get_ranged(self, **kwargs):
+        """
+        Gets the object with concurrent byte-range requests, for objects that are
+        too large to read into memory or to download with a single stream.
+
+        :param kwargs: Arguments that are passed to RangedObjectReader.
+        :return: A RangedObjectReader, which is a file-like object.
+        """
+        return RangedObjectReader(self.object, **kwargs)
+
     # snippet-start:[python.example_code.s3.ListObjects]
     @staticmethod
     def list(bucket, prefix=None):
@@ -285,6 +311,533 @@ class ObjectWrapper:
 # snippet-end:[python.example_code.s3.GetObjectAcl]
 
 
+class DeleteStats:
+    """Counters that describe a batch deletion run."""
+
+    def __init__(self):
+        self.deleted = 0
+        self.requests = 0
+        self.throttles = 0
+        self.failed = []
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    @property
+    def objects_per_second(self):
+        return self.deleted / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Deleted {self.deleted} objects with {self.requests} requests in "
+            f"{self.seconds:.1f} seconds, {self.objects_per_second:.1f} objects per "
+            f"second. {len(self.failed)} objects failed, {self.throttles} requests "
+            f"were throttled."
+        )
+
+
+class BatchDeleter:
+    """
+    Deletes any number of objects, or object versions, from a bucket.
+
+    Keys are taken from a listing as it is read, grouped into DeleteObjects requests
+    of up to 1000 objects, and several requests are sent at the same time. Requests
+    that are throttled, and objects that fail with a retryable error, are retried
+    with exponential backoff.
+    """
+
+    MAX_BATCH_SIZE = 1000
+    RETRYABLE_ERRORS = ("SlowDown", "InternalError", "ServiceUnavailable")
+
+    def __init__(self, bucket, max_workers=8, batch_size=MAX_BATCH_SIZE, max_tries=5):
+        """
+        :param bucket: The bucket that contains the objects. This is a Boto3 Bucket
+                       resource. Its client must have a connection pool that is at
+                       least as large as max_workers.
+        :param max_workers: The number of DeleteObjects requests in flight.
+        :param batch_size: The number of objects in each request, up to 1000.
+        :param max_tries: The maximum number of times an object is sent.
+        """
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.batch_size = min(batch_size, self.MAX_BATCH_SIZE)
+        self.max_tries = max_tries
+        self.stats = DeleteStats()
+
+    def delete(self, objects):
+        """
+        Deletes objects. An object that can't be deleted is recorded in the stats
+        and does not stop the run.
+
+        :param objects: An iterable of keys, or of dicts with a Key and an optional
+                        VersionId. It is read only as fast as objects are deleted.
+        :return: The stats of the run.
+        """
+        self.stats = DeleteStats()
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            batch = []
+            for obj in objects:
+                batch.append({"Key": obj} if isinstance(obj, str) else obj)
+                if len(batch) == self.batch_size:
+                    slots.acquire()
+                    future = executor.submit(self._delete_batch, batch)
+                    future.add_done_callback(lambda _: slots.release())
+                    batch = []
+            if batch:
+                executor.submit(self._delete_batch, batch)
+        self.stats.seconds = time.perf_counter() - start
+        logger.info("%s", self.stats)
+        return self.stats
+
+    def empty(self, prefix=None, include_versions=True):
+        """
+        Deletes every object in the bucket, or every object with a prefix.
+
+        :param prefix: When specified, only objects with keys that start with this
+                       prefix are deleted.
+        :param include_versions: When True, every version and delete marker is
+                                 deleted, which is required before a versioned
+                                 bucket can be deleted. Otherwise, only current
+                                 objects are deleted, which in a versioned bucket
+                                 adds a delete marker for each one.
+        :return: The stats of the run.
+        """
+        kwargs = {} if prefix is None else {"Prefix": prefix}
+        if include_versions:
+            objects = (
+                {"Key": version.object_key, "VersionId": version.id}
+                for version in self.bucket.object_versions.filter(**kwargs)
+            )
+        else:
+            objects = (obj.key for obj in self.bucket.objects.filter(**kwargs))
+        return self.delete(objects)
+
+    def _delete_batch(self, batch):
+        for tries in range(self.max_tries):
+            if tries > 0:
+                time.sleep(random.uniform(0, min(2**tries * 0.1, 20)))
+            try:
+                response = self.bucket.delete_objects(
+                    Delete={"Objects": batch, "Quiet": True}
+                )
+            except ClientError as error:
+                self.stats.add(requests=1)
+                if error.response["Error"]["Code"] in self.RETRYABLE_ERRORS:
+                    self.stats.add(throttles=1)
+                    continue
+                logger.exception(
+                    "Couldn't delete %s objects from bucket '%s'.",
+                    len(batch),
+                    self.bucket.name,
+                )
+                self.stats.add(failed=[obj["Key"] for obj in batch])
+                return
+            except Exception:
+                logger.exception(
+                    "Couldn't delete %s objects from bucket '%s'.",
+                    len(batch),
+                    self.bucket.name,
+                )
+                self.stats.add(failed=[obj["Key"] for obj in batch])
+                return
+            errors = response.get("Errors", [])
+            retry = [
+                _error_object(error)
+                for error in errors
+                if error["Code"] in self.RETRYABLE_ERRORS
+            ]
+            failed = [
+                error["Key"]
+                for error in errors
+                if error["Code"] not in self.RETRYABLE_ERRORS
+            ]
+            self.stats.add(requests=1, deleted=len(batch) - len(errors), failed=failed)
+            if not retry:
+                return
+            batch = retry
+        logger.warning(
+            "Couldn't delete %s objects from bucket '%s' after %s tries.",
+            len(batch),
+            self.bucket.name,
+            self.max_tries,
+        )
+        self.stats.add(failed=[obj["Key"] for obj in batch])
+
+
+def _error_object(error):
+    obj = {"Key": error["Key"]}
+    if error.get("VersionId"):
+        obj["VersionId"] = error["VersionId"]
+    return obj
+
+
+class IntegrityError(Exception):
+    """Raised when the data read from an object doesn't match its length or checksum."""
+
+
+class _Crc32:
+    """A CRC32 checksum with the update and digest methods of a hashlib hash."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def digest(self):
+        return self.value.to_bytes(4, "big")
+
+
+class RangedObjectReader(io.RawIOBase):
+    """
+    Reads an object with several byte-range GET requests at the same time.
+
+    The reader can be used as a file, or iterated to get the object one part at a
+    time. Only a bounded number of parts are requested ahead of the reader, so
+    memory stays constant no matter how large the object is. download_to writes the
+    parts directly into a memory map of a preallocated file.
+
+    Every request is pinned to the ETag of the object, so all parts come from the
+    same version of the object even when it is overwritten during the read. The
+    length of each part is checked, and the data is verified in one of these ways:
+
+    * An object that was uploaded in parts with a CRC32, SHA-1, or SHA-256 checksum
+      is read one upload part at a time, and each part is checked against its own
+      checksum before it is returned.
+    * For other objects, an MD5 digest is calculated for each part. When the ETag
+      of the object is an MD5 digest, which is the case for single-request uploads
+      that aren't encrypted with AWS KMS, or a multipart ETag with as many parts as
+      the reader uses, the digests are checked against it when the last part is
+      read. The earlier parts are returned before they can be verified.
+    """
+
+    RETRYABLE_READ_ERRORS = (
+        IncompleteReadError,
+        ReadTimeoutError,
+        ResponseStreamingError,
+    )
+
+    PART_CHECKSUMS = {
+        "CRC32": _Crc32,
+        "SHA1": hashlib.sha1,
+        "SHA256": hashlib.sha256,
+    }
+
+    def __init__(
+        self,
+        s3_object,
+        part_size=8 * 1024 * 1024,
+        max_workers=8,
+        read_ahead=16,
+        verify=True,
+        max_tries=3,
+    ):
+        """
+        :param s3_object: The Boto3 Object resource to read.
+        :param part_size: The size of each range request. To verify objects that were
+                          uploaded in parts without a checksum, use the part size of
+                          the upload. The default is the default part size of the
+                          transfer manager. Objects that are read by upload part
+                          use the part size of the upload instead.
+        :param max_workers: The number of range requests in flight.
+        :param read_ahead: The maximum number of parts that are requested or held
+                           ahead of the reader. Memory use is about read_ahead times
+                           the part size.
+        :param verify: When True, the data is checked against the checksums of its
+                       upload parts, or against the ETag when the ETag can be
+                       calculated from the data.
+        :param max_tries: The number of times a part is requested when reading its
+                          body fails.
+        """
+        super().__init__()
+        self.object = s3_object
+        self.part_size = part_size
+        self.read_ahead = max(read_ahead, max_workers)
+        self.max_tries = max_tries
+        try:
+            s3_object.load()
+        except ClientError:
+            logger.exception(
+                "Couldn't get object '%s' from bucket '%s'.",
+                s3_object.key,
+                s3_object.bucket_name,
+            )
+            raise
+        self.size = s3_object.content_length
+        self.etag = s3_object.e_tag
+        self.part_count = -(-self.size // part_size)
+        self.checksum_algorithm = None
+        self._verify = verify and self._verify_mode()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._parts = None
+        self._buffer = memoryview(b"")
+
+    def _verify_mode(self):
+        """
+        :return: "parts" when each upload part has a checksum that can be checked,
+                 "md5" when the ETag is the MD5 digest of the object, "multipart"
+                 when it is the digest of part digests of the size the reader uses,
+                 or None when the data can't be checked.
+        """
+        etag = self.etag.strip('"')
+        if "-" in etag and self._load_part_checksums():
+            return "parts"
+        if self.object.server_side_encryption == "aws:kms" or (
+            self.object.sse_customer_algorithm
+        ):
+            return None
+        if "-" not in etag:
+            return "md5"
+        if etag.rsplit("-", 1)[1] == str(self.part_count):
+            return "multipart"
+        logger.info(
+            "Can't verify '%s' because it was uploaded with a different part size.",
+            self.object.key,
+        )
+        return None
+
+    def _load_part_checksums(self):
+        """
+        Gets the checksum of the first upload part to find out whether the parts
+        of the object can be checked one at a time.
+
+        :return: True when the object is read by upload part.
+        """
+        try:
+            response = self.object.meta.client.head_object(
+                Bucket=self.object.bucket_name,
+                Key=self.object.key,
+                PartNumber=1,
+                ChecksumMode="ENABLED",
+                IfMatch=self.etag,
+            )
+        except ClientError:
+            logger.exception("Couldn't get the first part of '%s'.", self.object.key)
+            raise
+        # A full object checksum covers the whole object, so it can't check a part.
+        if response.get("ChecksumType") == "FULL_OBJECT":
+            return False
+        for algorithm in self.PART_CHECKSUMS:
+            if response.get(f"Checksum{algorithm}"):
+                self.checksum_algorithm = algorithm
+                self.part_count = response["PartsCount"]
+                return True
+        return False
+
+    def _range(self, index):
+        start = index * self.part_size
+        return start, min(start + self.part_size, self.size) - 1
+
+    def _request_part(self, index):
+        """
+        :return: The GetObject response of a part, and its first and last byte.
+        """
+        if self._verify == "parts":
+            response = self.object.get(
+                PartNumber=index + 1, ChecksumMode="ENABLED", IfMatch=self.etag
+            )
+            byte_range = response["ContentRange"].split()[1].split("/")[0]
+            start, end = (int(position) for position in byte_range.split("-"))
+            return response, start, end
+        start, end = self._range(index)
+        response = self.object.get(Range=f"bytes={start}-{end}", IfMatch=self.etag)
+        return response, start, end
+
+    def _get_part(self, index, write=None):
+        """
+        Gets one part of the object, and retries when its body can't be read. A
+        part that is read by upload part is checked against its checksum.
+
+        :param index: The index of the part.
+        :param write: A function that takes an offset and a chunk of data. When
+                      this is None, the part is returned as bytes.
+        :return: The part, or None when write is given, and the MD5 digest of the
+                 part.
+        :raise IntegrityError: When the part has the wrong length or checksum.
+        """
+        for tries in range(self.max_tries):
+            if tries > 0:
+                time.sleep(random.uniform(0, min(2**tries * 0.1, 5)))
+            response, start, end = self._request_part(index)
+            digest = hashlib.md5()
+            checksum = None
+            if self._verify == "parts":
+                checksum = self.PART_CHECKSUMS[self.checksum_algorithm]()
+            chunks = [] if write is None else None
+            offset = start
+            try:
+                for chunk in response["Body"].iter_chunks(1024 * 1024):
+                    digest.update(chunk)
+                    if checksum is not None:
+                        checksum.update(chunk)
+                    if write is None:
+                        chunks.append(chunk)
+                    else:
+                        write(offset, chunk)
+                    offset += len(chunk)
+            except self.RETRYABLE_READ_ERRORS:
+                logger.warning("Couldn't read bytes %s-%s, retrying.", start, end)
+                continue
+            except FlexibleChecksumError as error:
+                raise IntegrityError(
+                    f"Part {index} of '{self.object.key}' doesn't match its checksum."
+                ) from error
+            if offset != end + 1:
+                raise IntegrityError(
+                    f"Got {offset - start} bytes of part {index} of '{self.object.key}' "
+                    f"instead of {end - start + 1}."
+                )
+            if checksum is not None:
+                expected = response.get(f"Checksum{self.checksum_algorithm}")
+                if base64.b64encode(checksum.digest()).decode() != expected:
+                    raise IntegrityError(
+                        f"Part {index} of '{self.object.key}' doesn't match its "
+                        f"{self.checksum_algorithm} checksum {expected}."
+                    )
+            data = b"".join(chunks) if write is None else None
+            return data, digest.digest()
+        raise IntegrityError(
+            f"Couldn't read part {index} of '{self.object.key}' after "
+            f"{self.max_tries} tries."
+        )
+
+    def _check(self, digests, whole_digest=None):
+        """
+        Checks part digests, or the digest of the whole object, against the ETag.
+
+        :raise IntegrityError: When the ETag doesn't match.
+        """
+        if self._verify not in ("md5", "multipart"):
+            return
+        if self._verify == "md5":
+            got = whole_digest.hexdigest()
+        else:
+            got = f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+        if got != self.etag.strip('"'):
+            raise IntegrityError(
+                f"The data of '{self.object.key}' doesn't match its ETag {self.etag}."
+            )
+
+    def iter_parts(self):
+        """
+        Reads the object in order, one part at a time, with up to read_ahead parts
+        requested ahead of the caller.
+
+        When the object is read by upload part, each part is verified before it is
+        returned. Otherwise, the parts are returned unverified, and the ETag is
+        checked only when the last part is read, so a caller that must not act on
+        corrupt data has to wait for the end of the object, or use download_to.
+
+        :return: A generator of the parts of the object as bytes.
+        :raise IntegrityError: When a part or the whole object fails verification.
+        """
+        pending = deque()
+        next_index = 0
+        digests = []
+        whole_digest = hashlib.md5() if self._verify == "md5" else None
+        try:
+            while next_index < self.part_count or pending:
+                while next_index < self.part_count and len(pending) < self.read_ahead:
+                    pending.append(self._executor.submit(self._get_part, next_index))
+                    next_index += 1
+                data, digest = pending.popleft().result()
+                digests.append(digest)
+                if whole_digest is not None:
+                    whole_digest.update(data)
+                if not pending and next_index == self.part_count:
+                    self._check(digests, whole_digest)
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def download_to(self, file_path):
+        """
+        Downloads the object to a file. The file is preallocated and memory mapped,
+        and each range request writes its part directly into the map. When a part
+        can't be read or the data fails verification, the file is removed.
+
+        :param file_path: The path of the file to write.
+        :return: The number of bytes written.
+        """
+        try:
+            with open(file_path, "wb+") as file:
+                file.truncate(self.size)
+                if self.size == 0:
+                    return 0
+                with mmap.mmap(file.fileno(), self.size) as file_map:
+
+                    def write(offset, chunk):
+                        file_map[offset : offset + len(chunk)] = chunk
+
+                    futures = [
+                        self._executor.submit(self._get_part, index, write)
+                        for index in range(self.part_count)
+                    ]
+                    try:
+                        digests = [future.result()[1] for future in futures]
+                    finally:
+                        # Parts that are still being written must finish before
+                        # the map is closed.
+                        for future in futures:
+                            future.cancel()
+                        wait(futures)
+                    whole_digest = None
+                    if self._verify == "md5":
+                        whole_digest = hashlib.md5(file_map)
+                    self._check(digests, whole_digest)
+                    file_map.flush()
+        except Exception:
+            logger.exception("Couldn't download '%s'.", self.object.key)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        logger.info(
+            "Downloaded '%s' in %s parts to %s.",
+            self.object.key,
+            len(digests),
+            file_path,
+        )
+        return self.size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        """
+        Reads the next bytes of the object. The data is verified as described in
+        iter_parts, so unless the object is read by upload part, the bytes that
+        are returned before the end of the object are not yet verified.
+
+        :param buffer: The buffer to fill.
+        :return: The number of bytes read, or 0 at the end of the object.
+        """
+        if self._parts is None:
+            self._parts = self.iter_parts()
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._parts))
+            except StopIteration:
+                return 0
+        count = min(len(buffer), len(self._buffer))
+        buffer[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+    def close(self):
+        if not self.closed:
+            if self._parts is not None:
+                self._parts.close()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        super().close()
+
+
 # snippet-start:[python.example_code.s3.Scenario_ObjectManagement]
 def usage_demo():
     print("-" * 88)
@@ -5,13 +5,16 @@
 Unit tests for object_wrapper.py functions.
 """
 
+import base64
+import hashlib
+import zlib
 from unittest.mock import ANY
 import pytest
 
 import boto3
 from botocore.exceptions import ClientError
 
-from object_wrapper import ObjectWrapper
+from object_wrapper import BatchDeleter, IntegrityError, ObjectWrapper
 
 
 @pytest.mark.parametrize(
@@ -57,6 +60,196 @@ def test_get(make_stubber, error_code):
         assert exc_info.value.response["Error"]["Code"] == error_code
 
 
+def stub_ranged_reader(s3_stubber, bucket_name, key, data, part_size, e_tag):
+    s3_stubber.stub_head_object(bucket_name, key, content_length=len(data), e_tag=e_tag)
+    if "-" in e_tag:
+        # A full object checksum can't check parts, so the ETag is used instead.
+        s3_stubber.stub_head_object_part(
+            bucket_name,
+            key,
+            1,
+            e_tag,
+            int(e_tag.strip('"').rsplit("-", 1)[1]),
+            part_size,
+            checksums={"ChecksumCRC32": "AAAAAA=="},
+            checksum_type="FULL_OBJECT",
+        )
+    for start in range(0, len(data), part_size):
+        end = min(start + part_size, len(data)) - 1
+        s3_stubber.stub_get_object_range(
+            bucket_name, key, f"bytes={start}-{end}", data[start : end + 1], e_tag
+        )
+
+
+def multipart_etag(data, part_size):
+    digests = [
+        hashlib.md5(data[start : start + part_size]).digest()
+        for start in range(0, len(data), part_size)
+    ]
+    return f'"{hashlib.md5(b"".join(digests)).hexdigest()}-{len(digests)}"'
+
+
+@pytest.mark.parametrize("multipart", [False, True])
+def test_get_ranged(make_stubber, multipart):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = bytes(range(256)) * 4
+    part_size = 300
+    if multipart:
+        e_tag = multipart_etag(data, part_size)
+    else:
+        e_tag = f'"{hashlib.md5(data).hexdigest()}"'
+
+    stub_ranged_reader(s3_stubber, bucket_name, key, data, part_size, e_tag)
+
+    with wrapper.get_ranged(part_size=part_size, max_workers=1) as reader:
+        assert reader.read(10) == data[:10]
+        assert reader.read() == data[10:]
+
+
+def test_get_ranged_mismatch(make_stubber):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = b"test-data" * 10
+
+    stub_ranged_reader(
+        s3_stubber, bucket_name, key, data, 40, '"0123456789abcdef0123456789abcdef"'
+    )
+
+    with wrapper.get_ranged(part_size=40, max_workers=1) as reader:
+        with pytest.raises(IntegrityError):
+            list(reader.iter_parts())
+
+
+def test_get_ranged_download_to(make_stubber, tmp_path):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = bytes(range(256)) * 4
+    part_size = 100
+
+    stub_ranged_reader(
+        s3_stubber, bucket_name, key, data, part_size, multipart_etag(data, 100)
+    )
+
+    path = tmp_path / "download.bin"
+    with wrapper.get_ranged(part_size=part_size, max_workers=1) as reader:
+        assert reader.download_to(str(path)) == len(data)
+    assert path.read_bytes() == data
+
+
+def test_get_ranged_download_to_error(make_stubber, tmp_path):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = b"test-data" * 10
+    e_tag = f'"{hashlib.md5(data).hexdigest()}"'
+
+    s3_stubber.stub_head_object(bucket_name, key, content_length=len(data), e_tag=e_tag)
+    s3_stubber.stub_get_object_range(bucket_name, key, "bytes=0-59", data[:60], e_tag)
+    s3_stubber.stub_get_object_range(
+        bucket_name, key, "bytes=60-89", data[60:], e_tag, error_code="TestException"
+    )
+
+    path = tmp_path / "download.bin"
+    with wrapper.get_ranged(part_size=60, max_workers=1) as reader:
+        with pytest.raises(ClientError):
+            reader.download_to(str(path))
+    assert not path.exists()
+
+
+def part_checksum(algorithm, data):
+    if algorithm == "CRC32":
+        digest = zlib.crc32(data).to_bytes(4, "big")
+    else:
+        digest = hashlib.sha256(data).digest()
+    return {f"Checksum{algorithm}": base64.b64encode(digest).decode()}
+
+
+def stub_part_reader(s3_stubber, bucket_name, key, data, part_size, algorithm):
+    e_tag = '"0123456789abcdef0123456789abcdef-3"'
+    parts = [
+        data[start : start + part_size] for start in range(0, len(data), part_size)
+    ]
+    s3_stubber.stub_head_object(bucket_name, key, content_length=len(data), e_tag=e_tag)
+    s3_stubber.stub_head_object_part(
+        bucket_name,
+        key,
+        1,
+        e_tag,
+        len(parts),
+        len(parts[0]),
+        checksums=part_checksum(algorithm, parts[0]),
+        checksum_type="COMPOSITE",
+    )
+    return e_tag, parts
+
+
+@pytest.mark.parametrize("algorithm", ["CRC32", "SHA256"])
+def test_get_ranged_parts(make_stubber, algorithm):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = bytes(range(256)) * 4
+    part_size = 400
+
+    e_tag, parts = stub_part_reader(
+        s3_stubber, bucket_name, key, data, part_size, algorithm
+    )
+    for index, part in enumerate(parts):
+        start = index * part_size
+        s3_stubber.stub_get_object_part(
+            bucket_name,
+            key,
+            index + 1,
+            part,
+            e_tag,
+            f"bytes {start}-{start + len(part) - 1}/{len(data)}",
+            checksums=part_checksum(algorithm, part),
+        )
+
+    # The part size of the upload is used instead of the part size of the reader.
+    with wrapper.get_ranged(part_size=100, max_workers=1) as reader:
+        assert list(reader.iter_parts()) == parts
+
+
+def test_get_ranged_parts_mismatch(make_stubber):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    key = "test-key"
+    wrapper = ObjectWrapper(s3_resource.Object(bucket_name, key))
+    data = bytes(range(256)) * 4
+
+    e_tag, parts = stub_part_reader(s3_stubber, bucket_name, key, data, 400, "SHA256")
+    s3_stubber.stub_get_object_part(
+        bucket_name,
+        key,
+        1,
+        parts[0],
+        e_tag,
+        f"bytes 0-399/{len(data)}",
+        checksums=part_checksum("SHA256", parts[1]),
+    )
+
+    # The corrupt first part is never returned.
+    with wrapper.get_ranged(max_workers=1, read_ahead=1) as reader:
+        with pytest.raises(IntegrityError):
+            next(reader.iter_parts())
+
+
 @pytest.mark.parametrize("error_code", [None, "TestException"])
 def test_list(make_stubber, error_code):
     s3_resource = boto3.resource("s3")
@@ -160,6 +353,76 @@ def test_empty_bucket(make_stubber, error_code):
         assert exc_info.value.response["Error"]["Code"] == error_code
 
 
+def test_batch_deleter_delete(make_stubber, monkeypatch):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    bucket = s3_resource.Bucket(bucket_name)
+    keys = [f"key-{ind}" for ind in range(5)]
+    objects = [{"Key": key} for key in keys]
+    monkeypatch.setattr("object_wrapper.time.sleep", lambda _: None)
+
+    s3_stubber.stub_delete_objects_quiet(bucket_name, objects[:2])
+    s3_stubber.stub_delete_objects_quiet(
+        bucket_name,
+        objects[2:4],
+        errors=[(objects[2], "SlowDown"), (objects[3], "AccessDenied")],
+    )
+    s3_stubber.stub_delete_objects_quiet(bucket_name, objects[2:3])
+    s3_stubber.stub_delete_objects_quiet(bucket_name, objects[4:])
+
+    deleter = BatchDeleter(bucket, max_workers=1, batch_size=2)
+    stats = deleter.delete(keys)
+    assert stats.deleted == 4
+    assert stats.failed == ["key-3"]
+    assert stats.requests == 4
+
+
+def test_batch_deleter_delete_throttled(make_stubber, monkeypatch):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    bucket = s3_resource.Bucket(bucket_name)
+    objects = [{"Key": "key-0"}]
+    monkeypatch.setattr("object_wrapper.time.sleep", lambda _: None)
+
+    s3_stubber.stub_delete_objects_quiet(bucket_name, objects, error_code="SlowDown")
+    s3_stubber.stub_delete_objects_quiet(
+        bucket_name, objects, error_code="TestException"
+    )
+
+    stats = BatchDeleter(bucket, max_workers=1).delete(objects)
+    assert stats.deleted == 0
+    assert stats.throttles == 1
+    assert stats.failed == ["key-0"]
+
+
+@pytest.mark.parametrize("include_versions", [True, False])
+def test_batch_deleter_empty(make_stubber, include_versions):
+    s3_resource = boto3.resource("s3")
+    s3_stubber = make_stubber(s3_resource.meta.client)
+    bucket_name = "test-bucket"
+    bucket = s3_resource.Bucket(bucket_name)
+    prefix = "test-prefix/"
+    keys = [f"{prefix}key-{ind}" for ind in range(3)]
+
+    if include_versions:
+        versions = [{"Key": key, "VersionId": f"version-{key}"} for key in keys]
+        markers = [{"Key": keys[0], "VersionId": "marker"}]
+        s3_stubber.stub_list_object_versions(
+            bucket_name, prefix=prefix, versions=versions, delete_markers=markers
+        )
+        objects = versions + markers
+    else:
+        s3_stubber.stub_list_objects(bucket_name, keys, prefix=prefix)
+        objects = [{"Key": key} for key in keys]
+    s3_stubber.stub_delete_objects_quiet(bucket_name, objects)
+
+    stats = BatchDeleter(bucket, max_workers=1).empty(prefix, include_versions)
+    assert stats.deleted == len(objects)
+    assert stats.failed == []
+
+
 @pytest.mark.parametrize("error_code", [None, "TestException"])
 def test_put_acl(make_stubber, error_code):
     s3_resource = boto3.resource("s3")
@@ -17,8 +17,14 @@ logger = logging.getLogger(__name__)
 # snippet-start:[python.example_code.python.BatchGetSecretValue.full]
 # snippet-start:[python.example_code.python.BatchGetSecretValue.decl]
 class BatchGetSecretsWrapper:
-    def __init__(self, secretsmanager_client):
+    def __init__(self, secretsmanager_client, cache=None):
+        """
+        :param secretsmanager_client: A Boto3 Secrets Manager client.
+        :param cache: An optional SecretCache. When set, every secret that is
+                      retrieved is added to the cache.
+        """
         self.client = secretsmanager_client
+        self.cache = cache
 
     # snippet-end:[python.example_code.python.BatchGetSecretValue.decl]
 
@@ -27,17 +33,24 @@ class BatchGetSecretsWrapper:
         Retrieve multiple secrets from AWS Secrets Manager using the batch_get_secret_value API.
         This function assumes the stack mentioned in the source code README has been successfully deployed.
         This stack includes 7 secrets, all of which have names beginning with "mySecret".
+        Results are returned in pages, so this function follows NextToken until every
+        matching secret is retrieved.
 
         :param filter_name: The full or partial name of secrets to be fetched.
         :type filter_name: str
         """
         try:
             secrets = []
-            response = self.client.batch_get_secret_value(
-                Filters=[{"Key": "name", "Values": [f"{filter_name}"]}]
-            )
-            for secret in response["SecretValues"]:
-                secrets.append(json.loads(secret["SecretString"]))
+            kwargs = {"Filters": [{"Key": "name", "Values": [f"{filter_name}"]}]}
+            while True:
+                response = self.client.batch_get_secret_value(**kwargs)
+                for secret in response["SecretValues"]:
+                    if self.cache is not None:
+                        self.cache.put(secret)
+                    secrets.append(json.loads(secret["SecretString"]))
+                if not response.get("NextToken"):
+                    break
+                kwargs["NextToken"] = response["NextToken"]
             if secrets:
                 logger.info("Secrets retrieved successfully.")
             else:
@@ -16,8 +16,14 @@ logger = logging.getLogger(__name__)
 # snippet-start:[python.example_code.python.GetSecretValue.full]
 # snippet-start:[python.example_code.python.GetSecretValue.decl]
 class GetSecretWrapper:
-    def __init__(self, secretsmanager_client):
+    def __init__(self, secretsmanager_client, cache=None):
+        """
+        :param secretsmanager_client: A Boto3 Secrets Manager client.
+        :param cache: An optional SecretCache. When set, secrets are read through
+                      the cache instead of calling Secrets Manager every time.
+        """
         self.client = secretsmanager_client
+        self.cache = cache
 
     # snippet-end:[python.example_code.python.GetSecretValue.decl]
 
@@ -31,9 +37,12 @@ class GetSecretWrapper:
         :type secret_name: str
         """
         try:
-            get_secret_value_response = self.client.get_secret_value(
-                SecretId=secret_name
-            )
+            if self.cache is not None:
+                get_secret_value_response = self.cache.get_secret_value(secret_name)
+            else:
+                get_secret_value_response = self.client.get_secret_value(
+                    SecretId=secret_name
+                )
             logging.info("Secret retrieved successfully.")
             return get_secret_value_response["SecretString"]
         except self.client.exceptions.ResourceNotFoundException:
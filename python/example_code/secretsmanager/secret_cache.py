@@ -0,0 +1,217 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Shows how to cache secret values from AWS Secrets Manager in process memory so
+that code that reads secrets on a hot path does not call the service every time.
+Cached values are refreshed in the background after they expire, and concurrent
+requests for a secret that is not cached share a single call to the service.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION_STAGE = "AWSCURRENT"
+
+
+class CacheStats:
+    """Counters that describe how a cache has been used."""
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / requests if requests else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.stale_hits} stale hits, {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate), {self.refreshes} background refreshes, "
+            f"{self.errors} errors."
+        )
+
+
+class _CacheEntry:
+    def __init__(self, response, fetched_at):
+        self.response = response
+        self.fetched_at = fetched_at
+
+
+class SecretCache:
+    """
+    An in-process cache of GetSecretValue responses, keyed by secret ID and
+    version stage.
+
+    * A value younger than the TTL is returned from the cache.
+    * A value older than the TTL, but still within the stale period, is returned
+      from the cache while a background thread gets a fresh value.
+    * Any other value is fetched before it is returned. When several threads
+      request the same missing value at once, only one of them calls the service
+      and the others wait for its result.
+    """
+
+    def __init__(
+        self,
+        secretsmanager_client,
+        ttl_seconds=300,
+        stale_seconds=3600,
+        refresh_workers=2,
+        clock=time.monotonic,
+    ):
+        """
+        :param secretsmanager_client: A Boto3 Secrets Manager client.
+        :param ttl_seconds: The number of seconds that a cached value is fresh.
+        :param stale_seconds: The number of seconds after the TTL during which a
+                              cached value is still returned while it is refreshed.
+        :param refresh_workers: The number of threads that refresh values.
+        :param clock: A function that returns the current time in seconds.
+        """
+        self.client = secretsmanager_client
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="secret-refresh"
+        )
+
+    def get_secret_value(self, secret_id, version_stage=DEFAULT_VERSION_STAGE):
+        """
+        Gets a secret value from the cache, or from Secrets Manager when it is not
+        cached or has expired.
+
+        :param secret_id: The name or ARN of the secret.
+        :param version_stage: The staging label of the version to get.
+        :return: The GetSecretValue response for the secret.
+        """
+        key = (secret_id, version_stage)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if age < self.ttl_seconds:
+                    self.stats.add("hits")
+                    return entry.response
+                if age < self.ttl_seconds + self.stale_seconds:
+                    self.stats.add("stale_hits")
+                    if key not in self._in_flight:
+                        self._start_fetch(key, background=True)
+                    return entry.response
+            self.stats.add("misses")
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._start_fetch(key, background=False)
+                fetch_here = True
+            else:
+                fetch_here = False
+        if fetch_here:
+            self._fetch(key, future)
+        return future.result()
+
+    def get_secret_string(self, secret_id, version_stage=DEFAULT_VERSION_STAGE):
+        """
+        :param secret_id: The name or ARN of the secret.
+        :param version_stage: The staging label of the version to get.
+        :return: The SecretString of the secret.
+        """
+        return self.get_secret_value(secret_id, version_stage)["SecretString"]
+
+    def put(self, response, secret_id=None):
+        """
+        Adds a secret value that was retrieved in another way, such as by
+        BatchGetSecretValue, to the cache. The value is stored for each of its
+        version stages under both its name and its ARN.
+
+        :param response: A GetSecretValue response or a SecretValues entry from a
+                         BatchGetSecretValue response.
+        :param secret_id: An additional secret ID to store the value under.
+        """
+        now = self.clock()
+        secret_ids = {response.get("Name"), response.get("ARN"), secret_id} - {None}
+        stages = response.get("VersionStages") or [DEFAULT_VERSION_STAGE]
+        with self._lock:
+            for cached_id in secret_ids:
+                for stage in stages:
+                    self._entries[(cached_id, stage)] = _CacheEntry(response, now)
+
+    def invalidate(self, secret_id=None):
+        """
+        Removes values from the cache.
+
+        :param secret_id: The secret to remove. When None, the whole cache is cleared.
+        """
+        with self._lock:
+            if secret_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == secret_id]:
+                    del self._entries[key]
+
+    def close(self):
+        """Stops the background refresh threads."""
+        self._refresher.shutdown(wait=True)
+
+    def _start_fetch(self, key, background):
+        """
+        Registers a fetch of a secret value so that concurrent requests can wait for
+        it. Must be called while holding the lock.
+
+        :return: The future of the fetch, or None when a background fetch can't be
+                 started because the cache is closed.
+        """
+        future = Future()
+        if background:
+            try:
+                self._refresher.submit(self._fetch, key, future)
+            except RuntimeError:
+                # After close, stale values are returned without being refreshed.
+                logger.info("Couldn't refresh secret %s, the cache is closed.", key[0])
+                return None
+            self.stats.add("refreshes")
+        # The fetch can't finish before it is registered, because it needs the lock.
+        self._in_flight[key] = future
+        return future
+
+    def _fetch(self, key, future):
+        secret_id, version_stage = key
+        try:
+            response = self.client.get_secret_value(
+                SecretId=secret_id, VersionStage=version_stage
+            )
+        except Exception as error:
+            self.stats.add("errors")
+            logger.warning(
+                "Couldn't get secret %s with stage %s: %s",
+                secret_id,
+                version_stage,
+                error,
+            )
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+        else:
+            with self._lock:
+                self._entries[key] = _CacheEntry(response, self.clock())
+                del self._in_flight[key]
+            future.set_result(response)
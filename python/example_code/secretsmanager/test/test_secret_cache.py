@@ -0,0 +1,206 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for secret_cache.py and for the cache and pagination support in the
+secret wrappers.
+"""
+
+import json
+import os
+import sys
+import threading
+
+import boto3
+from botocore.stub import Stubber
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_get_secret_value import BatchGetSecretsWrapper
+from get_secret_value import GetSecretWrapper
+from secret_cache import SecretCache
+
+SECRET_ARN = "arn:aws:secretsmanager:us-east-1:123456789012:secret:mySecret1-abcdef"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def secret_value(name, value, arn=SECRET_ARN):
+    return {
+        "ARN": arn,
+        "Name": name,
+        "SecretString": value,
+        "VersionStages": ["AWSCURRENT"],
+    }
+
+
+class CountingClient:
+    """A thread-safe stand-in for a Secrets Manager client that counts calls."""
+
+    def __init__(self, release=None):
+        self.calls = 0
+        self.release = release
+        self._lock = threading.Lock()
+
+    def get_secret_value(self, SecretId, VersionStage):
+        with self._lock:
+            self.calls += 1
+            value = f"value-{self.calls}"
+        if self.release is not None:
+            self.release.wait()
+        return secret_value(SecretId, value)
+
+
+def test_get_secret_uses_cache():
+    client = boto3.client("secretsmanager")
+    clock = FakeClock()
+    cache = SecretCache(client, ttl_seconds=10, stale_seconds=0, clock=clock)
+    wrapper = GetSecretWrapper(client, cache)
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "get_secret_value",
+            secret_value("mySecret1", "first"),
+            {"SecretId": "mySecret1", "VersionStage": "AWSCURRENT"},
+        )
+        stubber.add_response(
+            "get_secret_value",
+            secret_value("mySecret1", "second"),
+            {"SecretId": "mySecret1", "VersionStage": "AWSCURRENT"},
+        )
+
+        assert wrapper.get_secret("mySecret1") == "first"
+        clock.now = 5
+        assert wrapper.get_secret("mySecret1") == "first"
+        clock.now = 11
+        assert wrapper.get_secret("mySecret1") == "second"
+        stubber.assert_no_pending_responses()
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    cache.close()
+
+
+def test_get_secret_not_found_with_cache():
+    client = boto3.client("secretsmanager")
+    cache = SecretCache(client)
+    wrapper = GetSecretWrapper(client, cache)
+    with Stubber(client) as stubber:
+        stubber.add_client_error(
+            "get_secret_value", service_error_code="ResourceNotFoundException"
+        )
+
+        assert "was not found" in wrapper.get_secret("missing")
+    assert cache.stats.errors == 1
+    cache.close()
+
+
+def test_stale_value_is_refreshed_in_background():
+    clock = FakeClock()
+    release = threading.Event()
+    client = CountingClient()
+    cache = SecretCache(client, ttl_seconds=10, stale_seconds=100, clock=clock)
+
+    assert cache.get_secret_string("mySecret1") == "value-1"
+    client.release = release
+    clock.now = 20
+    # The stale value is returned while the refresh waits for the service.
+    assert cache.get_secret_string("mySecret1") == "value-1"
+    assert cache.get_secret_string("mySecret1") == "value-1"
+    release.set()
+    cache.close()
+
+    assert cache.get_secret_string("mySecret1") == "value-2"
+    assert client.calls == 2
+    assert cache.stats.stale_hits == 2
+    assert cache.stats.refreshes == 1
+
+
+def test_closed_cache_does_not_refresh():
+    clock = FakeClock()
+    client = CountingClient()
+    cache = SecretCache(client, ttl_seconds=10, stale_seconds=100, clock=clock)
+
+    assert cache.get_secret_string("mySecret1") == "value-1"
+    cache.close()
+    clock.now = 20
+    assert cache.get_secret_string("mySecret1") == "value-1"
+    clock.now = 200
+    # A miss doesn't wait for a refresh that was never started.
+    assert cache.get_secret_string("mySecret1") == "value-2"
+    assert client.calls == 2
+    assert cache.stats.refreshes == 0
+
+
+def test_concurrent_misses_share_one_call():
+    release = threading.Event()
+    client = CountingClient(release)
+    cache = SecretCache(client)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_secret_string("mySecret1"))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats.misses < len(threads):
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    cache.close()
+
+    assert results == ["value-1"] * len(threads)
+    assert client.calls == 1
+
+
+def test_batch_get_secrets_paginates_and_fills_cache():
+    client = boto3.client("secretsmanager")
+    cache = SecretCache(client)
+    wrapper = BatchGetSecretsWrapper(client, cache)
+    filters = [{"Key": "name", "Values": ["mySecret"]}]
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "batch_get_secret_value",
+            {
+                "SecretValues": [secret_value("mySecret1", json.dumps({"n": 1}))],
+                "NextToken": "test-token",
+                "Errors": [],
+            },
+            {"Filters": filters},
+        )
+        stubber.add_response(
+            "batch_get_secret_value",
+            {
+                "SecretValues": [
+                    secret_value(
+                        "mySecret2", json.dumps({"n": 2}), arn=SECRET_ARN + "2"
+                    )
+                ],
+                "Errors": [],
+            },
+            {"Filters": filters, "NextToken": "test-token"},
+        )
+
+        secrets = wrapper.batch_get_secrets("mySecret")
+        stubber.assert_no_pending_responses()
+
+    assert secrets == [{"n": 1}, {"n": 2}]
+    # Both secrets are served from the cache without another call.
+    assert json.loads(cache.get_secret_string("mySecret2")) == {"n": 2}
+    assert json.loads(cache.get_secret_string(SECRET_ARN)) == {"n": 1}
+    assert cache.stats.hits == 2
+    cache.invalidate("mySecret2")
+    with Stubber(client) as stubber:
+        stubber.add_client_error(
+            "get_secret_value", service_error_code="ResourceNotFoundException"
+        )
+        with pytest.raises(client.exceptions.ResourceNotFoundException):
+            cache.get_secret_value("mySecret2")
+    cache.close()
@@ -0,0 +1,533 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Purpose
+
+Demonstrate how to move a high volume of messages through an Amazon Simple Queue
+Service (Amazon SQS) queue. A buffered sender packs messages into SendMessageBatch
+requests and resends the entries that fail. A consumer long-polls the queue from
+several threads, hands messages to a pool of worker threads, deletes handled messages
+in batches, and extends the visibility timeout of messages that take a long time
+to handle.
+"""
+
+import logging
+import queue as queue_module
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+import queue_wrapper
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ENTRIES = 10  # SQS rejects a batch request of more than 10 entries.
+MAX_BATCH_BYTES = 256 * 1024  # SQS rejects a SendMessageBatch request over 256 KB.
+
+_CLOSE = object()
+
+
+class PipelineStats:
+    """Counters that describe the messages moved by a pipeline."""
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.handled = 0
+        self.deleted = 0
+        self.extended = 0
+        self.failed = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def __str__(self):
+        return (
+            f"Sent {self.sent}, received {self.received}, handled {self.handled}, "
+            f"deleted {self.deleted}, extended {self.extended}, and failed "
+            f"{self.failed} messages with {self.requests} requests."
+        )
+
+
+def message_size(body, attributes):
+    """
+    Calculates the size that SQS counts for a message.
+
+    :param body: The body of the message.
+    :param attributes: The message attributes of the message.
+    :return: The size in bytes.
+    """
+    size = len(body.encode())
+    for name, attribute in attributes.items():
+        size += len(name.encode()) + len(attribute["DataType"].encode())
+        if "StringValue" in attribute:
+            size += len(attribute["StringValue"].encode())
+        if "BinaryValue" in attribute:
+            size += len(attribute["BinaryValue"])
+    return size
+
+
+def _collect_batches(items, linger_seconds, max_entries, max_bytes=None):
+    """
+    Groups items from a queue into batches. A batch is yielded when it is full,
+    or when its oldest item has waited for the linger time.
+
+    :param items: A queue of (item, size) tuples, ended by _CLOSE.
+    :return: A generator of lists of items.
+    """
+    batch = []
+    batch_bytes = 0
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(0, deadline - time.monotonic())
+        try:
+            entry = items.get(timeout=timeout)
+        except queue_module.Empty:
+            entry = None
+        if entry is None or entry is _CLOSE:
+            if batch:
+                yield batch
+            if entry is _CLOSE:
+                return
+            batch, batch_bytes, deadline = [], 0, None
+            continue
+        item, size = entry
+        if batch and (
+            len(batch) == max_entries
+            or (max_bytes is not None and batch_bytes + size > max_bytes)
+        ):
+            yield batch
+            batch, batch_bytes = [], 0
+            deadline = time.monotonic() + linger_seconds
+        if deadline is None:
+            deadline = time.monotonic() + linger_seconds
+        batch.append(item)
+        batch_bytes += size
+
+
+def _backoff(tries):
+    time.sleep(random.uniform(0, min(2**tries * 0.05, 5)))
+
+
+class BatchSender:
+    """
+    Buffers messages and sends them to a queue in SendMessageBatch requests of up to
+    10 messages and 256 KB from several threads. Entries that fail because of a
+    server error are resent with jittered exponential backoff.
+
+    Use the sender as a context manager, or call close when you are done, so that
+    buffered messages are sent.
+    """
+
+    def __init__(
+        self,
+        queue,
+        sender_count=4,
+        linger_seconds=0.05,
+        max_buffered_messages=10000,
+        max_tries=8,
+    ):
+        """
+        :param queue: The queue that receives the messages.
+        :param sender_count: The number of threads that send requests.
+        :param linger_seconds: The longest time that a message waits in the buffer
+                               before its batch is sent.
+        :param max_buffered_messages: The maximum number of messages waiting to be
+                                      sent. When the buffer is full, send blocks.
+        :param max_tries: The maximum number of times that a message is sent.
+        """
+        # Clients are thread safe, so the senders share the client of the queue.
+        self.sqs_client = queue.meta.client
+        self.queue_url = queue.url
+        self.linger_seconds = linger_seconds
+        self.max_tries = max_tries
+        self.stats = PipelineStats()
+        self._buffer = queue_module.Queue(maxsize=max_buffered_messages)
+        self._errors = []
+        self._senders = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(sender_count)
+        ]
+        for sender in self._senders:
+            sender.start()
+
+    def send(self, body, attributes=None):
+        """
+        Adds a message to the buffer.
+
+        :param body: The body text of the message.
+        :param attributes: Custom attributes of the message.
+        """
+        self._raise_error()
+        attributes = attributes or {}
+        entry = {"MessageBody": body, "MessageAttributes": attributes}
+        self._buffer.put((entry, message_size(body, attributes)))
+
+    def flush(self):
+        """
+        Waits until every message added so far is sent.
+        """
+        self._buffer.join()
+        self._raise_error()
+
+    def close(self):
+        """
+        Sends the buffered messages and stops the sender threads.
+        """
+        for _ in self._senders:
+            self._buffer.put(_CLOSE)
+        for sender in self._senders:
+            sender.join()
+        logger.info("%s", self.stats)
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _raise_error(self):
+        if self._errors:
+            raise self._errors[0]
+
+    def _run(self):
+        for batch in _collect_batches(
+            self._buffer, self.linger_seconds, MAX_BATCH_ENTRIES, MAX_BATCH_BYTES
+        ):
+            try:
+                if self._errors:
+                    # Messages are dropped after an error so that send never blocks.
+                    self.stats.add(failed=len(batch))
+                else:
+                    self._send_batch(batch)
+            except Exception as error:
+                logger.exception("Couldn't send messages to queue %s.", self.queue_url)
+                self.stats.add(failed=len(batch))
+                self._errors.append(error)
+            finally:
+                for _ in batch:
+                    self._buffer.task_done()
+        # Account for the _CLOSE marker.
+        self._buffer.task_done()
+
+    def _send_batch(self, batch):
+        """
+        Sends a batch, resending only the entries that fail because of a server error.
+        """
+        entries = {str(index): entry for index, entry in enumerate(batch)}
+        for tries in range(self.max_tries):
+            if tries > 0:
+                _backoff(tries)
+            response = self.sqs_client.send_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": entry_id, **entry} for entry_id, entry in entries.items()
+                ],
+            )
+            self.stats.add(sent=len(response.get("Successful", [])), requests=1)
+            retry = {}
+            for failure in response.get("Failed", []):
+                if failure["SenderFault"]:
+                    logger.warning(
+                        "Couldn't send message %s: %s: %s",
+                        entries[failure["Id"]]["MessageBody"],
+                        failure["Code"],
+                        failure.get("Message"),
+                    )
+                    self.stats.add(failed=1)
+                else:
+                    retry[failure["Id"]] = entries[failure["Id"]]
+            entries = retry
+            if not entries:
+                return
+        logger.warning(
+            "%s messages were still not sent after %s tries.",
+            len(entries),
+            self.max_tries,
+        )
+        self.stats.add(failed=len(entries))
+
+
+class QueueConsumer:
+    """
+    Receives messages from a queue and handles them on a pool of worker threads.
+
+    Several receiver threads long-poll the queue for up to 10 messages at a time and
+    pass them to the workers through a bounded buffer, so receivers stop receiving
+    when the workers fall behind. A message that is handled without an error is
+    deleted in a DeleteMessageBatch request. A message whose handler raises an error
+    is not deleted, so it becomes visible again after its visibility timeout and is
+    received again or moved to a dead-letter queue. While a message waits in the
+    buffer or is being handled, its visibility timeout is extended so that it is not
+    delivered to another consumer.
+    """
+
+    def __init__(
+        self,
+        queue,
+        handler,
+        receiver_count=2,
+        worker_count=16,
+        wait_time=20,
+        visibility_timeout=30,
+        delete_linger_seconds=0.05,
+        max_buffered_messages=None,
+    ):
+        """
+        :param queue: The queue from which to receive messages.
+        :param handler: A function that is called with each message dict, as returned
+                        by ReceiveMessage. It is called from worker threads.
+        :param receiver_count: The number of threads that receive messages.
+        :param worker_count: The number of threads that handle messages.
+        :param wait_time: The number of seconds that each receive request waits for
+                          messages.
+        :param visibility_timeout: The visibility timeout, in seconds, of received
+                                   messages. Messages that are still in progress when
+                                   half of this time has passed are extended.
+        :param delete_linger_seconds: The longest time that a handled message waits
+                                      before its delete batch is sent.
+        :param max_buffered_messages: The maximum number of received messages waiting
+                                      for a worker. Defaults to twice the number of
+                                      workers.
+        """
+        self.sqs_client = queue.meta.client
+        self.queue_url = queue.url
+        self.handler = handler
+        self.receiver_count = receiver_count
+        self.worker_count = worker_count
+        self.wait_time = wait_time
+        self.visibility_timeout = visibility_timeout
+        self.delete_linger_seconds = delete_linger_seconds
+        self.max_buffered_messages = max_buffered_messages or worker_count * 2
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+        # Maps the receipt handle of each message in progress to the time its
+        # visibility timeout was last set.
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._errors = []
+
+    def stop(self):
+        """
+        Stops receiving messages. Messages that were already received are handled.
+        """
+        self._stop.set()
+
+    def run(self, stop_when_empty=False):
+        """
+        Receives and handles messages until the consumer is stopped.
+
+        :param stop_when_empty: When True, each receiver stops after a receive request
+                                returns no messages, so the consumer stops when the
+                                queue is empty.
+        """
+        self._stop.clear()
+        work = queue_module.Queue(maxsize=self.max_buffered_messages)
+        deletes = queue_module.Queue()
+        done_extending = threading.Event()
+
+        def start(target, *args):
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            return thread
+
+        receivers = [
+            start(self._receive, work, stop_when_empty)
+            for _ in range(self.receiver_count)
+        ]
+        workers = [start(self._work, work, deletes) for _ in range(self.worker_count)]
+        deleter = start(self._delete, deletes)
+        extender = start(self._extend, done_extending)
+
+        for receiver in receivers:
+            receiver.join()
+        for _ in workers:
+            work.put(_CLOSE)
+        for worker in workers:
+            worker.join()
+        deletes.put(_CLOSE)
+        deleter.join()
+        done_extending.set()
+        extender.join()
+        logger.info("%s", self.stats)
+        if self._errors:
+            raise self._errors[0]
+
+    def _fail(self, error):
+        logger.exception("Couldn't consume messages from queue %s.", self.queue_url)
+        self._errors.append(error)
+        self._stop.set()
+
+    def _receive(self, work, stop_when_empty):
+        while not self._stop.is_set():
+            try:
+                response = self.sqs_client.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=MAX_BATCH_ENTRIES,
+                    WaitTimeSeconds=self.wait_time,
+                    VisibilityTimeout=self.visibility_timeout,
+                    MessageAttributeNames=["All"],
+                )
+            except ClientError as error:
+                self._fail(error)
+                return
+            messages = response.get("Messages", [])
+            self.stats.add(received=len(messages), requests=1)
+            now = time.monotonic()
+            with self._in_flight_lock:
+                for message in messages:
+                    self._in_flight[message["ReceiptHandle"]] = now
+            for message in messages:
+                work.put(message)
+            if not messages and stop_when_empty:
+                return
+
+    def _work(self, work, deletes):
+        while True:
+            message = work.get()
+            if message is _CLOSE:
+                return
+            try:
+                self.handler(message)
+            except Exception:
+                logger.exception(
+                    "Couldn't handle message %s. It will become visible again after "
+                    "its visibility timeout.",
+                    message["MessageId"],
+                )
+                self.stats.add(failed=1)
+                with self._in_flight_lock:
+                    self._in_flight.pop(message["ReceiptHandle"], None)
+            else:
+                self.stats.add(handled=1)
+                deletes.put((message["ReceiptHandle"], 0))
+
+    def _delete(self, deletes):
+        for receipt_handles in _collect_batches(
+            deletes, self.delete_linger_seconds, MAX_BATCH_ENTRIES
+        ):
+            with self._in_flight_lock:
+                for receipt_handle in receipt_handles:
+                    self._in_flight.pop(receipt_handle, None)
+            if self._errors:
+                continue
+            try:
+                response = self.sqs_client.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {"Id": str(index), "ReceiptHandle": receipt_handle}
+                        for index, receipt_handle in enumerate(receipt_handles)
+                    ],
+                )
+            except ClientError as error:
+                self._fail(error)
+                continue
+            self.stats.add(deleted=len(response.get("Successful", [])), requests=1)
+            for failure in response.get("Failed", []):
+                logger.warning(
+                    "Couldn't delete message %s: %s",
+                    receipt_handles[int(failure["Id"])],
+                    failure["Code"],
+                )
+                self.stats.add(failed=1)
+
+    def _extend(self, done_extending):
+        """
+        Periodically extends the visibility timeout of messages that have been in
+        progress for more than half of their visibility timeout.
+        """
+        interval = self.visibility_timeout / 2
+        while not done_extending.wait(interval / 2):
+            now = time.monotonic()
+            with self._in_flight_lock:
+                due = [
+                    receipt_handle
+                    for receipt_handle, extended_at in self._in_flight.items()
+                    if now - extended_at >= interval
+                ]
+            for start in range(0, len(due), MAX_BATCH_ENTRIES):
+                chunk = due[start : start + MAX_BATCH_ENTRIES]
+                try:
+                    response = self.sqs_client.change_message_visibility_batch(
+                        QueueUrl=self.queue_url,
+                        Entries=[
+                            {
+                                "Id": str(index),
+                                "ReceiptHandle": receipt_handle,
+                                "VisibilityTimeout": self.visibility_timeout,
+                            }
+                            for index, receipt_handle in enumerate(chunk)
+                        ],
+                    )
+                except ClientError:
+                    # The messages become visible again, which is safe, so log the
+                    # error and keep consuming.
+                    logger.exception(
+                        "Couldn't extend the visibility timeout of %s messages.",
+                        len(chunk),
+                    )
+                    continue
+                self.stats.add(extended=len(response.get("Successful", [])), requests=1)
+                with self._in_flight_lock:
+                    for success in response.get("Successful", []):
+                        receipt_handle = chunk[int(success["Id"])]
+                        if receipt_handle in self._in_flight:
+                            self._in_flight[receipt_handle] = now
+
+
+def usage_demo():
+    """
+    Shows how to:
+    * Send the lines of this Python file as messages by using a buffered sender.
+    * Receive, handle, and delete the messages by using a multithreaded consumer.
+    * Reassemble the lines of the file and verify they match the original file.
+    """
+    print("-" * 88)
+    print("Welcome to the Amazon Simple Queue Service (Amazon SQS) pipeline demo!")
+    print("-" * 88)
+
+    queue = queue_wrapper.create_queue("sqs-usage-demo-message-pipeline")
+
+    with open(__file__) as file:
+        lines = file.readlines()
+
+    print(f"Sending {len(lines)} file lines as messages.")
+    with BatchSender(queue) as sender:
+        for index, line in enumerate(lines):
+            sender.send(
+                line, {"line": {"StringValue": str(index), "DataType": "Number"}}
+            )
+    print(sender.stats)
+
+    received_lines = [None] * len(lines)
+
+    def handle_message(message):
+        line = int(message["MessageAttributes"]["line"]["StringValue"])
+        received_lines[line] = message["Body"]
+
+    print("Receiving, handling, and deleting messages until the queue is empty.")
+    consumer = QueueConsumer(queue, handle_message, wait_time=2)
+    consumer.run(stop_when_empty=True)
+    print(consumer.stats)
+
+    if received_lines == lines:
+        print("Successfully reassembled all file lines!")
+    else:
+        print("Uh oh, some lines were missed!")
+
+    queue.delete()
+
+    print("Thanks for watching!")
+    print("-" * 88)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    usage_demo()
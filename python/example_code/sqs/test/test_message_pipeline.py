@@ -0,0 +1,173 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Unit tests for message_pipeline.py.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+import pytest
+
+import message_pipeline
+import message_wrapper
+
+
+def make_entries(messages):
+    return [
+        {"Id": str(index), "MessageBody": body, "MessageAttributes": {}}
+        for index, body in enumerate(messages)
+    ]
+
+
+@pytest.mark.parametrize("error_code", [None, "TestException"])
+def test_batch_sender(make_stubber, make_queue, error_code):
+    sqs_stubber = make_stubber(message_wrapper.sqs.meta.client)
+    queue = make_queue(sqs_stubber, message_wrapper.sqs)
+    bodies = [f"Message {index}" for index in range(12)]
+
+    sqs_stubber.stub_send_message_batch(
+        queue.url,
+        [{"body": body, "attributes": {}} for body in bodies[:10]],
+        error_code=error_code,
+    )
+    if error_code is None:
+        sqs_stubber.stub_send_message_batch(
+            queue.url, [{"body": body, "attributes": {}} for body in bodies[10:]]
+        )
+
+    # A single sender keeps stubbed calls in the order they were added.
+    sender = message_pipeline.BatchSender(queue, sender_count=1, linger_seconds=60)
+    for body in bodies:
+        sender.send(body)
+    if error_code is None:
+        sender.close()
+        assert sender.stats.sent == 12
+        assert sender.stats.requests == 2
+    else:
+        with pytest.raises(ClientError) as exc_info:
+            sender.close()
+        assert exc_info.value.response["Error"]["Code"] == error_code
+
+
+def test_batch_sender_resends_failed(make_stubber, make_queue, monkeypatch):
+    sqs_stubber = make_stubber(message_wrapper.sqs.meta.client)
+    queue = make_queue(sqs_stubber, message_wrapper.sqs)
+    monkeypatch.setattr(message_pipeline, "_backoff", lambda tries: None)
+    bodies = ["Message 0", "Message 1", "Message 2"]
+
+    sqs_stubber.add_response(
+        "send_message_batch",
+        expected_params={"QueueUrl": queue.url, "Entries": make_entries(bodies)},
+        service_response={
+            "Successful": [
+                {"Id": "0", "MessageId": "msg-0", "MD5OfMessageBody": "md5"},
+            ],
+            "Failed": [
+                {"Id": "1", "SenderFault": False, "Code": "InternalError"},
+                {"Id": "2", "SenderFault": True, "Code": "InvalidMessageContents"},
+            ],
+        },
+    )
+    sqs_stubber.add_response(
+        "send_message_batch",
+        expected_params={
+            "QueueUrl": queue.url,
+            "Entries": [{"Id": "1", "MessageBody": bodies[1], "MessageAttributes": {}}],
+        },
+        service_response={
+            "Successful": [
+                {"Id": "1", "MessageId": "msg-1", "MD5OfMessageBody": "md5"}
+            ],
+            "Failed": [],
+        },
+    )
+
+    with message_pipeline.BatchSender(queue, sender_count=1) as sender:
+        for body in bodies:
+            sender.send(body)
+        sender.flush()
+        assert sender.stats.sent == 2
+        assert sender.stats.failed == 1
+
+
+class FakeSqsClient:
+    """A thread-safe stand-in for an SQS client whose calls can come in any order."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.deleted = []
+        self.extended = []
+        self.lock = threading.Lock()
+
+    def receive_message(self, **kwargs):
+        with self.lock:
+            messages = self.batches.pop(0) if self.batches else []
+        return {"Messages": messages}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            self.deleted += [entry["ReceiptHandle"] for entry in Entries]
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        with self.lock:
+            self.extended += [entry["ReceiptHandle"] for entry in Entries]
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+
+def make_messages(start, count):
+    return [
+        {
+            "MessageId": f"msg-{index}",
+            "ReceiptHandle": f"receipt-{index}",
+            "Body": f"Message {index}",
+        }
+        for index in range(start, start + count)
+    ]
+
+
+def test_queue_consumer():
+    sqs_client = FakeSqsClient([make_messages(0, 10), make_messages(10, 5)])
+    queue = SimpleNamespace(meta=SimpleNamespace(client=sqs_client), url="test-url")
+    handled = []
+    handled_lock = threading.Lock()
+
+    def handler(message):
+        if message["MessageId"] == "msg-3":
+            raise RuntimeError("Can't handle this message.")
+        with handled_lock:
+            handled.append(message["Body"])
+
+    consumer = message_pipeline.QueueConsumer(
+        queue, handler, receiver_count=1, worker_count=4
+    )
+    consumer.run(stop_when_empty=True)
+
+    expected = [f"Message {index}" for index in range(15) if index != 3]
+    assert sorted(handled) == sorted(expected)
+    assert sorted(sqs_client.deleted) == sorted(
+        f"receipt-{index}" for index in range(15) if index != 3
+    )
+    assert consumer.stats.handled == 14
+    assert consumer.stats.failed == 1
+
+
+def test_queue_consumer_extends_slow_messages():
+    sqs_client = FakeSqsClient([make_messages(0, 1)])
+    queue = SimpleNamespace(meta=SimpleNamespace(client=sqs_client), url="test-url")
+
+    consumer = message_pipeline.QueueConsumer(
+        queue,
+        lambda message: time.sleep(0.5),
+        receiver_count=1,
+        worker_count=1,
+        visibility_timeout=0.2,
+    )
+    consumer.run(stop_when_empty=True)
+
+    assert "receipt-0" in sqs_client.extended
+    assert sqs_client.deleted == ["receipt-0"]
@@ -72,6 +72,23 @@ class ComprehendStubber(ExampleStubber):
             "detect_syntax", expected_params, response, error_code=error_code
         )
 
+    def stub_batch_detect(
+        self, operation, texts, language, results, errors=None, error_code=None
+    ):
+        expected_params = {"TextList": texts, "LanguageCode": language}
+        response = {
+            "ResultList": [
+                {"Index": index, **result} for index, result in results.items()
+            ],
+            "ErrorList": [
+                {"Index": index, "ErrorCode": code, "ErrorMessage": f"{code} message"}
+                for index, code in (errors or {}).items()
+            ],
+        }
+        self._stub_bifurcator(
+            operation, expected_params, response, error_code=error_code
+        )
+
     def stub_create_document_classifier(
         self,
         name,
@@ -215,6 +215,9 @@ class DynamoStubber(ExampleStubber):
         start_key=None,
         last_key=None,
         error_code=None,
+        expression_attr_vals=None,
+        segment=None,
+        total_segments=None,
     ):
         expected_params = {"TableName": table_name}
         if select:
@@ -225,8 +228,13 @@ class DynamoStubber(ExampleStubber):
             expected_params["ProjectionExpression"] = projection_expression
         if expression_attrs:
             expected_params["ExpressionAttributeNames"] = expression_attrs
+        if expression_attr_vals:
+            expected_params["ExpressionAttributeValues"] = expression_attr_vals
         if start_key:
             expected_params["ExclusiveStartKey"] = start_key
+        if total_segments is not None:
+            expected_params["Segment"] = segment
+            expected_params["TotalSegments"] = total_segments
         response = {
             "Items": [self._build_out_item(output_item) for output_item in output_items]
         }
@@ -261,7 +269,11 @@ class DynamoStubber(ExampleStubber):
         )
 
     def stub_batch_write_item(
-        self, request_items, unprocessed_items=None, error_code=None
+        self,
+        request_items,
+        unprocessed_items=None,
+        consumed_capacity=None,
+        error_code=None,
     ):
         expected_params = {"RequestItems": request_items}
         response = {
@@ -269,6 +281,9 @@ class DynamoStubber(ExampleStubber):
             if unprocessed_items is not None
             else {}
         }
+        if consumed_capacity is not None:
+            expected_params["ReturnConsumedCapacity"] = "TOTAL"
+            response["ConsumedCapacity"] = consumed_capacity
         self._stub_bifurcator(
             "batch_write_item", expected_params, response, error_code=error_code
         )
@@ -87,28 +87,114 @@ class KinesisStubber(ExampleStubber):
             "put_records", expected_params, response, error_code=error_code
         )
 
+    def stub_put_records_entries(
+        self, stream, entries, failed_indexes=None, error_code=None
+    ):
+        expected_params = {"StreamName": stream, "Records": entries}
+        failed_indexes = failed_indexes or []
+        response = {
+            "Records": [
+                (
+                    {
+                        "ErrorCode": "ProvisionedThroughputExceededException",
+                        "ErrorMessage": "Rate exceeded for shard.",
+                    }
+                    if index in failed_indexes
+                    else {"ShardId": "test-id", "SequenceNumber": str(index)}
+                )
+                for index in range(len(entries))
+            ],
+        }
+        if failed_indexes:
+            response["FailedRecordCount"] = len(failed_indexes)
+        self._stub_bifurcator(
+            "put_records", expected_params, response, error_code=error_code
+        )
+
+    def stub_list_shards(
+        self, stream_name, shards, next_token=None, token=None, error_code=None
+    ):
+        if token is None:
+            expected_params = {"StreamName": stream_name}
+        else:
+            expected_params = {"NextToken": token}
+        response = {
+            "Shards": [
+                {
+                    "HashKeyRange": {"StartingHashKey": "0", "EndingHashKey": "1"},
+                    "SequenceNumberRange": {"StartingSequenceNumber": "0"},
+                    **shard,
+                }
+                for shard in shards
+            ]
+        }
+        if next_token is not None:
+            response["NextToken"] = next_token
+        self._stub_bifurcator(
+            "list_shards", expected_params, response, error_code=error_code
+        )
+
     def stub_get_shard_iterator(
-        self, stream_name, shard_id, shard_iter, error_code=None
+        self,
+        stream_name,
+        shard_id,
+        shard_iter,
+        error_code=None,
+        iterator_type="LATEST",
+        sequence_number=None,
     ):
         expected_params = {
             "StreamName": stream_name,
             "ShardId": shard_id,
-            "ShardIteratorType": "LATEST",
+            "ShardIteratorType": iterator_type,
         }
+        if sequence_number is not None:
+            expected_params["StartingSequenceNumber"] = sequence_number
         response = {"ShardIterator": shard_iter}
         self._stub_bifurcator(
             "get_shard_iterator", expected_params, response, error_code=error_code
         )
 
-    def stub_get_records(self, shard_iter, limit, records, error_code=None):
+    def stub_get_records(
+        self,
+        shard_iter,
+        limit,
+        records,
+        error_code=None,
+        next_shard_iter="",
+        sequence_numbers=None,
+        millis_behind_latest=None,
+        child_shards=None,
+    ):
         expected_params = {"ShardIterator": shard_iter, "Limit": limit}
+        if sequence_numbers is None:
+            sequence_numbers = ["1"] * len(records)
         response = {
-            "NextShardIterator": shard_iter,
             "Records": [
-                {"Data": record, "SequenceNumber": "1", "PartitionKey": "partition_key"}
-                for record in records
+                {
+                    "Data": record,
+                    "SequenceNumber": sequence_number,
+                    "PartitionKey": "partition_key",
+                }
+                for record, sequence_number in zip(records, sequence_numbers)
             ],
         }
+        # An empty string keeps the current iterator; None marks the end of the shard.
+        if next_shard_iter == "":
+            response["NextShardIterator"] = shard_iter
+        elif next_shard_iter is not None:
+            response["NextShardIterator"] = next_shard_iter
+        if millis_behind_latest is not None:
+            response["MillisBehindLatest"] = millis_behind_latest
+        if child_shards is not None:
+            response["ChildShards"] = [
+                {
+                    "ShardId": shard_id,
+                    "ParentShards": parents,
+                    "HashKeyRange": {"StartingHashKey": "0", "EndingHashKey": "1"},
+                }
+                for shard_id, parents in child_shards.items()
+            ]
         self._stub_bifurcator(
             "get_records", expected_params, response, error_code=error_code
         )
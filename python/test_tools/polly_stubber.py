@@ -45,6 +45,7 @@ class PollyStubber(ExampleStubber):
         lang_code,
         output_stream,
         mark_types=None,
+        text_type=None,
         error_code=None,
     ):
         expected_params = {
@@ -56,6 +57,8 @@ class PollyStubber(ExampleStubber):
         }
         if mark_types is not None:
             expected_params["SpeechMarkTypes"] = mark_types
+        if text_type is not None:
+            expected_params["TextType"] = text_type
         response = {"AudioStream": output_stream}
         self._stub_bifurcator(
             "synthesize_speech", expected_params, response, error_code=error_code
@@ -56,19 +56,34 @@ class RedshiftDataStubber(ExampleStubber):
             "execute_statement", expected_params, response, error_code=error_code
         )
 
-    def stub_describe_statement(self, statement_id, error_code=None):
+    def stub_describe_statement(
+        self, statement_id, status="SUCCEEDED", has_result_set=None, error_code=None
+    ):
         expected_params = {"Id": statement_id}
-        response = {"Id": "id", "Status": "SUCCEEDED"}
+        response = {"Id": "id", "Status": status}
+        if has_result_set is not None:
+            response["HasResultSet"] = has_result_set
         self._stub_bifurcator(
             "describe_statement", expected_params, response, error_code=error_code
         )
 
-    def stub_get_statement_result(self, id, error_code=None):
+    def stub_get_statement_result(
+        self,
+        id,
+        records=None,
+        column_metadata=None,
+        next_token=None,
+        response_next_token=None,
+        error_code=None,
+    ):
         expected_params = {"Id": id}
-        response = {
-            "ColumnMetadata": [],
-            "Records": [[{"stringValue": "value1"}], [{"stringValue": "value2"}]],
-        }
+        if next_token is not None:
+            expected_params["NextToken"] = next_token
+        if records is None:
+            records = [[{"stringValue": "value1"}], [{"stringValue": "value2"}]]
+        response = {"ColumnMetadata": column_metadata or [], "Records": records}
+        if response_next_token is not None:
+            response["NextToken"] = response_next_token
 
         self._stub_bifurcator(
             "get_statement_result", expected_params, response, error_code=error_code
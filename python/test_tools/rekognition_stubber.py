@@ -223,9 +223,30 @@ class RekognitionStubber(ExampleStubber):
             "index_faces", expected_params, response, error_code=error_code
         )
 
-    def stub_list_faces(self, collection_id, max_results, faces, error_code=None):
+    def stub_list_faces(
+        self,
+        collection_id,
+        max_results,
+        faces,
+        next_token=None,
+        response_next_token=None,
+        error_code=None,
+    ):
         expected_params = {"CollectionId": collection_id, "MaxResults": max_results}
-        response = {"Faces": [self._face_to_dict(face) for face in faces]}
+        if next_token is not None:
+            expected_params["NextToken"] = next_token
+        response = {"Faces": []}
+        for face in faces:
+            face_dict = self._face_to_dict(face)
+            if face.face_id is not None:
+                face_dict["FaceId"] = face.face_id
+            if face.image_id is not None:
+                face_dict["ImageId"] = face.image_id
+            if face.external_image_id is not None:
+                face_dict["ExternalImageId"] = face.external_image_id
+            response["Faces"].append(face_dict)
+        if response_next_token is not None:
+            response["NextToken"] = response_next_token
         self._stub_bifurcator(
             "list_faces", expected_params, response, error_code=error_code
         )
@@ -363,6 +384,27 @@ class RekognitionStubber(ExampleStubber):
             error_code=error_code,
         )
 
+    def stub_get_job_results_page(
+        self,
+        func_name,
+        job_id,
+        max_results,
+        result_key,
+        items,
+        next_token=None,
+        response_next_token=None,
+        error_code=None,
+    ):
+        expected_params = {"JobId": job_id, "MaxResults": max_results}
+        if next_token is not None:
+            expected_params["NextToken"] = next_token
+        response = {"JobStatus": "SUCCEEDED", result_key: items}
+        if response_next_token is not None:
+            response["NextToken"] = response_next_token
+        self._stub_bifurcator(
+            func_name, expected_params, response, error_code=error_code
+        )
+
     def stub_get_content_moderation(self, job_id, job_status, labels, error_code=None):
         expected_params = {"JobId": job_id}
         response = {
@@ -10,6 +10,7 @@ set up stubs and passes all calls through to the Boto 3 client.
 
 import io
 import json
+from botocore.response import StreamingBody
 from botocore.stub import ANY
 
 from test_tools.example_stubber import ExampleStubber
@@ -258,6 +259,51 @@ class S3Stubber(ExampleStubber):
             error_code=error_code,
         )
 
+    def stub_get_object_range(
+        self, bucket_name, object_key, byte_range, data, if_match, error_code=None
+    ):
+        expected_params = {
+            "Bucket": bucket_name,
+            "Key": object_key,
+            "Range": byte_range,
+            "IfMatch": if_match,
+        }
+        response = {
+            "Body": StreamingBody(io.BytesIO(data), len(data)),
+            "ContentLength": len(data),
+        }
+        self._stub_bifurcator(
+            "get_object", expected_params, response, error_code=error_code
+        )
+
+    def stub_get_object_part(
+        self,
+        bucket_name,
+        object_key,
+        part_number,
+        data,
+        if_match,
+        content_range,
+        checksums=None,
+        error_code=None,
+    ):
+        expected_params = {
+            "Bucket": bucket_name,
+            "Key": object_key,
+            "PartNumber": part_number,
+            "ChecksumMode": "ENABLED",
+            "IfMatch": if_match,
+        }
+        response = {
+            "Body": StreamingBody(io.BytesIO(data), len(data)),
+            "ContentLength": len(data),
+            "ContentRange": content_range,
+            **(checksums or {}),
+        }
+        self._stub_bifurcator(
+            "get_object", expected_params, response, error_code=error_code
+        )
+
     def stub_delete_object(
         self, bucket_name, object_key, obj_version_id=None, error_code=None
     ):
@@ -278,6 +324,7 @@ class S3Stubber(ExampleStubber):
         error_code=None,
         response_meta=None,
         content_length=None,
+        e_tag=None,
     ):
         expected_params = {"Bucket": bucket_name, "Key": object_key}
         if obj_version_id:
@@ -285,6 +332,8 @@ class S3Stubber(ExampleStubber):
         response = {"ResponseMetadata": {"HTTPStatusCode": status_code}}
         if content_length is not None:
             response["ContentLength"] = content_length
+        if e_tag is not None:
+            response["ETag"] = e_tag
 
         if not error_code:
             self.add_response(
@@ -300,6 +349,37 @@ class S3Stubber(ExampleStubber):
                 response_meta=response_meta,
             )
 
+    def stub_head_object_part(
+        self,
+        bucket_name,
+        object_key,
+        part_number,
+        e_tag,
+        parts_count,
+        content_length,
+        checksums=None,
+        checksum_type=None,
+        error_code=None,
+    ):
+        expected_params = {
+            "Bucket": bucket_name,
+            "Key": object_key,
+            "PartNumber": part_number,
+            "ChecksumMode": "ENABLED",
+            "IfMatch": e_tag,
+        }
+        response = {
+            "ETag": e_tag,
+            "PartsCount": parts_count,
+            "ContentLength": content_length,
+            **(checksums or {}),
+        }
+        if checksum_type is not None:
+            response["ChecksumType"] = checksum_type
+        self._stub_bifurcator(
+            "head_object", expected_params, response, error_code=error_code
+        )
+
     def stub_list_objects(
         self,
         bucket_name,
@@ -330,6 +410,23 @@ class S3Stubber(ExampleStubber):
             "delete_objects", expected_params, response, error_code=error_code
         )
 
+    def stub_delete_objects_quiet(
+        self, bucket_name, objects, errors=None, error_code=None
+    ):
+        expected_params = {
+            "Bucket": bucket_name,
+            "Delete": {"Objects": objects, "Quiet": True},
+        }
+        response = {
+            "Errors": [
+                {**obj, "Code": code, "Message": f"{code} message"}
+                for obj, code in (errors or [])
+            ]
+        }
+        self._stub_bifurcator(
+            "delete_objects", expected_params, response, error_code=error_code
+        )
+
     def stub_copy_object(
         self, src_bucket, src_object_key, dest_bucket, dest_object_key, error_code=None
     ):